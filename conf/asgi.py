@@ -0,0 +1,14 @@
+"""
+ASGI entry point, e.g. for gunicorn with uvicorn workers:
+
+    gunicorn --config gunicorn.conf.py  # generated by: ./manage.py gunicorn_config --asgi
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+application = get_asgi_application()
@@ -41,6 +41,7 @@ DEBUG_ENABLED = '__DEBUG_ENABLED__'
 DEBUG = DEBUG_ENABLED == '1'
 
 LOG_LEVEL = '__LOG_LEVEL__'
+
 ADMIN_EMAIL = '__ADMIN_EMAIL__'
 
 # Default email address to use for various automated correspondence from
@@ -67,11 +68,29 @@ INSTALLED_APPS.append('django_yunohost_integration.apps.YunohostIntegrationConfi
 SECRET_KEY = __get_or_create_secret(DATA_DIR_PATH / 'secret.txt')  # /home/yunohost.app/$app/secret.txt
 
 
+# Should be the first middlewares, to cover the complete request:
+__OBSERVABILITY_MIDDLEWARE = [
+    # Set the request ID for all log lines of a request:
+    'django_yunohost_integration.observability.request_id.RequestIdMiddleware',
+    # Active via settings: YNH_METRICS_ENABLED, YNH_TRACING_SAMPLE_RATE, YNH_SLOW_REQUEST_THRESHOLD
+    'django_yunohost_integration.observability.metrics.MetricsMiddleware',
+    'django_yunohost_integration.observability.tracing.TracingMiddleware',
+    'django_yunohost_integration.observability.slow_requests.SlowRequestMiddleware',
+]
+MIDDLEWARE = __OBSERVABILITY_MIDDLEWARE + [
+    middleware for middleware in MIDDLEWARE if middleware not in __OBSERVABILITY_MIDDLEWARE
+]
+
 MIDDLEWARE.insert(
     MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
     # login a user via HTTP_REMOTE_USER header from SSOwat:
     'django_yunohost_integration.sso_auth.auth_middleware.SSOwatRemoteUserMiddleware',
 )
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('django_yunohost_integration.sso_auth.auth_middleware.SSOwatRemoteUserMiddleware') + 1,
+    # Profile requests: Needs the SSO user to check the "X-Ynh-Profile" header permission:
+    'django_yunohost_integration.observability.profiling.ProfilingMiddleware',
+)
 if 'axes.middleware.AxesMiddleware' not in MIDDLEWARE:
     # AxesMiddleware should be the last middleware:
     MIDDLEWARE.append('axes.middleware.AxesMiddleware')
@@ -172,7 +191,7 @@ LOGGING = {
     'disable_existing_loggers': False,
     'formatters': {
         'verbose': {
-            'format': '{asctime} {levelname} {name} {module}.{funcName} {message}',
+            'format': '{asctime} {levelname} {request_id} {name} {module}.{funcName} {message}',
             'style': '{',
         },
     },
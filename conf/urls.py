@@ -3,6 +3,7 @@ from django.conf.urls import static
 from django.urls import include, path
 from django.views.generic import RedirectView
 
+from django_yunohost_integration.observability.metrics import metrics_view
 from django_yunohost_integration.yunohost_utils import SSOwatLoginRedirectView
 
 
@@ -14,6 +15,9 @@ urlpatterns = [
     #
     # Cover over the default Django Admin Login with SSOWat login:
     path(f'{settings.PATH_URL}/login/', SSOwatLoginRedirectView.as_view(), name='ssowat-login'),
+    #
+    # Prometheus metrics (returns 404 if settings.YNH_METRICS_ENABLED is not set):
+    path(f'{settings.PATH_URL}/metrics/', metrics_view, name='ynh-metrics'),
 ]
 
 
@@ -6,4 +6,10 @@ class YunohostIntegrationConfig(AppConfig):
     verbose_name = 'Yunohost Integration'
 
     def ready(self):
-        from django_yunohost_integration import system_checks  # noqa - Register checks
+        from django_yunohost_integration import check_cache, system_checks  # noqa - Register checks
+        from django_yunohost_integration.observability import metrics
+
+        metrics.connect_signals()
+
+        if check_cache.is_enabled():
+            check_cache.install()
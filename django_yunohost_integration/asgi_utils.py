@@ -0,0 +1,92 @@
+"""
+    ASGI helpers for the "local_test" files.
+
+    SSOwatHeadersMiddleware wraps an ASGI application and adds the headers and the JWT cookie of a simulated user,
+    like SSOwat does in production. Unlike the SSOwat proxy, responses are not buffered,
+    so streaming and long-polling views behave like behind nginx.
+
+    Serve the "local_test" files via uvicorn, e.g.:
+
+        cd local_test/opt_yunohost/
+        ENV_TYPE=local python -m uvicorn --factory django_yunohost_integration.asgi_utils:get_local_test_application
+"""
+
+import importlib
+import os
+
+from django_yunohost_integration.sso_utils import JWT_COOKIE_NAME, get_sso_headers
+from django_yunohost_integration.ssowat_proxy import SIMULATE_USER_HEADER, SSOWAT_HEADERS, merge_cookies
+
+
+# The ASGI application in conf/asgi.py
+ASGI_MODULE = 'asgi'
+
+# Environment variable with the name of the simulated user:
+LOCAL_TEST_USER_ENV = 'YNH_LOCAL_TEST_USER'
+DEFAULT_LOCAL_TEST_USER = 'test'
+
+
+def get_sso_scope_headers(headers: list, default_username: str, jwt_cookie_name: str = JWT_COOKIE_NAME) -> list:
+    """
+    Returns the ASGI headers with the SSOwat headers of the simulated user.
+    Headers that only SSOwat may set are removed from the incoming headers.
+
+    >>> headers = get_sso_scope_headers([(b'ynh-user', b'evil'), (b'accept', b'*/*')], default_username='test')
+    >>> [(key, value) for key, value in headers if key in (b'ynh-user', b'accept')]
+    [(b'accept', b'*/*'), (b'ynh-user', b'test')]
+    """
+    username = default_username
+    cookies = None
+    new_headers = []
+    for key, value in headers:
+        key = key.lower()
+        if key == SIMULATE_USER_HEADER.lower().encode():
+            username = value.decode('latin-1')
+        elif key == b'cookie':
+            cookies = value.decode('latin-1')
+        elif key.decode('latin-1') not in SSOWAT_HEADERS:
+            new_headers.append((key, value))
+
+    sso_headers = get_sso_headers(username, jwt_cookie_name=jwt_cookie_name)
+    sso_headers['Cookie'] = merge_cookies(cookies, sso_cookie=sso_headers['Cookie'], jwt_cookie_name=jwt_cookie_name)
+    for key, value in sso_headers.items():
+        new_headers.append((key.lower().encode('latin-1'), value.encode('latin-1')))
+    return new_headers
+
+
+class SSOwatHeadersMiddleware:
+    """
+    ASGI middleware: Simulate a logged-in YunoHost user, e.g. in front of Django's ASGIHandler.
+    The user can be selected per request with the "X-Simulate-Ynh-User" header.
+    """
+
+    def __init__(self, app, default_username: str = DEFAULT_LOCAL_TEST_USER, jwt_cookie_name: str = JWT_COOKIE_NAME):
+        self.app = app
+        self.default_username = default_username
+        self.jwt_cookie_name = jwt_cookie_name
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] in ('http', 'websocket'):
+            scope = dict(scope)
+            scope['headers'] = get_sso_scope_headers(
+                scope.get('headers', []),
+                default_username=self.default_username,
+                jwt_cookie_name=self.jwt_cookie_name,
+            )
+        await self.app(scope, receive, send)
+
+
+def get_local_test_application():
+    """
+    Application factory for uvicorn: The application of "asgi.py" from the "local_test" files with SSOwat headers.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+    application = importlib.import_module(ASGI_MODULE).application
+
+    from django.conf import settings
+
+    return SSOwatHeadersMiddleware(
+        application,
+        default_username=os.environ.get(LOCAL_TEST_USER_ENV) or DEFAULT_LOCAL_TEST_USER,
+        jwt_cookie_name=settings.YNH_JWT_COOKIE_NAME,
+    )
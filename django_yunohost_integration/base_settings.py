@@ -4,6 +4,8 @@
 """
 import logging as __logging
 
+from django_yunohost_integration.observability.request_id import request_id_var as __request_id_var
+
 
 # -----------------------------------------------------------------------------
 # settings that should be set in project settings:
@@ -29,6 +31,15 @@ INSTALLED_APPS = [
 # -----------------------------------------------------------------------------
 
 MIDDLEWARE = [
+    # Set a request ID (from "X-Request-ID" header) for all log lines of a request:
+    'django_yunohost_integration.observability.request_id.RequestIdMiddleware',
+    # Count requests and measure latency, if YNH_METRICS_ENABLED is set:
+    'django_yunohost_integration.observability.metrics.MetricsMiddleware',
+    # Record traces, if YNH_TRACING_SAMPLE_RATE is set:
+    'django_yunohost_integration.observability.tracing.TracingMiddleware',
+    # Log slow requests with SQL/cache statistics, if YNH_SLOW_REQUEST_THRESHOLD is set:
+    'django_yunohost_integration.observability.slow_requests.SlowRequestMiddleware',
+    #
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -38,6 +49,9 @@ MIDDLEWARE = [
     # login a user via HTTP_REMOTE_USER header from SSOwat:
     'django_yunohost_integration.sso_auth.auth_middleware.SSOwatRemoteUserMiddleware',
     #
+    # Profile requests, if YNH_PROFILING_SAMPLE_RATE is set or requested by a superuser:
+    'django_yunohost_integration.observability.profiling.ProfilingMiddleware',
+    #
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     #
@@ -87,6 +101,37 @@ YNH_USER_NAME_HEADER_KEY = 'HTTP_YNH_USER'
 YNH_JWT_COOKIE_NAME = 'yunohost.portal'
 YNH_BASIC_AUTH_HEADER_KEY = 'HTTP_AUTHORIZATION'
 
+# Prometheus metrics, see: django_yunohost_integration/observability/metrics.py
+YNH_METRICS_ENABLED = False
+YNH_METRICS_DIR = None  # Shared by all workers. None -> DATA_DIR_PATH / 'metrics'
+YNH_METRICS_TOKEN = None  # Bearer token for the metrics view. None -> only superusers
+
+# Tracing, see: django_yunohost_integration/observability/tracing.py
+YNH_TRACING_SAMPLE_RATE = 0.0  # 0.0 = off ... 1.0 = trace every request
+YNH_TRACING_FILE = None  # JSON lines file. None -> DATA_DIR_PATH / 'traces.jsonl'
+
+# Request profiling, see: django_yunohost_integration/observability/profiling.py
+YNH_PROFILING_SAMPLE_RATE = 0.0  # 0.0 = only via "X-Ynh-Profile" header by superusers ... 1.0 = every request
+YNH_PROFILING_MIN_DURATION = 0.5  # Store only profiles of requests that take longer (in seconds)
+YNH_PROFILING_MAX_TOTAL_SIZE = 50 * 1024 * 1024  # Remove the oldest profiles, if all together are bigger
+YNH_PROFILING_DIR = None  # None -> DATA_DIR_PATH / 'profiles'
+
+# Log requests slower than this (in seconds), see: django_yunohost_integration/observability/slow_requests.py
+YNH_SLOW_REQUEST_THRESHOLD = None  # None -> off
+
+# Create SQLite test databases from a pre-migrated template, see: django_yunohost_integration/test_db_template.py
+YNH_TEST_DB_TEMPLATE = True
+
+# Reuse system check results across manage.py calls, see: django_yunohost_integration/check_cache.py
+YNH_CHECK_CACHE = False
+
+# gunicorn.conf.py values, see: django_yunohost_integration/gunicorn_config.py
+YNH_GUNICORN_BIND = '127.0.0.1:8000'
+YNH_GUNICORN_WORKERS = None  # None -> calculated from CPU count and available RAM
+YNH_GUNICORN_THREADS = None  # None -> calculated from CPU count and workers
+YNH_GUNICORN_TIMEOUT = 30  # Seconds
+YNH_GUNICORN_MAX_REQUESTS = 1000  # Restart a worker after this number of requests
+YNH_GUNICORN_ASGI = False  # True -> serve asgi.py with uvicorn workers
 
 # _____________________________________________________________________________
 
@@ -128,6 +173,7 @@ def cut_path(pathname, max_length):
 def record_factory(*args, **kwargs):
     record = old_factory(*args, **kwargs)
     record.cut_path = cut_path(record.pathname, 30)
+    record.request_id = __request_id_var.get()  # set by RequestIdMiddleware
     return record
 
 
@@ -140,7 +186,7 @@ LOGGING = {
     'disable_existing_loggers': True,
     'formatters': {
         'verbose': {
-            'format': '{asctime} {levelname} {name} {module}.{funcName} {message}',
+            'format': '{asctime} {levelname} {request_id} {name} {module}.{funcName} {message}',
             'style': '{',
         },
         'colored': {  # https://github.com/borntyping/python-colorlog
@@ -0,0 +1,208 @@
+"""
+    History of benchmark results and the comparison against a baseline.
+
+    Every "./dev-cli.py benchmark" run is stored as "<git revision>.json" in the history directory:
+    "local_test/benchmarks/history/" or the "benchmark_history_dir" from "[ynh-integration]" in pyproject.toml
+    Runs with uncommitted changes are stored as "<git revision>-dirty.json" and are never used as automatic baseline.
+
+    A benchmark is a regression, if the p50 latency grew more than the noise threshold, that is the biggest of:
+     * the relative threshold (e.g.: 10% of the baseline p50)
+     * the spread of the baseline (p90 - p50), because a bigger difference is just noise
+     * a minimal absolute difference in milliseconds, for very fast benchmarks
+"""
+
+import dataclasses
+import json
+from pathlib import Path
+
+from bx_py_utils.pyproject_toml import get_pyproject_config
+
+from django_yunohost_integration.benchmark_utils import DIRTY_SUFFIX
+from django_yunohost_integration.path_utils import get_project_root
+
+
+UNKNOWN_REVISION = 'unknown'
+
+REGRESSION = 'regression'
+IMPROVED = 'improved'
+UNCHANGED = 'ok'
+NEW = 'new'
+REMOVED = 'removed'
+
+
+def get_history_dir(base_path: Path | None = None) -> Path:
+    """
+    Returns the directory for the benchmark result history.
+    A relative "benchmark_history_dir" is relative to the project root.
+    """
+    project_root = base_path or get_project_root()
+    history_dir = get_pyproject_config(section=('ynh-integration', 'benchmark_history_dir'), base_path=project_root)
+    if history_dir:
+        return project_root / history_dir
+    return project_root / 'local_test' / 'benchmarks' / 'history'
+
+
+def save_result(data: dict, history_dir: Path) -> Path:
+    """
+    Store benchmark results ({'metadata': ..., 'results': ...}) as "<git revision>.json".
+    A result of the same revision is overwritten, results with uncommitted changes have their own "-dirty" revision.
+    """
+    revision = data['metadata'].get('git_revision') or UNKNOWN_REVISION
+    path = history_dir / f'{revision}.json'
+    history_dir.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
+    return path
+
+
+def load_result(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+
+def get_history(history_dir: Path) -> list[Path]:
+    """
+    Returns all stored results, the newest first.
+    """
+    if not history_dir.is_dir():
+        return []
+    return sorted(history_dir.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def find_baseline(history_dir: Path, revision: str | None = None, exclude_revision: str | None = None) -> Path | None:
+    """
+    Returns the stored result of the given (abbreviated) revision,
+    or without a revision: the newest result of another revision than "exclude_revision".
+    Results with uncommitted changes are only returned, if the "-dirty" revision is requested.
+    """
+    for path in get_history(history_dir):
+        if path.stem.endswith(DIRTY_SUFFIX) and not (revision and revision.endswith(DIRTY_SUFFIX)):
+            continue
+        if revision:
+            if path.stem.startswith(revision):
+                return path
+        elif path.stem != exclude_revision:
+            return path
+    return None
+
+
+@dataclasses.dataclass
+class Comparison:
+    name: str
+    status: str
+    baseline: float | None = None
+    current: float | None = None
+    threshold: float | None = None
+
+    @property
+    def delta(self) -> float | None:
+        if self.baseline is None or self.current is None:
+            return None
+        return self.current - self.baseline
+
+    @property
+    def delta_percent(self) -> float | None:
+        if self.delta is None or not self.baseline:
+            return None
+        return self.delta / self.baseline * 100
+
+
+def compare_summary(
+    name: str,
+    baseline: dict,
+    current: dict,
+    *,
+    threshold_percent: float,
+    min_delta_ms: float,
+) -> Comparison:
+    """
+    Compare the p50 of two summarize() results (in milliseconds).
+
+    >>> baseline = {'p50': 1.0, 'p90': 1.05}
+    >>> compare_summary('foo', baseline, {'p50': 1.2, 'p90': 1.3}, threshold_percent=10, min_delta_ms=0.01)
+    Comparison(name='foo', status='regression', baseline=1.0, current=1.2, threshold=0.1)
+    >>> compare_summary('foo', baseline, {'p50': 1.08, 'p90': 1.1}, threshold_percent=10, min_delta_ms=0.01).status
+    'ok'
+    >>> compare_summary('foo', baseline, {'p50': 0.5, 'p90': 0.6}, threshold_percent=10, min_delta_ms=0.01).status
+    'improved'
+
+    A noisy baseline needs a bigger difference:
+    >>> compare_summary('foo', {'p50': 1.0, 'p90': 1.5}, {'p50': 1.4}, threshold_percent=10, min_delta_ms=0.01).status
+    'ok'
+    """
+    baseline_p50 = baseline['p50']
+    threshold = max(
+        baseline_p50 * threshold_percent / 100,
+        baseline.get('p90', baseline_p50) - baseline_p50,
+        min_delta_ms,
+    )
+    delta = current['p50'] - baseline_p50
+    if delta > threshold:
+        status = REGRESSION
+    elif delta < -threshold:
+        status = IMPROVED
+    else:
+        status = UNCHANGED
+    return Comparison(name=name, status=status, baseline=baseline_p50, current=current['p50'], threshold=threshold)
+
+
+def compare_results(
+    baseline: dict,
+    current: dict,
+    *,
+    threshold_percent: float = 10.0,
+    min_delta_ms: float = 0.005,
+) -> list[Comparison]:
+    """
+    Compare all benchmarks of two stored results.
+    """
+    baseline_results = baseline['results']
+    current_results = current['results']
+    comparisons = []
+    for name, summary in current_results.items():
+        if name in baseline_results:
+            comparisons.append(
+                compare_summary(
+                    name,
+                    baseline_results[name],
+                    summary,
+                    threshold_percent=threshold_percent,
+                    min_delta_ms=min_delta_ms,
+                )
+            )
+        else:
+            comparisons.append(Comparison(name=name, status=NEW, current=summary['p50']))
+    for name, summary in baseline_results.items():
+        if name not in current_results:
+            comparisons.append(Comparison(name=name, status=REMOVED, baseline=summary['p50']))
+    return comparisons
+
+
+def format_comparison_report(comparisons: list[Comparison], baseline_revision: str, current_revision: str) -> str:
+    """
+    >>> print(format_comparison_report(
+    ...     [Comparison('foo', 'regression', 1.0, 1.2, 0.1), Comparison('bar', 'new', current=0.5)], 'abc', 'def'
+    ... ))
+    p50 latency in milliseconds, baseline: abc current: def
+    name                                  baseline    current      delta   delta %  threshold status
+    foo                                      1.000      1.200     +0.200    +20.0%      0.100 regression
+    bar                                          -      0.500          -         -          - new
+    """
+
+    def number(value: float | None, format_spec: str) -> str:
+        return '-' if value is None else format(value, format_spec)
+
+    lines = [
+        f'p50 latency in milliseconds, baseline: {baseline_revision} current: {current_revision}',
+        f'{"name":<35} {"baseline":>10} {"current":>10} {"delta":>10} {"delta %":>9} {"threshold":>10} status',
+    ]
+    for comparison in comparisons:
+        delta_percent = '-' if comparison.delta_percent is None else f'{comparison.delta_percent:+.1f}%'
+        lines.append(
+            f'{comparison.name:<35}'
+            f' {number(comparison.baseline, ".3f"):>10}'
+            f' {number(comparison.current, ".3f"):>10}'
+            f' {number(comparison.delta, "+.3f"):>10}'
+            f' {delta_percent:>9}'
+            f' {number(comparison.threshold, ".3f"):>10}'
+            f' {comparison.status}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,208 @@
+"""
+    Benchmarks of the SSO authentication hot path.
+
+    Run via:
+        ./dev-cli.py benchmark
+
+    All benchmarks use RequestFactory requests against a fresh test database in the "local_test" environment.
+    Logging is disabled while measuring, use "./manage.py benchmark_environment" for the logging costs.
+"""
+
+import datetime
+import itertools
+import json
+import logging
+import os
+import platform
+from collections.abc import Callable
+from pathlib import Path
+
+import django
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import PermissionDenied, SuspiciousOperation
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+import django_yunohost_integration
+from django_yunohost_integration.benchmark_utils import get_git_revision, measure, summarize
+from django_yunohost_integration.sso_auth.auth_middleware import SSOwatRemoteUserMiddleware
+from django_yunohost_integration.sso_auth.user_profile import update_user_profile
+from django_yunohost_integration.test_utils import generate_basic_auth
+from django_yunohost_integration.yunohost.ynh_jwt import verify_sso_jwt
+from django_yunohost_integration.yunohost_utils import build_ssowat_uri, decode_ssowat_uri, encode_ssowat_uri
+
+
+UserModel = get_user_model()
+
+USERNAME = 'benchmark-user'
+
+
+def get_response(request):
+    return HttpResponse()
+
+
+def create_jwt(username: str) -> str:
+    return jwt.encode(payload={'user': username}, key='ssowat-cookie-secret', algorithm='HS256')
+
+
+def sso_request(username: str = USERNAME, basic_auth_username: str | None = None, **extra) -> HttpRequest:
+    """
+    Create a request with all headers/cookies that SSOwat and nginx would set.
+    """
+    request_factory = RequestFactory()
+    request_factory.cookies[settings.YNH_JWT_COOKIE_NAME] = create_jwt(username)
+    headers = {
+        'HTTP_YNH_USER': username,
+        'HTTP_AUTHORIZATION': generate_basic_auth(username=basic_auth_username or username, password='secret'),
+        'HTTP_EMAIL': f'{username}@example.tld',
+        'HTTP_NAME': 'Benchmark User',
+        **extra,
+    }
+    return request_factory.get(f'/{settings.PATH_URL}/', **headers)
+
+
+def new_session():
+    return import_string(f'{settings.SESSION_ENGINE}.SessionStore')()
+
+
+def middleware_first_login() -> Callable:
+    middleware = SSOwatRemoteUserMiddleware(get_response)
+
+    def benchmark():
+        request = sso_request()
+        request.session = new_session()
+        request.user = AnonymousUser()
+        middleware.process_request(request)
+        assert request.user.is_authenticated
+
+    return benchmark
+
+
+def middleware_logged_in() -> Callable:
+    middleware = SSOwatRemoteUserMiddleware(get_response)
+    authentication_middleware = AuthenticationMiddleware(get_response)
+
+    # Login once and reuse the session:
+    request = sso_request()
+    request.session = new_session()
+    request.user = AnonymousUser()
+    middleware.process_request(request)
+    request.session.save()
+    session_key = request.session.session_key
+
+    session_store = import_string(f'{settings.SESSION_ENGINE}.SessionStore')
+
+    def benchmark():
+        request = sso_request()
+        request.session = session_store(session_key)
+        authentication_middleware.process_request(request)
+        middleware.process_request(request)
+        assert request.user.is_authenticated
+
+    return benchmark
+
+
+def middleware_rejected() -> Callable:
+    middleware = SSOwatRemoteUserMiddleware(get_response)
+
+    def benchmark():
+        request = sso_request(basic_auth_username='other-user')
+        request.session = new_session()
+        request.user = AnonymousUser()
+        try:
+            middleware.process_request(request)
+        except (PermissionDenied, SuspiciousOperation):
+            pass
+        else:
+            raise AssertionError('Request not rejected')
+
+    return benchmark
+
+
+def verify_sso_jwt_benchmark() -> Callable:
+    user = UserModel.objects.get_or_create(username=USERNAME)[0]
+    sso_jwt_data = create_jwt(USERNAME)
+    return lambda: verify_sso_jwt(sso_jwt_data=sso_jwt_data, user=user)
+
+
+def update_user_profile_unchanged() -> Callable:
+    user = UserModel.objects.get_or_create(username=USERNAME)[0]
+    request = sso_request()
+    update_user_profile(request, user)
+    return lambda: update_user_profile(request, user)
+
+
+def update_user_profile_changed() -> Callable:
+    user = UserModel.objects.get_or_create(username=USERNAME)[0]
+    # Alternate the email, so that every call saves the user:
+    requests = itertools.cycle([sso_request(HTTP_EMAIL='one@example.tld'), sso_request(HTTP_EMAIL='two@example.tld')])
+    return lambda: update_user_profile(next(requests), user)
+
+
+def build_ssowat_uri_benchmark() -> Callable:
+    request = RequestFactory().get(f'/{settings.PATH_URL}/', secure=True)
+    request.user = AnonymousUser()
+    return lambda: build_ssowat_uri(request, next_url=f'/{settings.PATH_URL}/foo/bar/')
+
+
+def decode_ssowat_uri_benchmark() -> Callable:
+    encoded_uri = encode_ssowat_uri(f'https://example.tld/{settings.PATH_URL}/foo/bar/')
+    return lambda: decode_ssowat_uri(encoded_uri)
+
+
+# Benchmark name -> function that prepares and returns the function to measure:
+BENCHMARKS = {
+    'middleware.first_login': middleware_first_login,
+    'middleware.logged_in': middleware_logged_in,
+    'middleware.rejected': middleware_rejected,
+    'verify_sso_jwt': verify_sso_jwt_benchmark,
+    'update_user_profile.unchanged': update_user_profile_unchanged,
+    'update_user_profile.changed': update_user_profile_changed,
+    'build_ssowat_uri': build_ssowat_uri_benchmark,
+    'decode_ssowat_uri': decode_ssowat_uri_benchmark,
+}
+
+
+def get_environment_metadata() -> dict:
+    return {
+        'timestamp': datetime.datetime.now(tz=datetime.UTC).isoformat(timespec='seconds'),
+        'git_revision': get_git_revision(),
+        'package_version': django_yunohost_integration.__version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'django_version': django.get_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'database': connection.vendor,
+    }
+
+
+def run_benchmarks(iterations: int = 1000, names: list[str] | None = None) -> dict:
+    """
+    Run all (or the given) benchmarks and returns the results: benchmark name -> summary incl. "ops_per_sec"
+    """
+    results = {}
+    logging.disable(logging.CRITICAL)
+    try:
+        for name, factory in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            samples = measure(factory(), iterations=iterations, warmup=min(iterations, 10))
+            summary = summarize(samples)
+            summary['ops_per_sec'] = round(len(samples) / sum(samples), 1)
+            results[name] = summary
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def write_results(path: Path, results: dict, metadata: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'metadata': metadata, 'results': results}, indent=2))
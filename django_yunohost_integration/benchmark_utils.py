@@ -0,0 +1,86 @@
+"""
+    Helpers to measure and summarize timings
+"""
+
+import statistics
+import subprocess
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+
+def measure(func: Callable, iterations: int, warmup: int = 1) -> list[float]:
+    """
+    Call "func" "iterations" times and returns the duration of every call in seconds.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict:
+    """
+    Returns the count, mean and percentiles (in milliseconds) of timing samples (in seconds).
+
+    >>> summarize([0.001, 0.002, 0.003, 0.004, 0.010])
+    {'count': 5, 'mean': 4.0, 'p50': 3.0, 'p90': 7.6, 'p99': 9.76, 'max': 10.0}
+    >>> summarize([0.5])
+    {'count': 1, 'mean': 500.0, 'p50': 500.0, 'p90': 500.0, 'p99': 500.0, 'max': 500.0}
+    """
+    samples_ms = [sample * 1000 for sample in samples]
+    if len(samples_ms) > 1:
+        quantiles = statistics.quantiles(samples_ms, n=100, method='inclusive')
+        p50, p90, p99 = quantiles[49], quantiles[89], quantiles[98]
+    else:
+        p50 = p90 = p99 = samples_ms[0]
+    return {
+        'count': len(samples_ms),
+        'mean': round(statistics.fmean(samples_ms), 3),
+        'p50': round(p50, 3),
+        'p90': round(p90, 3),
+        'p99': round(p99, 3),
+        'max': round(max(samples_ms), 3),
+    }
+
+
+def format_summary_table(results: dict) -> str:
+    """
+    Format {name: summarize() result} as text table.
+
+    >>> print(format_summary_table({'db.select_1': summarize([0.001, 0.003])}))
+    name                                count     mean      p50      p90      p99      max
+    db.select_1                             2    2.000    2.000    2.800    2.980    3.000
+    """
+    columns = ('mean', 'p50', 'p90', 'p99', 'max')
+    lines = [f'{"name":<35} {"count":>5} ' + ' '.join(f'{column:>8}' for column in columns)]
+    for name, summary in results.items():
+        values = ' '.join(f'{summary[column]:8.3f}' for column in columns)
+        lines.append(f'{name:<35} {summary["count"]:>5} {values}')
+    return '\n'.join(lines)
+
+
+DIRTY_SUFFIX = '-dirty'
+
+
+def get_git_revision(cwd: Path | None = None) -> str | None:
+    """
+    Returns the current git commit hash or None, e.g.: if git isn't installed.
+    With uncommitted changes of tracked files, the hash has a "-dirty" suffix.
+    """
+    try:
+        revision = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=cwd, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+        changes = subprocess.check_output(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd, stderr=subprocess.DEVNULL, text=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    if changes.strip():
+        revision += DIRTY_SUFFIX
+    return revision
@@ -0,0 +1,230 @@
+"""
+    Reuse the system check results across "manage.py" calls.
+
+    YunoHost install/upgrade scripts call many "manage.py" commands in a row and every one runs all system checks.
+    With settings.YNH_CHECK_CACHE = True the results are stored in "DATA_DIR_PATH/system_checks_cache.json"
+    and reused, until the fingerprint changes. The fingerprint contains:
+
+        * The content of the settings module and all modules imported from the same directory (e.g.: local_settings.py)
+        * The environment variables that select the settings (e.g.: ENV_TYPE)
+        * The names and versions of all installed Python packages
+        * The modification time and size of the imported modules of editable installs (their version doesn't change)
+        * The Python version
+
+    Results with an "obj" (e.g.: a model class) can't be stored, so these checks are always executed again.
+    Checks with "databases" (e.g. called by "migrate") depend on the database state and are never cached.
+
+    All other checks are cached, also if they depend on the file system or other external state
+    (e.g. a missing directory): Remove the cache file to run them again after such a problem is fixed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import urllib.parse
+from pathlib import Path
+
+from django.conf import ENVIRONMENT_VARIABLE, settings
+from django.core import checks
+from django.core.checks import (
+    CRITICAL,
+    DEBUG,
+    ERROR,
+    INFO,
+    WARNING,
+    CheckMessage,
+    Critical,
+    Debug,
+    Error,
+    Info,
+    Warning,
+)
+from django.core.checks.registry import registry
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = 'system_checks_cache.json'
+
+MESSAGE_CLASSES = {DEBUG: Debug, INFO: Info, WARNING: Warning, ERROR: Error, CRITICAL: Critical}
+
+# Environment variables that change the settings, e.g. "ENV_TYPE" activates the "local_settings.py" overwrites:
+FINGERPRINT_ENV_VARS = (ENVIRONMENT_VARIABLE, 'ENV_TYPE')
+
+
+def is_enabled() -> bool:
+    return bool(getattr(settings, 'YNH_CHECK_CACHE', False))
+
+
+def get_cache_path() -> Path:
+    return Path(settings.DATA_DIR_PATH) / CACHE_FILE_NAME
+
+
+def iter_settings_files():
+    # SETTINGS_MODULE is None with override_settings():
+    settings_module_name = settings.SETTINGS_MODULE or os.environ.get(ENVIRONMENT_VARIABLE)
+    settings_module = sys.modules.get(settings_module_name)
+    if settings_module is None or not getattr(settings_module, '__file__', None):
+        return
+    settings_dir = Path(settings_module.__file__).parent
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None)
+        if module_file and module_file.endswith('.py') and Path(module_file).parent == settings_dir:
+            yield Path(module_file)
+
+
+def iter_installed_packages():
+    """
+    The metadata directory names contain the package versions, e.g.: "django-5.1.4.dist-info"
+    Listing them is much faster than reading the metadata of every package.
+    """
+    for path in sys.path:
+        path = Path(path or '.')
+        if path.is_dir():
+            yield from path.glob('*.dist-info')
+            yield from path.glob('*.egg-info')
+
+
+def iter_editable_source_dirs():
+    """
+    Source directories of packages installed via "pip install -e" / "uv sync", see: PEP 610
+    """
+    for dist_info_path in iter_installed_packages():
+        try:
+            direct_url = json.loads((dist_info_path / 'direct_url.json').read_text())
+        except (OSError, ValueError):
+            continue
+        url = urllib.parse.urlparse(direct_url.get('url', ''))
+        if direct_url.get('dir_info', {}).get('editable') and url.scheme == 'file':
+            yield Path(urllib.parse.unquote(url.path))
+
+
+def iter_editable_module_files():
+    source_dirs = tuple(iter_editable_source_dirs())
+    if not source_dirs:
+        return
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None)
+        if module_file and module_file.endswith('.py'):
+            module_path = Path(module_file)
+            if any(module_path.is_relative_to(source_dir) for source_dir in source_dirs):
+                yield module_path
+
+
+def get_fingerprint() -> str:
+    hasher = hashlib.sha256()
+    hasher.update(sys.version.encode())
+    for name in FINGERPRINT_ENV_VARS:
+        hasher.update(f'{name}={os.environ.get(name)!r}'.encode())
+    for path in sorted(set(iter_settings_files())):
+        hasher.update(str(path).encode())
+        hasher.update(path.read_bytes())
+    for path in sorted(path.name for path in iter_installed_packages()):
+        hasher.update(path.encode())
+        hasher.update(b'\0')
+    for path in sorted(set(iter_editable_module_files())):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        hasher.update(f'{path} {stat.st_mtime_ns} {stat.st_size}'.encode())
+    return hasher.hexdigest()
+
+
+def get_results_key(tags, include_deployment_checks) -> str:
+    """
+    >>> get_results_key(tags=['performance', 'database'], include_deployment_checks=True)
+    'tags=database,performance deploy=True'
+    >>> get_results_key(tags=None, include_deployment_checks=False)
+    'tags=None deploy=False'
+    """
+    tags = ','.join(sorted(tags)) if tags is not None else None
+    return f'tags={tags} deploy={include_deployment_checks}'
+
+
+def serialize(messages: list) -> list | None:
+    """
+    Returns None, if the messages can't be stored.
+    """
+    if any(message.obj is not None for message in messages):
+        return None
+    return [
+        {'level': message.level, 'msg': str(message.msg), 'hint': message.hint, 'id': message.id}
+        for message in messages
+    ]
+
+
+def deserialize(data: list) -> list:
+    messages = []
+    for entry in data:
+        level = entry.pop('level')
+        if message_class := MESSAGE_CLASSES.get(level):
+            messages.append(message_class(**entry))
+        else:
+            messages.append(CheckMessage(level, **entry))
+    return messages
+
+
+def load_cache(cache_path: Path) -> dict:
+    try:
+        return json.loads(cache_path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as err:
+        logger.warning('Ignore broken system checks cache %s: %s', cache_path, err)
+        return {}
+
+
+def save_cache(cache_path: Path, cache: dict) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=cache_path.parent, suffix='.tmp', delete=False) as temp_file:
+            json.dump(cache, temp_file)
+        os.replace(temp_file.name, cache_path)
+    except OSError as err:
+        logger.warning('Can not save system checks cache %s: %s', cache_path, err)
+
+
+def run_checks(app_configs=None, tags=None, include_deployment_checks=False, databases=None):
+    """
+    Cached replacement of django.core.checks.run_checks()
+    """
+    if app_configs is not None or databases is not None or not is_enabled():
+        return registry.run_checks(
+            app_configs=app_configs,
+            tags=tags,
+            include_deployment_checks=include_deployment_checks,
+            databases=databases,
+        )
+
+    cache_path = get_cache_path()
+    fingerprint = get_fingerprint()
+    key = get_results_key(tags, include_deployment_checks)
+
+    cache = load_cache(cache_path)
+    if cache.get('fingerprint') != fingerprint:
+        cache = {'fingerprint': fingerprint, 'results': {}}
+    elif (data := cache['results'].get(key)) is not None:
+        logger.debug('Use cached system check results for: %s', key)
+        return deserialize(data)
+
+    messages = registry.run_checks(
+        app_configs=app_configs,
+        tags=tags,
+        include_deployment_checks=include_deployment_checks,
+        databases=databases,
+    )
+    if (data := serialize(messages)) is not None:
+        cache['results'][key] = data
+        save_cache(cache_path, cache)
+    return messages
+
+
+def install() -> None:
+    """
+    Called from AppConfig.ready(): Management commands call the checks via django.core.checks.run_checks()
+    """
+    checks.run_checks = run_checks
@@ -0,0 +1,120 @@
+import dataclasses
+import sys
+from pathlib import Path
+
+from rich import get_console, print
+
+from django_yunohost_integration.benchmark_history import (
+    REGRESSION,
+    compare_results,
+    find_baseline,
+    format_comparison_report,
+    get_history_dir,
+    load_result,
+    save_result,
+)
+from django_yunohost_integration.cli_dev import app
+from django_yunohost_integration.local_test import setup_local_yunohost_test
+from django_yunohost_integration.path_utils import get_project_root
+
+
+@dataclasses.dataclass
+class BenchmarkArgs:
+    # Number of measurements per benchmark
+    iterations: int = 1000
+
+    # Run only these benchmarks (default: all)
+    names: tuple[str, ...] = ()
+
+    # Write the results as JSON into this file
+    output: Path = get_project_root() / 'local_test' / 'benchmarks' / 'latest.json'
+
+    # Store the results also as "<git revision>.json" in the benchmark history
+    history: bool = True
+
+
+@app.command
+def benchmark(*, args: BenchmarkArgs):
+    """
+    Run the SSO authentication benchmarks in "local_test" and write the results as JSON
+    """
+    setup_local_yunohost_test()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from django_yunohost_integration.benchmark_suite import get_environment_metadata, run_benchmarks, write_results
+    from django_yunohost_integration.benchmark_utils import format_summary_table
+    from django_yunohost_integration.test_db_template import use_test_db_templates
+
+    setup_test_environment()
+    with use_test_db_templates():
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        results = run_benchmarks(iterations=args.iterations, names=list(args.names))
+        metadata = get_environment_metadata()
+    finally:
+        connection.creation.destroy_test_db(old_database_name, verbosity=0)
+        teardown_test_environment()
+
+    print(f'\nIterations: {args.iterations}, all times in milliseconds:\n')
+    get_console().print(format_summary_table(results), soft_wrap=True)
+    print()
+    for name, summary in results.items():
+        print(f'{name:<35} {summary["ops_per_sec"]:>10.1f} ops/sec')
+
+    write_results(path=args.output, results=results, metadata=metadata)
+    print(f'\nResults written to: {args.output}')
+
+    if args.history:
+        path = save_result({'metadata': metadata, 'results': results}, history_dir=get_history_dir())
+        print(f'Results stored in history: {path}')
+
+
+@dataclasses.dataclass
+class BenchmarkCompareArgs:
+    # Benchmark results to check
+    current: Path = get_project_root() / 'local_test' / 'benchmarks' / 'latest.json'
+
+    # Git revision (may be abbreviated) or JSON file of the baseline (default: newest result of another revision)
+    baseline: str | None = None
+
+    # Regression, if the p50 grew more than this percentage (or more than the spread of the baseline)
+    threshold: float = 10.0
+
+    # Ignore differences below this value in milliseconds
+    min_delta: float = 0.005
+
+
+@app.command
+def benchmark_compare(*, args: BenchmarkCompareArgs):
+    """
+    Compare benchmark results against a baseline from the history and fail on regressions
+    """
+    current = load_result(args.current)
+    current_revision = current['metadata'].get('git_revision')
+
+    history_dir = get_history_dir()
+    baseline_path: Path | None
+    if args.baseline and Path(args.baseline).is_file():
+        baseline_path = Path(args.baseline)
+    else:
+        baseline_path = find_baseline(history_dir, revision=args.baseline, exclude_revision=current_revision)
+    if not baseline_path:
+        print(f'[bold red]No baseline {args.baseline or ""} found in: {history_dir}')
+        sys.exit(1)
+    baseline = load_result(baseline_path)
+    print(f'Compare {args.current} with {baseline_path}\n')
+
+    comparisons = compare_results(baseline, current, threshold_percent=args.threshold, min_delta_ms=args.min_delta)
+    report = format_comparison_report(
+        comparisons,
+        baseline_revision=baseline['metadata'].get('git_revision'),
+        current_revision=current_revision,
+    )
+    get_console().print(report, soft_wrap=True, markup=False)
+
+    if regressions := [comparison.name for comparison in comparisons if comparison.status == REGRESSION]:
+        print(f'\n[bold red]{len(regressions)} regression(s): {", ".join(regressions)}')
+        sys.exit(1)
+    print('\n[green]No regressions.')
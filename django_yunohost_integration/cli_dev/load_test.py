@@ -0,0 +1,85 @@
+import dataclasses
+import sys
+from pathlib import Path
+
+from rich import get_console, print
+
+from django_yunohost_integration.cli_dev import app
+from django_yunohost_integration.load_test import (
+    format_report,
+    get_free_port,
+    get_usernames,
+    run_gunicorn,
+    run_load_test,
+)
+from django_yunohost_integration.local_test import call_manage_commands, create_local_test
+from django_yunohost_integration.path_utils import get_project_root
+
+
+@dataclasses.dataclass
+class LoadTestArgs:
+    # Path to YunoHost package settings.py file (in "conf" directory)
+    setting: Path = get_project_root() / 'conf' / 'settings.py'
+
+    # Destination directory for the local test files
+    destination: Path = get_project_root() / 'local_test'
+
+    # Number of gunicorn worker processes
+    workers: int = 2
+
+    # Number of threads per gunicorn worker
+    threads: int = 1
+
+    # Number of concurrent HTTP clients
+    clients: int = 8
+
+    # Number of synthetic YunoHost users
+    users: int = 20
+
+    # Duration of the load test in seconds
+    duration: float = 10.0
+
+    # URL path to request
+    path: str = '/app_path/'
+
+    # Port for gunicorn (0 = choose a free port)
+    port: int = 0
+
+
+@app.command
+def load_test(*, args: LoadTestArgs):
+    """
+    Start gunicorn with the "local_test" files and load-test it with SSO authenticated clients
+    """
+    result = create_local_test(
+        django_settings_path=args.setting,
+        destination=args.destination,
+        runserver=False,
+    )
+    call_manage_commands(result.data_dir_path, ('migrate', '--no-input'))
+
+    port = args.port or get_free_port()
+    print(
+        f'\nStart gunicorn on port {port} with {args.workers} workers x {args.threads} threads,'
+        f' {args.clients} clients and {args.users} users for {args.duration} sec...'
+    )
+    with run_gunicorn(
+        result.data_dir_path,
+        port=port,
+        workers=args.workers,
+        threads=args.threads,
+        django_settings_name=result.django_settings_name,
+        extra_env={'ENV_TYPE': 'local'},  # Activate local_settings.py overwrites, e.g.: no https redirect
+    ):
+        load_test_result = run_load_test(
+            port=port,
+            path=args.path,
+            usernames=get_usernames(args.users),
+            clients=args.clients,
+            duration=args.duration,
+        )
+
+    print()
+    get_console().print(format_report(load_test_result), soft_wrap=True)
+    if not load_test_result.requests or load_test_result.errors:
+        sys.exit(1)
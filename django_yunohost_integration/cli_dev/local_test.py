@@ -17,6 +17,12 @@ class LocalTestArgs:
     # Start Django "runserver" after local test file creation?
     runserver: bool = True
 
+    # Run migrate, collectstatic etc. each in a own "manage.py" subprocess, instead of all in one process?
+    isolated: bool = False
+
+    # Serve "asgi.py" via uvicorn (with simulated SSOwat headers), instead of "runserver"?
+    asgi: bool = False
+
 
 @app.command
 def local_test(*, args: LocalTestArgs):
@@ -28,4 +34,6 @@ def local_test(*, args: LocalTestArgs):
         destination=args.destination,
         runserver=args.runserver,
         extra_replacements={'__DEBUG_ENABLED__': 'YES'},
+        isolated_commands=args.isolated,
+        asgi=args.asgi,
     )
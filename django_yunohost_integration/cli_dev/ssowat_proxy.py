@@ -0,0 +1,51 @@
+import dataclasses
+import logging
+
+from rich import print
+
+from django_yunohost_integration.cli_dev import app
+from django_yunohost_integration.sso_utils import JWT_COOKIE_NAME
+from django_yunohost_integration.ssowat_proxy import SIMULATE_USER_HEADER, SSOwatProxyServer
+
+
+@dataclasses.dataclass
+class SSOwatProxyArgs:
+    # Host and port of the proxy
+    host: str = '127.0.0.1'
+    port: int = 8080
+
+    # Host and port of the Django server, e.g.: "runserver" or gunicorn
+    upstream_host: str = '127.0.0.1'
+    upstream_port: int = 8000
+
+    # Simulated YunoHost user, if the request has no "X-Simulate-Ynh-User" header
+    user: str = 'test'
+
+    # Name of the JWT cookie (settings.YNH_JWT_COOKIE_NAME)
+    jwt_cookie_name: str = JWT_COOKIE_NAME
+
+
+@app.command
+def ssowat_proxy(*, args: SSOwatProxyArgs):
+    """
+    Start a local SSOwat stand-in proxy, that injects the YunoHost SSO headers and JWT cookie
+    """
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    server = SSOwatProxyServer(
+        (args.host, args.port),
+        upstream=(args.upstream_host, args.upstream_port),
+        default_username=args.user,
+        jwt_cookie_name=args.jwt_cookie_name,
+    )
+    print(
+        f'SSOwat proxy on http://{args.host}:{args.port}/'
+        f' -> http://{args.upstream_host}:{args.upstream_port}/ as user {args.user!r}'
+        f' (other users via "{SIMULATE_USER_HEADER}" header)'
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\nBye ;)')
+    finally:
+        server.server_close()
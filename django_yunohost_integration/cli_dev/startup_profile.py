@@ -0,0 +1,61 @@
+import dataclasses
+import sys
+from pathlib import Path
+
+from rich import print
+
+from django_yunohost_integration.cli_dev import app
+from django_yunohost_integration.local_test import create_local_test
+from django_yunohost_integration.path_utils import get_project_root
+from django_yunohost_integration.startup_profile import (
+    check_budget,
+    format_report,
+    get_startup_budget,
+    profile_startup,
+)
+
+
+@dataclasses.dataclass
+class StartupProfileArgs:
+    # Path to YunoHost package settings.py file (in "conf" directory)
+    setting: Path = get_project_root() / 'conf' / 'settings.py'
+
+    # Destination directory for the local test files
+    destination: Path = get_project_root() / 'local_test'
+
+    # Profile the startup n times and use the median of every phase
+    repeat: int = 3
+
+    # Number of slowest imports/packages/ready hooks to display
+    top: int = 15
+
+
+@app.command
+def startup_profile(*, args: StartupProfileArgs):
+    """
+    Profile the Django startup in "local_test" and check the budget from pyproject.toml
+    """
+    result = create_local_test(
+        django_settings_path=args.setting,
+        destination=args.destination,
+        runserver=False,
+    )
+    profile = profile_startup(
+        data_dir_path=result.data_dir_path,
+        django_settings_name=result.django_settings_name,
+        repeat=args.repeat,
+    )
+    print(format_report(profile, top=args.top))
+
+    budget = get_startup_budget()
+    if not budget:
+        print('\nNo \\[ynh-integration.startup_budget] in pyproject.toml, skip budget check.')
+        return
+
+    if errors := check_budget(profile, budget):
+        print('\n[bold red]Startup budget exceeded:')
+        for error in errors:
+            print(f' * {error}')
+        sys.exit(1)
+
+    print('\n[green]Startup budget ok.')
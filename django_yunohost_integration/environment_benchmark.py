@@ -0,0 +1,205 @@
+"""
+    Micro-benchmarks of the host environment: database, cache, file system and logging.
+
+    Helps to tell a slow host from slow app code.
+"""
+
+import contextlib
+import functools
+import logging
+import logging.handlers
+import os
+import tempfile
+import uuid
+from collections.abc import Generator
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+from django_yunohost_integration.benchmark_utils import measure, summarize
+
+
+logger = logging.getLogger(__name__)
+
+FSYNC_BLOCK_SIZE = 4 * 1024
+THROUGHPUT_SIZE = 8 * 1024 * 1024
+
+
+def benchmark_database(iterations: int, alias: str = 'default') -> dict:
+    connection = connections[alias]
+
+    def round_trip():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+
+    def simple_query():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM django_migrations')
+            cursor.fetchone()
+
+    return {
+        f'db.{alias}.round_trip': summarize(measure(round_trip, iterations)),
+        f'db.{alias}.simple_query': summarize(measure(simple_query, iterations)),
+    }
+
+
+def benchmark_cache(iterations: int, alias: str = 'default') -> dict:
+    cache = caches[alias]
+    key = f'ynh-benchmark-{uuid.uuid4().hex}'
+    value = 'x' * 1024
+    try:
+        results = {
+            f'cache.{alias}.set': summarize(measure(lambda: cache.set(key, value, timeout=60), iterations)),
+            f'cache.{alias}.get': summarize(measure(lambda: cache.get(key), iterations)),
+        }
+    finally:
+        cache.delete(key)
+    return results
+
+
+def benchmark_fsync(iterations: int, name: str, directory: Path) -> dict:
+    """
+    Measure the latency of "write 4 KiB + fsync" and the throughput of a bigger write with one fsync.
+    """
+    with tempfile.NamedTemporaryFile(dir=directory, prefix='.ynh_benchmark_') as temp_file:
+        block = os.urandom(FSYNC_BLOCK_SIZE)
+
+        def write_fsync():
+            temp_file.write(block)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        results = {f'fsync.{name}.4k': summarize(measure(write_fsync, iterations))}
+
+        data = os.urandom(THROUGHPUT_SIZE)
+
+        def write_throughput():
+            temp_file.seek(0)
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        summary = summarize(measure(write_throughput, iterations=max(iterations // 20, 3)))
+        summary['mb_per_sec'] = round(THROUGHPUT_SIZE / 1024 / 1024 / (summary['p50'] / 1000), 1)
+        results[f'fsync.{name}.8m'] = summary
+    return results
+
+
+def get_logging_handlers() -> dict:
+    """
+    Returns all configured logging handlers: name -> handler
+    """
+    loggers = [logging.getLogger()]
+    loggers += [item for item in logging.Logger.manager.loggerDict.values() if isinstance(item, logging.Logger)]
+    handlers: dict[str, logging.Handler] = {}
+    for logger_instance in loggers:
+        for handler in logger_instance.handlers:
+            handlers.setdefault(handler.name or repr(handler), handler)
+    return handlers
+
+
+@contextlib.contextmanager
+def benchmark_handler(handler: logging.Handler) -> Generator[logging.Handler | None, None, None]:
+    """
+    A copy of the handler with the same formatter and filters, that doesn't write into the real log:
+    File handlers write into a temp file in the same directory (so on the same file system),
+    streams (e.g. console) into /dev/null. Yields None for all other handlers, e.g. syslog or email.
+    """
+    if isinstance(handler, logging.FileHandler):
+        if isinstance(handler, logging.handlers.WatchedFileHandler):
+            handler_class: type[logging.FileHandler] = logging.handlers.WatchedFileHandler
+        else:
+            handler_class = logging.FileHandler
+        log_dir = Path(handler.baseFilename).parent
+        with tempfile.NamedTemporaryFile(dir=log_dir, prefix='.ynh_benchmark_', suffix='.log') as temp_file:
+            copy: logging.Handler = handler_class(temp_file.name, encoding=handler.encoding)
+            try:
+                copy.setFormatter(handler.formatter)
+                copy.filters = list(handler.filters)
+                yield copy
+            finally:
+                copy.close()
+    elif isinstance(handler, logging.StreamHandler):
+        with open(os.devnull, 'w') as devnull:
+            copy = logging.StreamHandler(devnull)
+            copy.setFormatter(handler.formatter)
+            copy.filters = list(handler.filters)
+            yield copy
+    else:
+        yield None
+
+
+def benchmark_logging(iterations: int, level: int = logging.INFO) -> tuple[dict, list[str]]:
+    """
+    Measure the cost of one log record in every configured handler.
+    Handlers with a higher level (e.g. "mail_admins") are skipped.
+    The records are not written into the real log, see: benchmark_handler()
+    """
+    results = {}
+    skipped = []
+    # Use the record factory, so that records have all attributes, e.g.: "request_id"
+    record = logging.getLogRecordFactory()(
+        name=__name__,
+        level=level,
+        pathname=__file__,
+        lineno=0,
+        msg='Logging handler benchmark by "benchmark_environment" command',
+        args=None,
+        exc_info=None,
+    )
+    for name, handler in get_logging_handlers().items():
+        if handler.level > level:
+            skipped.append(f'{name} (level {logging.getLevelName(handler.level)})')
+            continue
+
+        with benchmark_handler(handler) as copy:
+            if copy is None:
+                skipped.append(f'{name} ({type(handler).__name__} can not write into a temp file)')
+                continue
+            results[f'logging.{name}'] = summarize(measure(lambda: copy.handle(record), iterations))
+    return results, skipped
+
+
+def benchmark_environment(iterations: int = 100) -> dict:
+    """
+    Run all environment benchmarks and returns the results with some metadata.
+    """
+    connection = connections['default']
+    database = connection.vendor
+    if connection.vendor != 'sqlite':
+        database += f' ({connection.settings_dict["HOST"] or "local socket"})'
+
+    results = {}
+    errors = {}
+
+    benchmarks = [
+        ('database', lambda: benchmark_database(iterations)),
+        ('cache', lambda: benchmark_cache(iterations)),
+    ]
+    for name in ('DATA_DIR_PATH', 'INSTALL_DIR_PATH'):
+        if directory := getattr(settings, name, None):
+            benchmarks.append((name, functools.partial(benchmark_fsync, iterations, name, directory)))
+
+    for name, benchmark in benchmarks:
+        try:
+            results.update(benchmark())
+        except Exception as err:
+            logger.exception('Benchmark %s failed', name)
+            errors[name] = f'{type(err).__name__}: {err}'
+
+    logging_results, skipped_handlers = benchmark_logging(iterations)
+    results.update(logging_results)
+
+    return {
+        'metadata': {
+            'iterations': iterations,
+            'database': database,
+            'cache': caches['default'].__class__.__name__,
+            'skipped_logging_handlers': skipped_handlers,
+            'errors': errors,
+        },
+        'results': results,
+    }
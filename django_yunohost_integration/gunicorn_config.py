@@ -0,0 +1,279 @@
+"""
+    Generate a "gunicorn.conf.py" that fits the resources of the host.
+
+    Worker and thread counts are derived from the CPU count and the available RAM,
+    values from the config panel (settings.YNH_GUNICORN_*) take precedence, e.g.:
+
+        ./manage.py gunicorn_config
+        ./manage.py gunicorn_config --output /home/yunohost.app/$app/gunicorn.conf.py --bind 127.0.0.1:$port
+
+    The app is loaded once in the master process ("preload_app") and the workers are forked from it,
+    so the code pages are shared. The hooks below make sure that no database/cache connection is shared.
+
+    With "asgi" the "asgi.py" entry point is served by uvicorn workers (pip package: "uvicorn-worker"),
+    so long-polling and streaming responses don't block a whole worker process.
+"""
+
+import dataclasses
+import importlib.util
+import math
+import os
+from pathlib import Path
+
+from django.conf import settings
+
+from django_yunohost_integration.memory_report import format_size
+
+
+# Used, if the memory of a worker process is not measured:
+DEFAULT_WORKER_MEMORY = 100 * 1024 * 1024
+
+# Fraction of the available RAM the workers may use. YunoHost servers host many apps:
+MEMORY_FRACTION = 0.5
+
+# Max. threads per worker, more threads only wait on the GIL:
+MAX_THREADS = 4
+
+DEFAULT_BIND = '127.0.0.1:8000'
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_REQUESTS = 1000
+KEEPALIVE = 5  # Should be less than the keepalive_timeout of nginx (default: 75 sec.)
+
+WSGI_APP = 'django.core.wsgi:get_wsgi_application()'
+ASGI_APP = 'asgi:application'  # conf/asgi.py
+ASGI_WORKER_CLASS = 'uvicorn_worker.UvicornWorker'
+
+
+@dataclasses.dataclass
+class HostResources:
+    cpu_count: int
+    memory_available: int  # in bytes
+
+
+def is_asgi_worker_installed() -> bool:
+    return importlib.util.find_spec(ASGI_WORKER_CLASS.partition('.')[0]) is not None
+
+
+def get_cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not Linux
+        return os.cpu_count() or 1
+
+
+def get_memory_available(meminfo_path: Path = Path('/proc/meminfo')) -> int:
+    """
+    Returns "MemAvailable" in bytes. Fallback to the total physical memory, if /proc/meminfo is missing.
+    """
+    try:
+        meminfo = meminfo_path.read_text()
+    except OSError:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    for line in meminfo.splitlines():
+        key, _, value = line.partition(':')
+        if key == 'MemAvailable':
+            return int(value.split()[0]) * 1024  # in kB
+    raise ValueError(f'No "MemAvailable" in {meminfo_path}')
+
+
+def get_host_resources() -> HostResources:
+    return HostResources(cpu_count=get_cpu_count(), memory_available=get_memory_available())
+
+
+@dataclasses.dataclass
+class GunicornConfig:
+    bind: str
+    workers: int
+    threads: int
+    timeout: int
+    max_requests: int
+    max_requests_jitter: int
+    keepalive: int = KEEPALIVE
+    preload_app: bool = True
+    asgi: bool = False
+
+    @property
+    def worker_class(self) -> str:
+        if self.asgi:
+            return ASGI_WORKER_CLASS
+        return 'gthread' if self.threads > 1 else 'sync'
+
+    @property
+    def app(self) -> str:
+        return ASGI_APP if self.asgi else WSGI_APP
+
+    @property
+    def graceful_timeout(self) -> int:
+        return self.timeout
+
+
+def calculate_config(
+    resources: HostResources,
+    *,
+    worker_memory: int = DEFAULT_WORKER_MEMORY,
+    bind: str = DEFAULT_BIND,
+    workers: int | None = None,
+    threads: int | None = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    max_requests: int = DEFAULT_MAX_REQUESTS,
+    asgi: bool = False,
+) -> GunicornConfig:
+    """
+    The CPU count gives the wanted concurrency (the classic "2 x CPUs + 1"), the RAM limits the worker processes.
+    Concurrency that doesn't fit into RAM as process is served by threads, which cost much less memory.
+    An ASGI worker serves many connections in its event loop, so one worker per CPU is enough and no threads are used.
+
+    >>> config = calculate_config(HostResources(cpu_count=4, memory_available=8 * 1024**3))
+    >>> config.workers, config.threads, config.worker_class
+    (9, 1, 'sync')
+    >>> config = calculate_config(HostResources(cpu_count=4, memory_available=400 * 1024**2))
+    >>> config.workers, config.threads, config.worker_class
+    (2, 4, 'gthread')
+    >>> config.max_requests, config.max_requests_jitter
+    (1000, 100)
+    >>> config = calculate_config(HostResources(cpu_count=4, memory_available=8 * 1024**3), asgi=True)
+    >>> config.workers, config.threads, config.worker_class
+    (4, 1, 'uvicorn_worker.UvicornWorker')
+    """
+    concurrency = resources.cpu_count if asgi else resources.cpu_count * 2 + 1
+    if workers is None:
+        max_workers = int(resources.memory_available * MEMORY_FRACTION // worker_memory)
+        workers = max(1, min(concurrency, max_workers))
+    if asgi:
+        threads = 1
+    elif threads is None:
+        threads = max(1, min(MAX_THREADS, math.ceil(concurrency / workers)))
+    return GunicornConfig(
+        bind=bind,
+        workers=workers,
+        threads=threads,
+        timeout=timeout,
+        max_requests=max_requests,
+        # Don't restart all workers at the same time:
+        max_requests_jitter=max_requests // 10,
+        asgi=asgi,
+    )
+
+
+def get_config_from_settings(
+    resources: HostResources,
+    worker_memory: int = DEFAULT_WORKER_MEMORY,
+    asgi: bool | None = None,
+    bind: str | None = None,
+    workers: int | None = None,
+    threads: int | None = None,
+) -> GunicornConfig:
+    """
+    The given arguments (e.g. from the command line) take precedence over the settings.
+    Values that are given nowhere are calculated from the host resources.
+    """
+    if asgi is None:
+        asgi = bool(getattr(settings, 'YNH_GUNICORN_ASGI', False))
+    if workers is None:
+        workers = getattr(settings, 'YNH_GUNICORN_WORKERS', None)
+    if threads is None:
+        threads = getattr(settings, 'YNH_GUNICORN_THREADS', None)
+    return calculate_config(
+        resources,
+        worker_memory=worker_memory,
+        bind=bind or getattr(settings, 'YNH_GUNICORN_BIND', None) or DEFAULT_BIND,
+        workers=workers,
+        threads=threads,
+        timeout=getattr(settings, 'YNH_GUNICORN_TIMEOUT', None) or DEFAULT_TIMEOUT,
+        max_requests=getattr(settings, 'YNH_GUNICORN_MAX_REQUESTS', None) or DEFAULT_MAX_REQUESTS,
+        asgi=asgi,
+    )
+
+
+def get_uvicorn_args(config: GunicornConfig) -> list[str]:
+    """
+    The same values as command line arguments for a standalone uvicorn (without gunicorn as process manager).
+
+    >>> config = calculate_config(HostResources(cpu_count=2, memory_available=8 * 1024**3), asgi=True)
+    >>> get_uvicorn_args(config)  # doctest: +NORMALIZE_WHITESPACE
+    ['asgi:application', '--host=127.0.0.1', '--port=8000', '--workers=2', '--timeout-keep-alive=5',
+     '--limit-max-requests=1000', '--timeout-graceful-shutdown=30']
+    >>> config.bind = 'unix:/run/app/app.sock'
+    >>> get_uvicorn_args(config)[1]
+    '--uds=/run/app/app.sock'
+    """
+    args = [ASGI_APP]
+    if config.bind.startswith('unix:'):
+        args.append(f'--uds={config.bind.removeprefix("unix:")}')
+    else:
+        host, _, port = config.bind.rpartition(':')
+        args += [f'--host={host}', f'--port={port}']
+    args += [
+        f'--workers={config.workers}',
+        f'--timeout-keep-alive={config.keepalive}',
+        # uvicorn has no jitter, but restarts only the worker that reached the limit:
+        f'--limit-max-requests={config.max_requests}',
+        f'--timeout-graceful-shutdown={config.graceful_timeout}',
+    ]
+    return args
+
+
+def render_config(
+    config: GunicornConfig,
+    *,
+    resources: HostResources,
+    worker_memory: int,
+    chdir: Path,
+    django_settings_name: str = 'settings',
+) -> str:
+    lines = [
+        '# Generated by: ./manage.py gunicorn_config',
+        (
+            f'# Host: {resources.cpu_count} CPUs, {format_size(resources.memory_available)} RAM available,'
+            f' {format_size(worker_memory)} per worker'
+        ),
+        '',
+        'from django_yunohost_integration.gunicorn_config import post_fork, when_ready  # noqa: F401',
+        '',
+        f'wsgi_app = {config.app!r}',
+        f'chdir = {str(chdir)!r}',
+        f'raw_env = [{f"DJANGO_SETTINGS_MODULE={django_settings_name}"!r}]',
+        f'bind = {config.bind!r}',
+        '',
+        f'worker_class = {config.worker_class!r}',
+        f'workers = {config.workers!r}',
+        f'threads = {config.threads!r}',
+        '',
+        '# Restart the workers from time to time, to free leaked memory:',
+        f'max_requests = {config.max_requests!r}',
+        f'max_requests_jitter = {config.max_requests_jitter!r}',
+        '',
+        f'keepalive = {config.keepalive!r}',
+        f'timeout = {config.timeout!r}',
+        f'graceful_timeout = {config.graceful_timeout!r}',
+        '',
+        '# Load the app before forking the workers:',
+        f'preload_app = {config.preload_app!r}',
+        '',
+    ]
+    return '\n'.join(lines)
+
+
+def close_connections() -> None:
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    caches.close_all()
+
+
+def when_ready(server) -> None:
+    """
+    gunicorn hook, called in the master process after the app is preloaded and before the workers are forked:
+    Close the connections opened while loading the app, so the workers don't inherit them.
+    """
+    close_connections()
+
+
+def post_fork(server, worker) -> None:
+    """
+    gunicorn hook, called in the new worker process:
+    Every worker must open its own database and cache connections.
+    """
+    close_connections()
@@ -0,0 +1,222 @@
+"""
+    Load-test a real gunicorn with the "local_test" files.
+
+    The clients send the same headers/cookies as SSOwat and nginx: "Ynh-User", Basic auth and the JWT cookie.
+    Every client thread uses one keep-alive connection and holds the session cookie of its user,
+    so the first request of a user logs in and all following requests use the existing session.
+"""
+
+import collections
+import contextlib
+import dataclasses
+import http.client
+import http.cookies
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+from django_yunohost_integration.benchmark_utils import format_summary_table, summarize
+from django_yunohost_integration.sso_utils import JWT_COOKIE_NAME, get_sso_headers
+
+
+SESSION_COOKIE_NAME = 'sessionid'
+CONNECTION_ERROR = 'connection error'
+
+# Wait time in seconds after a connection error, doubled with every further error up to the maximum:
+RETRY_DELAY = 0.05
+MAX_RETRY_DELAY = 1.0
+
+
+def get_usernames(count: int, prefix: str = 'load-test-user') -> list[str]:
+    """
+    >>> get_usernames(3)
+    ['load-test-user-0', 'load-test-user-1', 'load-test-user-2']
+    """
+    return [f'{prefix}-{number}' for number in range(count)]
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float) -> None:
+    end_time = time.monotonic() + timeout
+    while time.monotonic() < end_time:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with code {process.returncode}')
+        with contextlib.suppress(OSError), socket.create_connection(('127.0.0.1', port), timeout=1):
+            return
+        time.sleep(0.1)
+    raise TimeoutError(f'gunicorn not listening on port {port} after {timeout} sec.')
+
+
+@contextlib.contextmanager
+def run_gunicorn(
+    data_dir_path: Path,
+    *,
+    port: int,
+    workers: int,
+    threads: int,
+    django_settings_name: str = 'settings',
+    extra_env: dict | None = None,
+    timeout: float = 60,
+) -> Generator[subprocess.Popen, None, None]:
+    """
+    Start gunicorn in "local_test/opt_yunohost/" and terminate it on exit.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': django_settings_name, **(extra_env or {})}
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'gunicorn',
+            f'--bind=127.0.0.1:{port}',
+            f'--workers={workers}',
+            f'--threads={threads}',
+            '--log-level=warning',
+            'django.core.wsgi:get_wsgi_application()',
+        ],
+        cwd=data_dir_path,
+        env=env,
+    )
+    try:
+        wait_for_port(port, process, timeout=timeout)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@dataclasses.dataclass
+class LoadTestResult:
+    duration: float = 0.0
+    latencies: list = dataclasses.field(default_factory=list)
+    status_counts: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.status_counts.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.status_counts.items() if not str(status).startswith(('2', '3')))
+
+    @property
+    def requests_per_sec(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+
+def run_client(
+    result: LoadTestResult,
+    lock: threading.Lock,
+    *,
+    port: int,
+    path: str,
+    usernames: list[str],
+    end_time: float,
+    jwt_cookie_name: str,
+) -> None:
+    """
+    One client: Request the path as the given users in turn, until the end time is reached.
+    """
+    users: list[tuple[dict, dict]] = [(get_sso_headers(username, jwt_cookie_name), {}) for username in usernames]
+    latencies = []
+    status_counts: collections.Counter[int | str] = collections.Counter()
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    index = 0
+    retry_delay = RETRY_DELAY
+    while time.monotonic() < end_time:
+        headers, cookies = users[index % len(users)]
+        index += 1
+        headers = headers.copy()
+        if cookies:
+            headers['Cookie'] += ''.join(f'; {key}={value}' for key, value in cookies.items())
+
+        start_time = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            status_counts[CONNECTION_ERROR] += 1
+            connection.close()
+            # Don't hammer a server that is down or overloaded, and don't count the same outage a thousand times:
+            time.sleep(max(min(retry_delay, end_time - time.monotonic()), 0))
+            retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+            continue
+        retry_delay = RETRY_DELAY
+        latencies.append(time.perf_counter() - start_time)
+        status_counts[response.status] += 1
+
+        for header in response.headers.get_all('Set-Cookie') or ():
+            morsel = http.cookies.SimpleCookie(header).get(SESSION_COOKIE_NAME)
+            if morsel:
+                cookies[SESSION_COOKIE_NAME] = morsel.value
+
+    connection.close()
+    with lock:
+        result.latencies += latencies
+        result.status_counts.update(status_counts)
+
+
+def run_load_test(
+    *,
+    port: int,
+    path: str,
+    usernames: list[str],
+    clients: int,
+    duration: float,
+    jwt_cookie_name: str = JWT_COOKIE_NAME,
+) -> LoadTestResult:
+    """
+    Drive concurrent client threads against the server. The users are distributed round-robin to the clients.
+    """
+    result = LoadTestResult()
+    lock = threading.Lock()
+    start_time = time.monotonic()
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(result, lock),
+            kwargs={
+                'port': port,
+                'path': path,
+                'usernames': usernames[number::clients] or usernames,
+                'end_time': start_time + duration,
+                'jwt_cookie_name': jwt_cookie_name,
+            },
+            daemon=True,
+        )
+        for number in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.duration = time.monotonic() - start_time
+    return result
+
+
+def format_report(result: LoadTestResult) -> str:
+    lines = [
+        f'{result.requests} requests in {result.duration:.1f} sec.: {result.requests_per_sec:.1f} requests/sec.',
+        f'{result.errors} errors',
+        '',
+        'Responses by status:',
+    ]
+    for status, count in sorted(result.status_counts.items(), key=lambda item: str(item[0])):
+        lines.append(f'  {count:>8} {status}')
+    if result.latencies:
+        lines += ['', 'Latency in milliseconds:', format_summary_table({'request': summarize(result.latencies)})]
+    return '\n'.join(lines)
@@ -2,10 +2,17 @@
     Create a YunoHost package local test
 """
 
+import contextlib
 import dataclasses
+import functools
+import hashlib
+import importlib.util
+import json
 import logging
 import os
+import re
 import sys
+import time
 import tomllib
 from pathlib import Path
 
@@ -29,6 +36,10 @@ DEFAULT_REPLACEMENTS = {
     '__DEFAULT_FROM_EMAIL__': 'default-from-email@test.tld',
 }
 
+YUNOHOST_TEST_RUNNER = 'django_yunohost_integration.test_runner.YunohostTestRunner'
+
+ASGI_APP_FACTORY = 'django_yunohost_integration.asgi_utils:get_local_test_application'
+
 
 def call_manage_py(data_dir_path, *args, extra_env=None):
     """
@@ -44,21 +55,188 @@ def call_manage_py(data_dir_path, *args, extra_env=None):
     )
 
 
-def copy_patch(src_file, replaces, data_dir_path):
-    dst_file = data_dir_path / src_file.name
-    print(f'{src_file} -> {dst_file}')
+def call_uvicorn(data_dir_path: Path, *args, extra_env=None):
+    """
+    Serve "local_test/asgi.py" via uvicorn, with the SSOwat headers of a simulated user.
+    """
+    if importlib.util.find_spec('uvicorn') is None:
+        raise RuntimeError('Please install "uvicorn" to serve the local test files via ASGI')
+    assert_is_file(data_dir_path / 'asgi.py')
+    verbose_check_call(
+        sys.executable,
+        '-m',
+        'uvicorn',
+        '--factory',
+        ASGI_APP_FACTORY,
+        *args,
+        extra_env=extra_env,
+        cwd=data_dir_path,
+    )
+
+
+@dataclasses.dataclass
+class ManageStep:
+    args: tuple[str, ...]
+    duration: float
+
+
+def setup_django(data_dir_path: Path, django_settings_name: str = 'settings') -> None:
+    """
+    Configure Django in this process for the "local_test" settings, like "local_test/manage.py" does.
+    """
+    os.environ['DJANGO_SETTINGS_MODULE'] = django_settings_name
+    data_dir_str = str(data_dir_path)
+    if data_dir_str not in sys.path:
+        sys.path.insert(0, data_dir_str)
+    django.setup()
+
+
+def call_manage_commands(
+    data_dir_path: Path,
+    *commands: tuple[str, ...],
+    django_settings_name: str = 'settings',
+    extra_env: dict | None = None,
+    isolated: bool = False,
+) -> list[ManageStep]:
+    """
+    Run a sequence of management commands for "local_test" and print the duration of each step, e.g.:
+        call_manage_commands(data_dir_path, ('migrate', '--no-input'), ('collectstatic', '--no-input'))
+
+    All commands run via call_command() in this process, so Django and the settings are loaded only once.
+    Only with isolated=True every command runs in a own "manage.py" subprocess, see: call_manage_py()
+    """
+    steps = []
+    if not isolated:
+        if extra_env:
+            os.environ.update(extra_env)
+        setup_django(data_dir_path, django_settings_name)
+
+        from django.core.management import call_command
+
+    for args in commands:
+        print(f'\n[bold]+ manage.py {" ".join(args)}')
+        start_time = time.monotonic()
+        if isolated:
+            call_manage_py(data_dir_path, *args, extra_env=extra_env)
+        else:
+            with contextlib.chdir(data_dir_path):
+                call_command(*args)
+        steps.append(ManageStep(args=args, duration=time.monotonic() - start_time))
+
+    for step in steps:
+        print(f'{step.duration:>8.2f} sec. manage.py {" ".join(step.args)}')
+    return steps
+
+
+# e.g.: "__DATA_DIR__" or "__DB_NAME__", but not Python's "__file__"
+PLACEHOLDER_RE = re.compile(r'\b__[A-Z][A-Z0-9_]*__\b')
 
-    with src_file.open('r') as f:
-        content = f.read()
+# Placeholders that are only replaced via "extra_replacements", if needed. Don't report them as unresolved:
+OPTIONAL_PLACEHOLDERS = frozenset({'__EXTRA_REPLACEMENT__'})
 
-    if replaces:
-        for old, new in replaces.items():
-            if old in content:
-                print(f' * Replace "{old}" -> "{new}"')
-                content = content.replace(old, new)
+MANIFEST_FILE_NAME = 'create_local_test_manifest.json'
 
-    with dst_file.open('w') as f:
-        f.write(content)
+
+@functools.lru_cache(maxsize=8)
+def get_replacement_pattern(keys: tuple[str, ...]) -> re.Pattern:
+    # Longest first, so that e.g. "__DATA_DIR__" is never matched as a part of a longer key:
+    return re.compile('|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True)))
+
+
+def render(content: str, replaces: dict | None) -> str:
+    """
+    Replace all keys in one pass.
+
+    >>> render("NAME = '__APP__' # __APP__ in __PATH__", {'__APP__': 'foo', '__PATH__': '/bar'})
+    "NAME = 'foo' # foo in /bar"
+    >>> render('__A__ __AB__', {'__A__': '__AB__', '__AB__': 'x'})
+    '__AB__ x'
+    """
+    if not replaces:
+        return content
+    pattern = get_replacement_pattern(tuple(replaces))
+    return pattern.sub(lambda match: replaces[match.group(0)], content)
+
+
+def find_unresolved_placeholders(content: str) -> list[str]:
+    """
+    >>> find_unresolved_placeholders("A = '__FOO__'; B = __file__; C = '__FOO__ __BAR_1__'")
+    ['__BAR_1__', '__FOO__']
+    """
+    return sorted(set(PLACEHOLDER_RE.findall(content)))
+
+
+def get_hash(*values: str) -> str:
+    hasher = hashlib.sha256()
+    for value in values:
+        hasher.update(value.encode())
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+class LocalTestManifest:
+    """
+    Source and output hashes of all generated "local_test" files, to skip unchanged files.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            self.entries = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def is_up_to_date(self, dst_file: Path, input_hash: str) -> bool:
+        entry = self.entries.get(str(dst_file))
+        if not entry or entry['input_hash'] != input_hash:
+            return False
+        try:
+            # Also recreate modified or deleted files:
+            return get_hash(dst_file.read_text()) == entry['output_hash']
+        except FileNotFoundError:
+            return False
+
+    def get_unresolved(self, dst_file: Path) -> list[str]:
+        return self.entries.get(str(dst_file), {}).get('unresolved', [])
+
+    def update(self, dst_file: Path, input_hash: str, content: str, unresolved: list[str]) -> None:
+        self.entries[str(dst_file)] = {
+            'input_hash': input_hash,
+            'output_hash': get_hash(content),
+            'unresolved': unresolved,
+        }
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+
+
+def write_file(
+    dst_file: Path,
+    source: str,
+    replaces: dict | None = None,
+    manifest: LocalTestManifest | None = None,
+) -> bool:
+    """
+    Render the source into the destination file, if source, replacements or the destination file has changed.
+    Returns True, if the file was written.
+    """
+    input_hash = get_hash(source, json.dumps(replaces or {}, sort_keys=True))
+    if manifest and manifest.is_up_to_date(dst_file, input_hash):
+        return False
+
+    content = render(source, replaces)
+    dst_file.write_text(content)
+    if manifest:
+        manifest.update(dst_file, input_hash, content, unresolved=find_unresolved_placeholders(content))
+    return True
+
+
+def copy_patch(src_file, replaces, data_dir_path, manifest: LocalTestManifest | None = None) -> bool:
+    dst_file = data_dir_path / src_file.name
+    written = write_file(dst_file, source=src_file.read_text(), replaces=replaces, manifest=manifest)
+    if written:
+        print(f'{src_file} -> {dst_file}')
+    return written
 
 
 @dataclasses.dataclass
@@ -72,6 +250,8 @@ def create_local_test(
     destination: Path,
     runserver: bool = False,
     extra_replacements: dict | None = None,
+    isolated_commands: bool = False,
+    asgi: bool = False,
 ) -> CreateResults:
     django_settings_path = django_settings_path.resolve()
     assert_is_file(django_settings_path)
@@ -119,11 +299,13 @@ def create_local_test(
         '__APP__': 'app_name',
         '__PATH__': 'app_path',
         '__DOMAIN__': '127.0.0.1',
+        '__YNH_CURRENT_HOST__': '127.0.0.1',
         'django.db.backends.postgresql': 'django.db.backends.sqlite3',
         '__DB_NAME__': str(destination / 'test_db.sqlite'),
         '__DB_USER__': 'test_db_user',
         '__DB_PWD__': 'test_db_pwd',
         'django_redis.cache.RedisCache': 'django.core.cache.backends.dummy.DummyCache',
+        '__REDIS_DB__': '0',
         "'syslog'": "'console'",  # Log to console for local test
         #
         # config_panel.toml settings:
@@ -153,8 +335,16 @@ def create_local_test(
     assert_is_file(conf_path / 'settings.py')
     assert_is_file(conf_path / 'urls.py')
 
-    for src_file in conf_path.glob('*.py'):
-        copy_patch(src_file=src_file, replaces=REPLACES, data_dir_path=data_dir_path)
+    local_test_manifest = LocalTestManifest(destination / MANIFEST_FILE_NAME)
+    dst_files = []
+    unchanged = 0
+    for src_file in sorted(conf_path.glob('*.py')):
+        written = copy_patch(
+            src_file=src_file, replaces=REPLACES, data_dir_path=data_dir_path, manifest=local_test_manifest
+        )
+        if not written:
+            unchanged += 1
+        dst_files.append(data_dir_path / src_file.name)
 
     local_settings_path = data_dir_path / 'local_settings.py'
 
@@ -170,28 +360,47 @@ def create_local_test(
     assert_is_file(local_settings_source)
     local_settings = f'# source file: {local_settings_source}\n'
     local_settings += local_settings_source.read_text()
-    local_settings_path.write_text(local_settings)
+    if not write_file(local_settings_path, source=local_settings, manifest=local_test_manifest):
+        unchanged += 1
+    dst_files.append(local_settings_path)
+    local_test_manifest.save()
+
+    if unchanged:
+        print(f'{unchanged} files are unchanged.')
+    for dst_file in dst_files:
+        unresolved = set(local_test_manifest.get_unresolved(dst_file)) - OPTIONAL_PLACEHOLDERS
+        if unresolved:
+            print(f'[yellow]Unresolved placeholders in {dst_file}: {", ".join(sorted(unresolved))}')
 
     if runserver:
-        call_manage_py(data_dir_path, 'migrate', '--no-input')
-        call_manage_py(data_dir_path, 'collectstatic', '--no-input')
-        call_manage_py(data_dir_path, 'create_superuser', '--username="test"')
+        call_manage_commands(
+            data_dir_path,
+            ('migrate', '--no-input'),
+            ('collectstatic', '--no-input'),
+            ('create_superuser', '--username=test'),
+            django_settings_name=django_settings_name,
+            isolated=isolated_commands,
+        )
 
         os.environ['DJANGO_SETTINGS_MODULE'] = django_settings_name
 
-        # All environment variables are passed to Django's "runnserver" ;)
-        # "Simulate" SSOwat authentication, by set "http headers"
-        # Still missing is the 'SSOwAuthUser' cookie,
-        # but this is ignored, if settings.DEBUG=True ;)
-        os.environ['HTTP_AUTH_USER'] = 'test'
-        os.environ['HTTP_REMOTE_USER'] = 'test'
+        if asgi:
+            # The SSOwat headers are added by the ASGI middleware, see: asgi_utils.SSOwatHeadersMiddleware
+            server_func = functools.partial(call_uvicorn, data_dir_path)
+        else:
+            # All environment variables are passed to Django's "runnserver" ;)
+            # "Simulate" SSOwat authentication, by set "http headers"
+            # Still missing is the 'SSOwAuthUser' cookie,
+            # but this is ignored, if settings.DEBUG=True ;)
+            os.environ['HTTP_AUTH_USER'] = 'test'
+            os.environ['HTTP_REMOTE_USER'] = 'test'
+
+            os.environ['HTTP_AUTHORIZATION'] = generate_basic_auth(username='test', password='test123')
 
-        os.environ['HTTP_AUTHORIZATION'] = generate_basic_auth(username='test', password='test123')
+            server_func = functools.partial(call_manage_py, data_dir_path, 'runserver')
 
         try:
-            call_manage_py(
-                data_dir_path, 'runserver', extra_env={'ENV_TYPE': 'local'}  # Activate local_settings.py overwrites
-            )
+            server_func(extra_env={'ENV_TYPE': 'local'})  # Activate local_settings.py overwrites
         except KeyboardInterrupt:
             print('\nBye ;)')
     else:
@@ -242,11 +451,7 @@ class SetupLocalYunohostTest:
             os.environ.update(extra_env)
 
         # Add ".../local_test/opt_yunohost/" to sys.path, so that "settings" is importable:
-        final_home_str = str(self.last_result.data_dir_path)
-        if final_home_str not in sys.path:
-            sys.path.insert(0, final_home_str)
-
-        django.setup()
+        setup_django(self.last_result.data_dir_path)
 
         return self.last_result
 
@@ -287,6 +492,13 @@ def run_django_test_cli(*, argv: list | None = None, exit_after_run: bool = True
 
     setup_local_yunohost_test()
 
+    if not any(arg.startswith('--testrunner') for arg in argv):
+        from django.conf import settings
+
+        if settings.TEST_RUNNER == 'django.test.runner.DiscoverRunner':
+            # Use test database templates and a own "local_test" environment per parallel test worker:
+            argv = [*argv, f'--testrunner={YUNOHOST_TEST_RUNNER}']
+
     test_command = DjangoTestCommand()
     test_command.run_from_argv(argv)
     if exit_after_run:
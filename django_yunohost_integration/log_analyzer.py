@@ -0,0 +1,226 @@
+"""
+    Stream-parse the app log file (incl. rotated and gzipped archives) with constant memory.
+
+    The lines are parsed with a regex, build from the "verbose" log format, e.g.:
+
+        2025-01-01 12:00:00,123 ERROR 0f2a... django_yunohost_integration.sso_auth.auth_middleware
+        auth_middleware.process_request 'HTTP_AUTHORIZATION' missing!
+
+    Only lines with a possible interesting message are matched against the regex,
+    all other lines are just counted by time and level.
+    Lines that don't start with a timestamp (e.g. tracebacks of multi-line records) are only counted.
+"""
+
+import collections
+import dataclasses
+import gzip
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+
+DEFAULT_FORMAT = '{asctime} {levelname} {request_id} {name} {module}.{funcName} {message}'
+
+FIELD_PATTERNS = {
+    'asctime': r'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}',
+    'levelname': r'[A-Z]+',
+    'module': r'\w+',
+    'funcName': r'[\w<>]+',
+    'message': r'.*',
+}
+DEFAULT_FIELD_PATTERN = r'\S+'
+
+# Time window -> length of the "asctime" prefix, e.g.: "2025-01-01 12" for "hour":
+WINDOWS = {
+    'day': 10,
+    'hour': 13,
+    '10min': 15,
+    'minute': 16,
+}
+
+ERROR_LEVELS = frozenset({'ERROR', 'CRITICAL'})
+
+# Auth failure reason -> message regex, see: sso_auth.auth_middleware and yunohost.ynh_jwt
+AUTH_FAILURES = (
+    ('missing_cookie', re.compile(r"^'[^']+' cookie missing!$")),
+    ('missing_basic_auth', re.compile(r"^'[^']+' missing!$")),
+    ('unsupported_auth_scheme', re.compile(r"^'[^']+' with '[^']+' not supported$")),
+    ('basic_auth_username_mismatch', re.compile(r"^'[^']+' mismatch: username=")),
+    ('jwt_username_mismatch', re.compile(r'^Mismatch: jwt_username=')),
+    ('axes_lockout', re.compile(r'^AXES: Locking out ')),
+)
+MISSING_HEADER_RE = re.compile(r"^(?:Missing '(?P<header>[^']+)' header|'(?P<auth_header>[^']+)' missing!)$")
+LOGIN_RE = re.compile(r'^Remote user "(?P<username>.+)" was logged in$')
+
+
+def build_line_regex(log_format: str = DEFAULT_FORMAT) -> re.Pattern:
+    """
+    Build a regex from a "{"-style logging format string.
+
+    >>> pattern = build_line_regex('{asctime} {levelname} {name} {message}')
+    >>> pattern.match('2025-01-01 12:00:00,123 INFO axes.apps AXES: BEGIN').groupdict()
+    {'asctime': '2025-01-01 12:00:00,123', 'levelname': 'INFO', 'name': 'axes.apps', 'message': 'AXES: BEGIN'}
+    """
+    parts = re.split(r'\{(\w+)\}', log_format)
+    regex = ''
+    for index, part in enumerate(parts):
+        if index % 2:
+            regex += f'(?P<{part}>{FIELD_PATTERNS.get(part, DEFAULT_FIELD_PATTERN)})'
+        else:
+            regex += re.escape(part)
+    return re.compile(f'^{regex}$')
+
+
+def get_line_regexes(log_format: str = DEFAULT_FORMAT) -> list[re.Pattern]:
+    """
+    Returns the regex of the format and, as fallback for older log files, one without "request_id".
+    """
+    regexes = [build_line_regex(log_format)]
+    if ' {request_id}' in log_format:
+        regexes.append(build_line_regex(log_format.replace(' {request_id}', '')))
+    return regexes
+
+
+def get_log_files(log_file_path: Path) -> list[Path]:
+    """
+    Returns the log file and all rotated siblings (e.g.: "app.log.1", "app.log.2.gz", "app.log-20250101.gz"),
+    the oldest first.
+    """
+    paths = [
+        path
+        for path in log_file_path.parent.glob(f'{log_file_path.name}*')
+        if path == log_file_path or path.name[len(log_file_path.name)] in '.-'
+    ]
+    return sorted(paths, key=lambda path: path.stat().st_mtime)
+
+
+def iter_lines(paths: Iterable[Path]) -> Iterator[str]:
+    for path in paths:
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as file:
+            for line in file:
+                yield line.rstrip('\n')
+
+
+@dataclasses.dataclass
+class LogSummary:
+    lines: int = 0
+    unparsed_lines: int = 0
+    first_time: str | None = None
+    last_time: str | None = None
+    levels: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+    auth_failures: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+    missing_headers: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+    logins: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+    window_records: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+    window_errors: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+
+    def error_rates(self) -> list[tuple[str, int, int, float]]:
+        """
+        Returns: (window, records, errors, error rate) sorted by time
+        """
+        return [
+            (window, records, self.window_errors[window], self.window_errors[window] / records)
+            for window, records in sorted(self.window_records.items())
+        ]
+
+
+def parse_line_prefix(line: str) -> tuple[str, str] | None:
+    """
+    Fast path for every line: Returns "asctime" and "levelname" without a regex, or None for e.g. tracebacks.
+
+    >>> parse_line_prefix('2025-01-01 12:00:00,123 INFO - axes.apps apps.initialize AXES: BEGIN')
+    ('2025-01-01 12:00:00,123', 'INFO')
+    >>> parse_line_prefix('  File "foo.py", line 1, in <module>') is None
+    True
+    """
+    if len(line) < 25 or line[4] != '-' or line[10] != ' ' or line[19] != ',' or line[23] != ' ':
+        return None
+    level_end = line.find(' ', 24)
+    if level_end == -1:
+        return None
+    return line[:23], line[24:level_end]
+
+
+def analyze_lines(lines: Iterable[str], regexes: list[re.Pattern], window: str = 'hour') -> LogSummary:
+    """
+    Aggregate the log lines. Only counters are stored, so the memory usage doesn't grow with the log size.
+    The (slow) regexes are only used for the few lines that may contain interesting messages.
+    """
+    window_length = WINDOWS[window]
+    summary = LogSummary()
+    for line in lines:
+        summary.lines += 1
+        if not (prefix := parse_line_prefix(line)):
+            summary.unparsed_lines += 1
+            continue
+
+        asctime, level = prefix
+        if summary.first_time is None:
+            summary.first_time = asctime
+        summary.last_time = asctime
+
+        summary.levels[level] += 1
+        window_key = asctime[:window_length]
+        summary.window_records[window_key] += 1
+        if level in ERROR_LEVELS:
+            summary.window_errors[window_key] += 1
+
+        if level == 'INFO':
+            if 'was logged in' not in line:
+                continue
+        elif level not in ('WARNING', 'ERROR'):
+            continue
+
+        for regex in regexes:
+            if match := regex.match(line):
+                break
+        else:
+            continue
+        message = match['message']
+
+        if login_match := LOGIN_RE.match(message):
+            summary.logins[login_match['username']] += 1
+            continue
+
+        if header_match := MISSING_HEADER_RE.match(message):
+            summary.missing_headers[header_match['header'] or header_match['auth_header']] += 1
+
+        for reason, regex in AUTH_FAILURES:
+            if regex.match(message):
+                summary.auth_failures[reason] += 1
+                break
+
+    return summary
+
+
+def analyze_log_files(paths: Iterable[Path], log_format: str = DEFAULT_FORMAT, window: str = 'hour') -> LogSummary:
+    if not log_format.startswith('{asctime} {levelname} '):
+        raise ValueError(f'Log format must start with "{{asctime}} {{levelname}} ", got: {log_format!r}')
+    return analyze_lines(iter_lines(paths), regexes=get_line_regexes(log_format), window=window)
+
+
+def format_summary(summary: LogSummary, top: int = 10) -> str:
+    lines = [
+        f'{summary.lines} lines ({summary.unparsed_lines} not parsed, e.g.: tracebacks)',
+        f'Time range: {summary.first_time} - {summary.last_time}',
+        'Levels: ' + ', '.join(f'{level}={count}' for level, count in summary.levels.most_common()),
+    ]
+
+    lines.append('\nAuth failures by reason:')
+    for reason, count in summary.auth_failures.most_common():
+        lines.append(f'  {count:>8} {reason}')
+
+    lines.append('\nMissing headers:')
+    for header, count in summary.missing_headers.most_common():
+        lines.append(f'  {count:>8} {header}')
+
+    lines.append(f'\nTop {top} users by logins:')
+    for username, count in summary.logins.most_common(top):
+        lines.append(f'  {count:>8} {username}')
+
+    lines.append('\nError rate per time window:')
+    for window, records, errors, rate in summary.error_rates():
+        lines.append(f'  {window:<16} {records:>8} records {errors:>6} errors {rate:7.2%}')
+
+    return '\n'.join(lines)
@@ -0,0 +1,66 @@
+"""
+    Summarize the app log file and its rotated archives
+
+    Can be called e.g.:
+        ./manage.py analyze_log
+        ./manage.py analyze_log --window day --top 20
+        ./manage.py analyze_log --log-file /var/log/$app/$app.log.1 --no-rotated
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from django_yunohost_integration.log_analyzer import (
+    DEFAULT_FORMAT,
+    WINDOWS,
+    analyze_log_files,
+    format_summary,
+    get_log_files,
+)
+
+
+class Command(BaseCommand):
+    help = 'Aggregate auth failures, missing headers, logins and error rates from the app log files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log-file',
+            type=Path,
+            default=getattr(settings, 'LOG_FILE_PATH', None),
+            help='Log file to analyze (default: settings.LOG_FILE_PATH)',
+        )
+        parser.add_argument(
+            '--no-rotated',
+            action='store_true',
+            help='Analyze only the given log file, without rotated archives (e.g. "*.log.1", "*.log.2.gz")',
+        )
+        parser.add_argument(
+            '--window',
+            default='hour',
+            choices=tuple(WINDOWS),
+            help='Time window for the error rate (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of users with the most logins to display (default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        log_file_path = options['log_file']
+        # A str, e.g. from settings.LOG_FILE_PATH or call_command(log_file=...):
+        if not log_file_path or not Path(log_file_path).is_file():
+            raise CommandError(f'Log file not found: {log_file_path}')
+        log_file_path = Path(log_file_path)
+
+        paths = [log_file_path] if options['no_rotated'] else get_log_files(log_file_path)
+        for path in paths:
+            self.stdout.write(f'Read: {path}')
+
+        log_format = settings.LOGGING.get('formatters', {}).get('verbose', {}).get('format', DEFAULT_FORMAT)
+        summary = analyze_log_files(paths, log_format=log_format, window=options['window'])
+        self.stdout.write('')
+        self.stdout.write(format_summary(summary, top=options['top']))
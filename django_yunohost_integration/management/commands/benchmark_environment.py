@@ -0,0 +1,61 @@
+"""
+    Micro-benchmark the host: database, cache, fsync in DATA_DIR_PATH/INSTALL_DIR_PATH and logging handlers
+
+    Can be called e.g.:
+        ./manage.py benchmark_environment
+        ./manage.py benchmark_environment --iterations 500 --json /tmp/benchmark.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from django.core.management import BaseCommand
+
+from django_yunohost_integration.benchmark_utils import format_summary_table
+from django_yunohost_integration.environment_benchmark import benchmark_environment
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, not {number}')
+    return number
+
+
+class Command(BaseCommand):
+    help = 'Measure database, cache, file system and logging latency of this host'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=positive_int,
+            default=100,
+            help='Number of measurements per benchmark (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--json',
+            type=Path,
+            help='Save the results as JSON into this file',
+        )
+
+    def handle(self, *args, **options):
+        data = benchmark_environment(iterations=options['iterations'])
+        metadata = data['metadata']
+
+        self.stdout.write(f'Database: {metadata["database"]}')
+        self.stdout.write(f'Cache: {metadata["cache"]}')
+        self.stdout.write(f'Iterations: {metadata["iterations"]}, all times in milliseconds:\n')
+        self.stdout.write(format_summary_table(data['results']))
+
+        for name, summary in data['results'].items():
+            if 'mb_per_sec' in summary:
+                self.stdout.write(f'{name} throughput: {summary["mb_per_sec"]} MB/s')
+        for handler in metadata['skipped_logging_handlers']:
+            self.stdout.write(f'Skipped logging handler: {handler}')
+        for name, error in metadata['errors'].items():
+            self.stderr.write(f'{name} benchmark failed: {error}')
+
+        if json_path := options['json']:
+            json_path.write_text(json.dumps(data, indent=2))
+            self.stdout.write(f'\nResults saved to: {json_path}')
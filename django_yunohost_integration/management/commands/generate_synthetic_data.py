@@ -0,0 +1,67 @@
+"""
+    Generate synthetic SSO users, groups, django-axes logs and sessions for benchmarks
+
+    Can be called e.g.:
+        ./manage.py generate_synthetic_data
+        ./manage.py generate_synthetic_data --users 50000 --sessions 10000 --seed 42
+        ./manage.py generate_synthetic_data --delete
+"""
+
+import dataclasses
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from django_yunohost_integration.synthetic_data import (
+    SyntheticDataConfig,
+    delete_synthetic_data,
+    generate_synthetic_data,
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate a production-like dataset of SSO users, groups, axes logs and sessions with bulk_create()'
+
+    def add_arguments(self, parser):
+        defaults = SyntheticDataConfig()
+        for field in dataclasses.fields(SyntheticDataConfig):
+            parser.add_argument(
+                f'--{field.name.replace("_", "-")}',
+                type=field.type,
+                default=getattr(defaults, field.name),
+                help='(default: %(default)s)',
+            )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete the generated data with the given prefix (instead of creating new data)',
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete existing generated data with the given prefix before creating new data',
+        )
+
+    def handle(self, *args, **options):
+        config = SyntheticDataConfig(
+            **{field.name: options[field.name] for field in dataclasses.fields(SyntheticDataConfig)}
+        )
+
+        if options['delete'] or options['replace']:
+            for label, count in delete_synthetic_data(prefix=config.prefix).items():
+                self.stdout.write(f'Deleted {count} {label}')
+            if options['delete']:
+                return
+
+        self.stdout.write(f'Generate data in {connection.vendor} database with seed {config.seed}...')
+        try:
+            result = generate_synthetic_data(config)
+        except ValueError as err:
+            raise CommandError(f'{err} (Use --replace or --delete)') from err
+
+        for name, count in result.counts.items():
+            duration = result.durations[name]
+            rate = count / duration if duration else 0
+            self.stdout.write(f'{count:>10} {name:<20} in {duration:6.2f}s ({rate:,.0f}/s)')
+        for skipped in result.skipped:
+            self.stdout.write(f'Skipped {skipped}')
@@ -0,0 +1,111 @@
+"""
+    Generate a "gunicorn.conf.py" for the CPU count and available RAM of this host
+
+    Can be called e.g.:
+        ./manage.py gunicorn_config
+        ./manage.py gunicorn_config --bind 127.0.0.1:8123 --output -
+        ./manage.py gunicorn_config --measure
+        ./manage.py gunicorn_config --asgi
+"""
+
+import importlib.util
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from django_yunohost_integration.gunicorn_config import (
+    DEFAULT_WORKER_MEMORY,
+    get_config_from_settings,
+    get_host_resources,
+    is_asgi_worker_installed,
+    render_config,
+)
+from django_yunohost_integration.memory_report import collect_memory_report, format_size
+
+
+class Command(BaseCommand):
+    help = 'Generate a gunicorn.conf.py with worker/thread counts derived from the CPU count and available RAM'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=Path(settings.DATA_DIR_PATH) / 'gunicorn.conf.py',
+            help='Destination file, "-" for stdout (default: %(default)s)',
+        )
+        parser.add_argument('--bind', help='Override settings.YNH_GUNICORN_BIND')
+        parser.add_argument('--workers', type=int, help='Override settings.YNH_GUNICORN_WORKERS')
+        parser.add_argument(
+            '--threads', type=int, help='Override settings.YNH_GUNICORN_THREADS (always 1 with ASGI workers)'
+        )
+        parser.add_argument(
+            '--asgi',
+            action='store_true',
+            default=None,
+            help='Serve asgi.py with uvicorn workers (default: settings.YNH_GUNICORN_ASGI)',
+        )
+        parser.add_argument(
+            '--measure',
+            action='store_true',
+            help=(
+                'Measure the memory of a worker after a warm-up request in a new process,'
+                f' instead of assuming {format_size(DEFAULT_WORKER_MEMORY)}'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        settings_module = settings.SETTINGS_MODULE
+        # The directory that must be in sys.path to import the settings module:
+        settings_dir = Path(importlib.util.find_spec(settings_module).origin).parents[settings_module.count('.')]
+
+        worker_memory = DEFAULT_WORKER_MEMORY
+        if options['measure']:
+            path_url = getattr(settings, 'PATH_URL', '')
+            report = collect_memory_report(
+                settings_dir=settings_dir,
+                django_settings_name=settings_module,
+                path=f'/{path_url}/' if path_url else '/',
+                trace=False,
+            )
+            last_phase = report.phases[-1]
+            # With "preload_app" the workers share the code pages, so the unique memory is what a worker costs:
+            worker_memory = last_phase.uss or last_phase.rss
+            self.stderr.write(f'Measured worker memory: {format_size(worker_memory)}')
+
+        resources = get_host_resources()
+        config = get_config_from_settings(
+            resources,
+            worker_memory=worker_memory,
+            asgi=options['asgi'],
+            bind=options['bind'],
+            workers=options['workers'],
+            threads=options['threads'],
+        )
+        if config.asgi:
+            if not is_asgi_worker_installed():
+                raise CommandError(
+                    f'ASGI needs the worker class {config.worker_class!r}: Please install "uvicorn-worker"'
+                    ' or disable settings.YNH_GUNICORN_ASGI'
+                )
+            if options['threads'] and options['threads'] > 1:
+                raise CommandError(
+                    'An ASGI worker serves all connections in its event loop: --threads can not be used with ASGI'
+                )
+
+        content = render_config(
+            config,
+            resources=resources,
+            worker_memory=worker_memory,
+            chdir=settings_dir,
+            django_settings_name=settings_module,
+        )
+        if str(options['output']) == '-':
+            self.stdout.write(content, ending='')
+            return
+
+        output = Path(options['output'])
+        output.write_text(content)
+        self.stderr.write(
+            f'{output} written: {config.workers} workers x {config.threads} threads ({config.worker_class})'
+            f' on {resources.cpu_count} CPUs with {format_size(resources.memory_available)} RAM available'
+        )
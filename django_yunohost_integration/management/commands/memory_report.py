@@ -0,0 +1,58 @@
+"""
+    Report the memory footprint of one worker process per startup phase
+
+    Can be called e.g.:
+        ./manage.py memory_report
+        ./manage.py memory_report --path /app_path/ --top 30 --focus django_example
+        ./manage.py memory_report --no-trace
+"""
+
+import importlib.util
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from django_yunohost_integration.memory_report import DEFAULT_FOCUS, collect_memory_report, format_report
+
+
+class Command(BaseCommand):
+    help = 'Report RSS/USS and the top allocating modules of a fresh worker process per startup phase'
+
+    def add_arguments(self, parser):
+        path_url = getattr(settings, 'PATH_URL', '')
+        parser.add_argument(
+            '--path',
+            default=f'/{path_url}/' if path_url else '/',
+            help='URL path of the warm-up request (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of top allocating modules to display (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--focus',
+            action='append',
+            help=f'Module prefix to report separately (default: {", ".join(DEFAULT_FOCUS)})',
+        )
+        parser.add_argument(
+            '--no-trace',
+            action='store_true',
+            help='Only measure RSS/USS, without the (slow) tracemalloc run',
+        )
+
+    def handle(self, *args, **options):
+        settings_module = settings.SETTINGS_MODULE
+        # The directory that must be in sys.path to import the settings module:
+        settings_dir = Path(importlib.util.find_spec(settings_module).origin).parents[settings_module.count('.')]
+
+        self.stdout.write(f'Boot "{settings_module}" from {settings_dir} in new processes...\n')
+        report = collect_memory_report(
+            settings_dir=settings_dir,
+            django_settings_name=settings_module,
+            path=options['path'],
+            trace=not options['no_trace'],
+        )
+        self.stdout.write(format_report(report, top=options['top'], focus=tuple(options['focus'] or DEFAULT_FOCUS)))
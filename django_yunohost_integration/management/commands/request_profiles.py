@@ -0,0 +1,73 @@
+"""
+    List and summarize request profiles stored by the ProfilingMiddleware
+
+    Can be called e.g.:
+        ./manage.py request_profiles
+        ./manage.py request_profiles --last --limit 30
+        ./manage.py request_profiles 20250101_120000_000_GET_app_path_1234ms.pstats --sort tottime
+"""
+
+import io
+import pstats
+from datetime import datetime
+
+from django.core.management import BaseCommand, CommandError
+
+from django_yunohost_integration.observability.profiling import get_profile_files, get_profiles_dir
+
+
+class Command(BaseCommand):
+    help = 'List and summarize request profiles (stored by ProfilingMiddleware)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'name',
+            nargs='?',
+            help='File name of the profile to summarize',
+        )
+        parser.add_argument(
+            '--last',
+            action='store_true',
+            help='Summarize the newest profile',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of functions to display (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--sort',
+            default='cumulative',
+            choices=('cumulative', 'tottime', 'ncalls'),
+            help='Sort the functions by (default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        profile_files = get_profile_files()
+
+        if options['last']:
+            if not profile_files:
+                raise CommandError(f'No profiles found in {get_profiles_dir()}')
+            file_path = profile_files[0]
+        elif options['name']:
+            file_path = get_profiles_dir() / options['name']
+            if not file_path.is_file():
+                raise CommandError(f'Profile not found: {file_path}')
+        else:
+            self.list_profiles(profile_files)
+            return
+
+        self.stdout.write(f'Profile: {file_path}\n')
+        # pstats prints fragments, but OutputWrapper.write() adds a line ending to each one:
+        buffer = io.StringIO()
+        stats = pstats.Stats(str(file_path), stream=buffer)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(buffer.getvalue(), ending='')
+
+    def list_profiles(self, profile_files):
+        self.stdout.write(f'{len(profile_files)} profiles in {get_profiles_dir()}:')
+        for file_path in profile_files:
+            stat = file_path.stat()
+            modified = datetime.fromtimestamp(stat.st_mtime).isoformat(sep=' ', timespec='seconds')
+            self.stdout.write(f'{modified} {stat.st_size / 1024:8.1f} KiB  {file_path.name}')
@@ -0,0 +1,272 @@
+"""
+    Memory footprint of one worker process, e.g.: of a gunicorn worker.
+
+    A fresh Python process boots the Django project the same way gunicorn does
+    and takes a "tracemalloc" snapshot and the RSS/USS after every phase:
+
+        start     - Python interpreter started
+        settings  - settings module imported
+        setup     - django.setup() done (incl. AppConfig.ready() hooks)
+        urls      - URLconf and all views imported
+        request   - first (warm-up) request handled
+
+    RSS/USS are read from /proc/self/smaps_rollup (Linux only).
+"""
+
+import dataclasses
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+
+PHASES = ('start', 'settings', 'setup', 'urls', 'request')
+
+RESULT_PREFIX = 'YNH_MEMORY_REPORT:'
+
+# Number of frames stored by tracemalloc, needed to skip the import machinery frames:
+TRACEBACK_LIMIT = 10
+
+# Modules of special interest in every report:
+DEFAULT_FOCUS = (
+    'django_yunohost_integration.sso_auth',
+    'django_yunohost_integration.yunohost_utils',
+    'axes',
+)
+
+
+@dataclasses.dataclass
+class PhaseMemory:
+    name: str
+    rss: int  # in bytes
+    uss: int | None  # in bytes, None if not available
+    traced: int | None  # in bytes, allocated by Python since the "start" phase, None if not traced
+
+
+def get_process_memory() -> tuple[int, int | None]:
+    """
+    Returns RSS and USS (unique set size: private memory) of the current process in bytes.
+    """
+    try:
+        smaps_rollup = Path('/proc/self/smaps_rollup').read_text()
+    except OSError:
+        # Not Linux: Use the max. RSS as fallback (in KiB on Linux, in Bytes on macOS)
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return (max_rss if sys.platform == 'darwin' else max_rss * 1024), None
+
+    values = {}
+    for line in smaps_rollup.splitlines()[1:]:
+        key, _, value = line.partition(':')
+        values[key] = int(value.split()[0]) * 1024
+    return values['Rss'], values['Private_Clean'] + values['Private_Dirty']
+
+
+def filename_to_module(filename: str, search_paths: list[str]) -> str:
+    """
+    >>> filename_to_module('/venv/site-packages/axes/handlers/database.py', ['/venv/site-packages'])
+    'axes.handlers.database'
+    >>> filename_to_module('/venv/site-packages/axes/__init__.py', ['/venv/site-packages'])
+    'axes'
+    >>> filename_to_module('<frozen importlib._bootstrap>', ['/venv/site-packages'])
+    '<frozen importlib._bootstrap>'
+    """
+    for search_path in search_paths:
+        if search_path and filename.startswith(search_path + os.sep):
+            module = filename[len(search_path) + 1 :].removesuffix('.py').replace(os.sep, '.')
+            return module.removesuffix('.__init__')
+    return filename
+
+
+def get_allocating_filename(traceback: tracemalloc.Traceback) -> str:
+    """
+    Returns the file name of the most recent frame that is not part of the import machinery.
+    So the memory of code objects etc. is accounted to the module that imports them.
+    """
+    for frame in reversed(traceback):
+        if not frame.filename.startswith('<frozen '):
+            return frame.filename
+    return traceback[-1].filename
+
+
+def get_module_allocations() -> dict:
+    """
+    Returns the currently traced memory grouped by module: module name -> bytes
+    """
+    snapshot = tracemalloc.take_snapshot()
+    search_paths = sorted((os.path.abspath(p) for p in sys.path if p), key=len, reverse=True)
+    file_sizes: dict[str, int] = {}
+    for stat in snapshot.statistics('traceback'):
+        filename = get_allocating_filename(stat.traceback)
+        file_sizes[filename] = file_sizes.get(filename, 0) + stat.size
+    file_sizes.pop(__file__, None)  # Don't count the allocations of this report
+
+    modules: dict[str, int] = {}
+    for filename, size in file_sizes.items():
+        module = filename_to_module(filename, search_paths)
+        modules[module] = modules.get(module, 0) + size
+    return modules
+
+
+def probe(path: str, trace: bool) -> None:
+    """
+    Will be called in a new Python process by collect_memory_report()
+    Tracing allocations increases the memory usage, so RSS/USS and allocations are measured in separate runs.
+    """
+    if trace:
+        tracemalloc.start(TRACEBACK_LIMIT)
+
+    phases = []
+
+    def add_phase(name):
+        rss, uss = get_process_memory()
+        traced = tracemalloc.get_traced_memory()[0] if trace else None
+        phases.append(PhaseMemory(name=name, rss=rss, uss=uss, traced=traced))
+
+    add_phase('start')
+
+    from django.conf import settings
+
+    _ = settings.INSTALLED_APPS  # import the settings module
+    add_phase('settings')
+
+    import django
+
+    django.setup()
+    add_phase('setup')
+
+    from django.urls import get_resolver
+
+    _ = get_resolver().url_patterns  # import the URLconf
+    add_phase('urls')
+
+    from django.core.handlers.wsgi import WSGIHandler
+
+    status = []
+    hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '443',
+        'HTTP_HOST': hosts[0] if hosts else 'localhost',
+        'wsgi.url_scheme': 'https',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    response = WSGIHandler()(environ, start_response=lambda status_line, headers: status.append(status_line))
+    response.close()
+    add_phase('request')
+
+    result = {
+        'status_code': int(status[0].split()[0]),
+        'phases': [dataclasses.asdict(phase) for phase in phases],
+        'modules': get_module_allocations() if trace else {},
+    }
+    print(RESULT_PREFIX + json.dumps(result))
+
+
+@dataclasses.dataclass
+class MemoryReport:
+    phases: list[PhaseMemory]  # RSS/USS from the run without tracemalloc, traced memory from the other run
+    modules: dict  # module name -> traced bytes after the warm-up request
+    status_code: int  # of the warm-up request
+
+    def top_modules(self, count: int = 20) -> list[tuple[str, int]]:
+        return sorted(self.modules.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def focus_size(self, prefix: str) -> int:
+        """
+        Traced bytes of all modules with the given prefix.
+        """
+        return sum(size for module, size in self.modules.items() if module == prefix or module.startswith(f'{prefix}.'))
+
+
+def run_probe(settings_dir: Path, django_settings_name: str, path: str, trace: bool) -> dict:
+    env = os.environ.copy()
+    env['DJANGO_SETTINGS_MODULE'] = django_settings_name
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (str(settings_dir), env.get('PYTHONPATH'))))
+    process = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            f'from django_yunohost_integration.memory_report import probe;probe({path!r}, trace={trace!r})',
+        ],
+        cwd=settings_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line.removeprefix(RESULT_PREFIX))
+    raise RuntimeError(f'Memory report failed (exit code {process.returncode}):\n{process.stderr[-2000:]}')
+
+
+def collect_memory_report(
+    settings_dir: Path,
+    django_settings_name: str = 'settings',
+    path: str = '/',
+    trace: bool = True,
+) -> MemoryReport:
+    """
+    Run the probe in new processes: One for RSS/USS and, if "trace" is set, one with tracemalloc.
+    """
+    untraced = run_probe(settings_dir, django_settings_name, path, trace=False)
+    phases = [PhaseMemory(**phase) for phase in untraced['phases']]
+    if not trace:
+        return MemoryReport(phases=phases, modules={}, status_code=untraced['status_code'])
+
+    traced = run_probe(settings_dir, django_settings_name, path, trace=True)
+    for phase, traced_phase in zip(phases, traced['phases']):
+        phase.traced = traced_phase['traced']
+    return MemoryReport(phases=phases, modules=traced['modules'], status_code=untraced['status_code'])
+
+
+def format_size(size: int | None) -> str:
+    """
+    >>> format_size(3 * 1024 * 1024)
+    '3.0 MiB'
+    >>> format_size(-2048)
+    '-2.0 KiB'
+    >>> format_size(None)
+    'n/a'
+    """
+    if size is None:
+        return 'n/a'
+    if abs(size) < 1024 * 1024:
+        return f'{size / 1024:.1f} KiB'
+    return f'{size / 1024 / 1024:.1f} MiB'
+
+
+def format_report(report: MemoryReport, top: int = 20, focus: tuple[str, ...] = DEFAULT_FOCUS) -> str:
+    lines = [f'{"phase":<10} {"RSS":>10} {"USS":>10} {"traced":>10} {"traced diff":>12}']
+    previous_traced = 0
+    for phase in report.phases:
+        traced_diff = None if phase.traced is None else phase.traced - previous_traced
+        lines.append(
+            f'{phase.name:<10} {format_size(phase.rss):>10} {format_size(phase.uss):>10}'
+            f' {format_size(phase.traced):>10} {format_size(traced_diff):>12}'
+        )
+        if phase.traced is not None:
+            previous_traced = phase.traced
+    lines.append(f'(warm-up request status code: {report.status_code})')
+
+    if not report.modules:
+        return '\n'.join(lines)
+
+    lines.append(f'\nTop {top} allocating modules:')
+    for module, size in report.top_modules(top):
+        lines.append(f'  {format_size(size):>10} {module}')
+
+    if focus:
+        lines.append('\nFocused modules:')
+        for prefix in focus:
+            lines.append(f'  {format_size(report.focus_size(prefix)):>10} {prefix}')
+
+    return '\n'.join(lines)
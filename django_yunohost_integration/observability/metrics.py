@@ -0,0 +1,420 @@
+"""
+    Prometheus text-format metrics for YunoHost Django apps.
+
+    Every process collects its values in memory and flushes them as "{pid}-{random}.json" file
+    into a shared directory (default: DATA_DIR_PATH/metrics/). The metrics view
+    merges the files of all gunicorn workers, so the result is not per-process.
+
+    Activate it via settings, e.g.:
+
+        YNH_METRICS_ENABLED = True
+        YNH_METRICS_TOKEN = '<random-string>'  # Prometheus: "authorization: credentials: <random-string>"
+        MIDDLEWARE.insert(0, 'django_yunohost_integration.observability.metrics.MetricsMiddleware')
+
+    and add the view to your urls.py, e.g.:
+
+        path(f'{settings.PATH_URL}/metrics/', metrics_view, name='ynh-metrics'),
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils.cache import add_never_cache_headers
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds between two flushes of the process values into the shared directory:
+FLUSH_INTERVAL = 5
+
+ARCHIVE_FILE_NAME = 'archive.json'
+LOCK_FILE_NAME = 'metrics.lock'
+
+KNOWN_HTTP_METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+
+
+def is_enabled() -> bool:
+    return bool(getattr(settings, 'YNH_METRICS_ENABLED', False))
+
+
+def get_metrics_dir() -> Path:
+    """
+    Directory shared by all workers. Fallback to "DATA_DIR_PATH/metrics/"
+    """
+    metrics_dir = getattr(settings, 'YNH_METRICS_DIR', None)
+    if metrics_dir is None:
+        metrics_dir = Path(settings.DATA_DIR_PATH) / 'metrics'
+    metrics_dir = Path(metrics_dir)
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    return metrics_dir
+
+
+def format_value(value: float) -> str:
+    """
+    >>> format_value(3.0)
+    '3'
+    >>> format_value(0.25)
+    '0.25'
+    >>> format_value(float('inf'))
+    '+Inf'
+    """
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    r"""
+    >>> escape_label_value('a"b\\c')
+    'a\\"b\\\\c'
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_sample(name: str, labels: tuple, value: float) -> str:
+    """
+    >>> format_sample('foo_total', (('method', 'GET'), ('status', '200')), 5)
+    'foo_total{method="GET",status="200"} 5'
+    >>> format_sample('bar_total', (), 1.5)
+    'bar_total 1.5'
+    """
+    if labels:
+        label_str = ','.join(f'{key}="{escape_label_value(val)}"' for key, val in labels)
+        name = f'{name}{{{label_str}}}'
+    return f'{name} {format_value(value)}'
+
+
+class Metric:
+    type_name: str | None = None
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str, labelnames: tuple = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def get_labels(self, labels: dict) -> tuple:
+        assert set(labels) == set(self.labelnames), f'{self.name}: {labels=} does not match {self.labelnames=}'
+        return tuple((key, str(labels[key])) for key in self.labelnames)
+
+    def sample_names(self) -> tuple:
+        return (self.name,)
+
+    def sort_key(self, sample_key: tuple):
+        name, labels = sample_key
+        return self.sample_names().index(name), labels
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.registry.add(self.name, self.get_labels(labels), amount)
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, *args, buckets: tuple = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = (*sorted(buckets), float('inf'))
+
+    def observe(self, value: float, **labels) -> None:
+        labels = self.get_labels(labels)
+        samples = [
+            (f'{self.name}_bucket', (*labels, ('le', format_value(bucket))))
+            for bucket in self.buckets
+            if value <= bucket
+        ]
+        self.registry.add_many(
+            [
+                *((sample_name, sample_labels, 1) for sample_name, sample_labels in samples),
+                (f'{self.name}_sum', labels, value),
+                (f'{self.name}_count', labels, 1),
+            ]
+        )
+
+    def sample_names(self) -> tuple:
+        return (f'{self.name}_bucket', f'{self.name}_sum', f'{self.name}_count')
+
+    def sort_key(self, sample_key: tuple):
+        name, labels = sample_key
+        if name.endswith('_bucket'):
+            *labels, (_, le) = labels
+            return 0, tuple(labels), float(le)
+        return self.sample_names().index(name), labels, 0
+
+
+class MetricsRegistry:
+    """
+    Holds the metric definitions and the values of the current process.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._values = {}
+        self._pid = None
+        self._file_name = None
+        self._dirty = False
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), **kwargs) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, **kwargs))
+
+    def _register(self, metric: Metric):
+        assert metric.name not in self.metrics, f'Metric {metric.name!r} already registered'
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add(self, name: str, labels: tuple, amount: float) -> None:
+        self.add_many([(name, labels, amount)])
+
+    def add_many(self, samples: list) -> None:
+        if not is_enabled():
+            return
+        with self._lock:
+            self._check_process()
+            for name, labels, amount in samples:
+                key = (name, labels)
+                self._values[key] = self._values.get(key, 0) + amount
+            self._dirty = True
+
+    def _check_process(self) -> None:
+        """
+        Reset the values after a fork (e.g.: gunicorn "preload_app") and start the flush thread.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        self._pid = pid
+        # A reused PID must not overwrite the file of a dead process, before its values are archived:
+        self._file_name = f'{pid}-{secrets.token_hex(4)}.json'
+        self._values = {}
+        thread = threading.Thread(target=self._flush_loop, name='ynh-metrics-flush', daemon=True)
+        thread.start()
+
+    def _flush_loop(self) -> None:
+        pid = self._pid
+        while pid == self._pid:
+            time.sleep(FLUSH_INTERVAL)
+            if self._dirty:
+                try:
+                    self.flush()
+                except Exception:
+                    # Keep the flush thread alive:
+                    logger.exception('Flushing the metrics failed')
+
+    def flush(self) -> None:
+        """
+        Write the values of the current process into the shared directory.
+        """
+        if not is_enabled():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            data = [[name, labels, value] for (name, labels), value in self._values.items()]
+            self._dirty = False
+
+        try:
+            metrics_dir = get_metrics_dir()
+            file_path = metrics_dir / self._file_name
+            temp_path = metrics_dir / f'{self._file_name}.tmp'
+            temp_path.write_text(json.dumps(data))
+            temp_path.replace(file_path)  # atomic
+        except OSError as err:
+            # The values are totals: They are written with the next flush
+            self._dirty = True
+            logger.warning('Can not write the metrics of process %i: %s', self._pid, err)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values = {}
+            self._dirty = False
+
+    def collect(self) -> dict:
+        """
+        Merge the values of all processes from the shared directory.
+        Files from dead processes are merged into the archive file.
+        """
+        self.flush()
+
+        metrics_dir = get_metrics_dir()
+        with (metrics_dir / LOCK_FILE_NAME).open('w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                archive_path = metrics_dir / ARCHIVE_FILE_NAME
+                archive = read_values(archive_path)
+                values = dict(archive)
+                archive_changed = False
+                for file_path in metrics_dir.glob('*.json'):
+                    if file_path.name == ARCHIVE_FILE_NAME:
+                        continue
+                    file_values = read_values(file_path)
+                    merge_values(values, file_values)
+                    pid = int(file_path.stem.partition('-')[0])  # "{pid}-{random}.json"
+                    if not pid_alive(pid):
+                        merge_values(archive, file_values)
+                        archive_changed = True
+                        file_path.unlink()
+
+                if archive_changed:
+                    write_values(archive_path, archive)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return values
+
+    def render(self) -> str:
+        values = self.collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines += [
+                f'# HELP {metric.name} {metric.documentation}',
+                f'# TYPE {metric.name} {metric.type_name}',
+            ]
+            sample_names = metric.sample_names()
+            sample_keys = sorted((key for key in values if key[0] in sample_names), key=metric.sort_key)
+            for name, labels in sample_keys:
+                lines.append(format_sample(name, labels, values[(name, labels)]))
+        return '\n'.join(lines) + '\n'
+
+
+def pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, but owned by another user
+    return True
+
+
+def read_values(file_path: Path) -> dict:
+    try:
+        data = json.loads(file_path.read_text())
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        logger.exception('Ignore broken metrics file: %s', file_path)
+        return {}
+    return {(name, tuple(tuple(label) for label in labels)): value for name, labels, value in data}
+
+
+def write_values(file_path: Path, values: dict) -> None:
+    temp_path = file_path.with_suffix('.tmp')
+    temp_path.write_text(json.dumps([[name, labels, value] for (name, labels), value in values.items()]))
+    temp_path.replace(file_path)
+
+
+def merge_values(values: dict, other: dict) -> None:
+    for key, value in other.items():
+        values[key] = values.get(key, 0) + value
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+
+HTTP_REQUESTS = registry.counter(
+    'ynh_http_requests_total',
+    'Total number of handled HTTP requests.',
+    labelnames=('method', 'status'),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    'ynh_http_request_duration_seconds',
+    'HTTP request latency in seconds.',
+    labelnames=('method',),
+)
+SSO_AUTH = registry.counter(
+    'ynh_sso_auth_total',
+    'SSOwat authentication outcomes of SSOwatRemoteUserMiddleware.',
+    labelnames=('outcome',),
+)
+SSO_USERS_CREATED = registry.counter(
+    'ynh_sso_users_created_total',
+    'Users created by SSOwatUserBackend.',
+)
+SETUP_USER_DURATION = registry.histogram(
+    'ynh_setup_user_duration_seconds',
+    'Duration of the settings.YNH_SETUP_USER hook in seconds.',
+)
+
+
+def count_axes_lockout(sender, **kwargs) -> None:
+    SSO_AUTH.inc(outcome='lockout')
+
+
+def connect_signals() -> None:
+    try:
+        from axes.signals import user_locked_out
+    except ImportError:
+        logger.debug('Django Axes not installed: Axes lockouts will not be counted.')
+    else:
+        user_locked_out.connect(count_axes_lockout, dispatch_uid='ynh_metrics_axes_lockout')
+
+
+class MetricsMiddleware:
+    """
+    Count all requests and measure the latency.
+    Should be the first middleware, to cover all other middlewares.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        if not is_enabled():
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        method = request.method if request.method in KNOWN_HTTP_METHODS else 'other'
+        HTTP_REQUESTS.inc(method=method, status=response.status_code)
+        HTTP_REQUEST_DURATION.observe(duration, method=method)
+        return response
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Expose the merged metrics of all workers in Prometheus text format.
+    Access is allowed with "Authorization: Bearer {settings.YNH_METRICS_TOKEN}" or for superusers.
+    """
+    if not is_enabled():
+        raise Http404('Metrics not enabled')
+
+    token = getattr(settings, 'YNH_METRICS_TOKEN', None)
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if token and authorization.startswith('Bearer '):
+        allowed = secrets.compare_digest(authorization.removeprefix('Bearer '), token)
+    else:
+        allowed = request.user.is_superuser
+
+    if not allowed:
+        logger.warning('Deny metrics access for user: %s', request.user)
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+
+    response = HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+    add_never_cache_headers(response)
+    return response
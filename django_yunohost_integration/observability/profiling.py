@@ -0,0 +1,136 @@
+"""
+    Sampled per-request profiler that dumps ".pstats" files into the app data directory.
+
+    A request is profiled with the probability of settings.YNH_PROFILING_SAMPLE_RATE
+    or if a superuser sends the "X-Ynh-Profile" header. The profile is only stored if
+    the request takes longer than settings.YNH_PROFILING_MIN_DURATION seconds
+    (requests forced via header are always stored).
+
+    Activate it via settings, e.g.:
+
+        YNH_PROFILING_SAMPLE_RATE = 0.01
+        MIDDLEWARE.insert(
+            MIDDLEWARE.index('django_yunohost_integration.sso_auth.auth_middleware.SSOwatRemoteUserMiddleware') + 1,
+            'django_yunohost_integration.observability.profiling.ProfilingMiddleware',
+        )
+
+    List and summarize the stored profiles via:
+
+        ./manage.py request_profiles
+"""
+
+import cProfile
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpRequest
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_YNH_PROFILE'
+
+FILE_SUFFIX = '.pstats'
+
+# Only one profiler can be active at the same time (sys.monitoring in Python >= 3.12):
+_profiler_lock = threading.Lock()
+
+
+def get_profiles_dir() -> Path:
+    """
+    Fallback to "DATA_DIR_PATH/profiles/"
+    """
+    profiles_dir = getattr(settings, 'YNH_PROFILING_DIR', None)
+    if profiles_dir is None:
+        profiles_dir = Path(settings.DATA_DIR_PATH) / 'profiles'
+    profiles_dir = Path(profiles_dir)
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+    return profiles_dir
+
+
+def get_profile_files() -> list[Path]:
+    """
+    All stored profiles, the newest first.
+    """
+    return sorted(get_profiles_dir().glob(f'*{FILE_SUFFIX}'), reverse=True)
+
+
+def build_file_name(request: HttpRequest, duration: float) -> str:
+    """
+    >>> from django.test import RequestFactory
+    >>> build_file_name(RequestFactory().get('/app_path/foo/bar/'), 1.2345)[19:]
+    '_GET_app_path_foo_bar_1234ms.pstats'
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:19]
+    path_slug = re.sub(r'[^a-zA-Z0-9]+', '_', request.path).strip('_')[:80]
+    return f'{timestamp}_{request.method}_{path_slug}_{round(duration * 1000)}ms{FILE_SUFFIX}'
+
+
+def rotate_profiles(max_total_size: int) -> None:
+    """
+    Delete the oldest profiles until all files together are not bigger than max_total_size.
+    """
+    total_size = 0
+    for file_path in get_profile_files():
+        total_size += file_path.stat().st_size
+        if total_size > max_total_size:
+            logger.info('Remove old profile: %s', file_path)
+            file_path.unlink()
+
+
+class ProfilingMiddleware:
+    """
+    Profile a random fraction of requests, or if requested by a superuser via "X-Ynh-Profile" header.
+    Must be placed after the auth middlewares, to check the header permission.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def should_profile(self, request: HttpRequest) -> tuple[bool, bool]:
+        """
+        Returns (profile this request, forced via header)
+        """
+        if request.META.get(PROFILE_HEADER):
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_superuser:
+                return True, True
+            logger.warning('Ignore profile header from non-superuser: %s', user)
+
+        sample_rate = float(getattr(settings, 'YNH_PROFILING_SAMPLE_RATE', 0))
+        return sample_rate > 0 and random.random() < sample_rate, False
+
+    def __call__(self, request: HttpRequest):
+        profile_request, forced = self.should_profile(request)
+        if not profile_request:
+            return self.get_response(request)
+
+        if not _profiler_lock.acquire(blocking=False):
+            logger.debug('Skip profiling: Another request is profiled')
+            return self.get_response(request)
+
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+
+            if forced or duration >= getattr(settings, 'YNH_PROFILING_MIN_DURATION', 0.5):
+                file_path = get_profiles_dir() / build_file_name(request, duration)
+                profiler.dump_stats(file_path)
+                logger.info('Request profile stored: %s', file_path)
+                rotate_profiles(max_total_size=getattr(settings, 'YNH_PROFILING_MAX_TOTAL_SIZE', 50 * 1024 * 1024))
+        finally:
+            _profiler_lock.release()
+
+        return response
@@ -0,0 +1,78 @@
+"""
+    Request-ID propagation for log correlation.
+
+    The RequestIdMiddleware takes the "X-Request-ID" header (e.g. set by nginx via:
+    "proxy_set_header X-Request-ID $request_id;") or generates a new ID and stores it
+    in a contextvar. The record_factory in base_settings.py attaches it to every log record,
+    so it can be used in log formats, e.g.:
+
+        '{asctime} {levelname} {request_id} {name} {module}.{funcName} {message}'
+
+    Log lines outside of a request get "-" as request ID.
+"""
+
+import contextvars
+import logging
+import re
+import uuid
+
+from django.http import HttpRequest
+
+
+REQUEST_ID_HEADER = 'HTTP_X_REQUEST_ID'
+RESPONSE_HEADER = 'X-Request-ID'
+
+NO_REQUEST_ID = '-'
+
+# Accept only harmless IDs from the outside, to avoid log injection:
+VALID_REQUEST_ID = re.compile(r'[a-zA-Z0-9._:-]{1,200}')
+
+request_id_var = contextvars.ContextVar('ynh_request_id', default=NO_REQUEST_ID)
+
+
+def get_request_id() -> str:
+    return request_id_var.get()
+
+
+def get_or_create_request_id(request: HttpRequest) -> str:
+    request_id = request.META.get(REQUEST_ID_HEADER)
+    if request_id and VALID_REQUEST_ID.fullmatch(request_id):
+        return request_id
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """
+    Should be the first middleware, so that all log lines of a request contain the ID.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        request_id = get_or_create_request_id(request)
+        request.request_id = request_id
+        token = request_id_var.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[RESPONSE_HEADER] = request_id
+        return response
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Attach the current request ID to log records that are not created by the
+    record_factory from base_settings.py, e.g.:
+
+        LOGGING['filters'] = {
+            'request_id': {'()': 'django_yunohost_integration.observability.request_id.RequestIdFilter'},
+        }
+        LOGGING['handlers']['log_file']['filters'] = ['request_id']
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id_var.get()
+        return True
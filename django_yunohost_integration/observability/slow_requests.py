@@ -0,0 +1,172 @@
+"""
+    Log one structured line for every request that takes longer than settings.YNH_SLOW_REQUEST_THRESHOLD
+
+    The line contains the total time, the number and time of database queries,
+    the number of cache calls and the most repeated SQL statements, e.g.:
+
+        Slow request: {"method": "GET", "path": "/app_path/", "status": 200, "user": "test",
+        "duration_ms": 1234.5, "db_queries": 102, "db_time_ms": 987.6, "cache_calls": {"get": 3},
+        "top_queries": [{"count": 100, "sql": "SELECT ... WHERE "app_item"."id" = %s"}]}
+
+    Activate it via settings, e.g.:
+
+        YNH_SLOW_REQUEST_THRESHOLD = 1.0  # seconds
+        MIDDLEWARE.insert(0, 'django_yunohost_integration.observability.slow_requests.SlowRequestMiddleware')
+"""
+
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import json
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpRequest
+
+
+logger = logging.getLogger(__name__)
+
+# Number of most repeated SQL statements in the log line:
+TOP_QUERIES = 5
+
+# Cut long SQL statements in the log line:
+MAX_SQL_LENGTH = 300
+
+CACHE_METHODS = (
+    'add',
+    'get',
+    'set',
+    'touch',
+    'delete',
+    'get_many',
+    'get_or_set',
+    'has_key',
+    'incr',
+    'decr',
+    'set_many',
+    'delete_many',
+    'clear',
+)
+
+
+@dataclasses.dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_time: float = 0
+    cache_calls: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+    query_fingerprints: collections.Counter = dataclasses.field(default_factory=collections.Counter)
+
+
+_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar(
+    'ynh_request_stats', default=None
+)
+
+
+def fingerprint_sql(sql: str) -> str:
+    r"""
+    Normalize a SQL statement, so that the same query with different parameters results in the same string.
+    The column list of SELECT statements is removed, to keep the important parts short.
+
+    >>> fingerprint_sql('SELECT "foo"."id", "foo"."x" FROM "foo" WHERE "id" IN (%s, %s, %s) AND "x" = 1')
+    'SELECT ... FROM "foo" WHERE "id" IN (...) AND "x" = ?'
+    >>> fingerprint_sql("SELECT  *\n FROM bar WHERE name = 'foo' LIMIT 21")
+    'SELECT ... FROM bar WHERE name = ? LIMIT ?'
+    """
+    sql = re.sub(r'^\s*SELECT\s.+?\sFROM\s', 'SELECT ... FROM ', sql, flags=re.IGNORECASE | re.DOTALL)
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)', 'IN (...)', sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\s+', ' ', sql)
+    return sql.strip()
+
+
+def count_db_query(execute, sql, params, many, context):
+    """
+    Use via connection.execute_wrapper() to count database queries and their time.
+    """
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_time += time.perf_counter() - start
+            stats.query_fingerprints[fingerprint_sql(sql)] += 1
+
+
+def _count_cache_call(method_name: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.cache_calls[method_name] += 1
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument_caches() -> None:
+    """
+    Wrap the methods of all cache instances of the current thread to count the calls.
+    """
+    for cache in caches.all():
+        if getattr(cache, '_ynh_counted', False):
+            continue
+        for method_name in CACHE_METHODS:
+            setattr(cache, method_name, _count_cache_call(method_name, getattr(cache, method_name)))
+        cache._ynh_counted = True
+
+
+class SlowRequestMiddleware:
+    """
+    Measure requests and log the slow ones.
+    Should be one of the first middlewares, to cover all other middlewares.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        threshold = getattr(settings, 'YNH_SLOW_REQUEST_THRESHOLD', None)
+        if threshold is None:
+            return self.get_response(request)
+
+        instrument_caches()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(count_db_query))
+                response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        duration = time.perf_counter() - start
+
+        if duration >= threshold:
+            user = getattr(request, 'user', None)
+            data = {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'user': user.get_username() if user is not None and user.is_authenticated else None,
+                'duration_ms': round(duration * 1000, 1),
+                'db_queries': stats.db_queries,
+                'db_time_ms': round(stats.db_time * 1000, 1),
+                'cache_calls': dict(stats.cache_calls),
+                'top_queries': [
+                    {'count': count, 'sql': sql[:MAX_SQL_LENGTH]}
+                    for sql, count in stats.query_fingerprints.most_common(TOP_QUERIES)
+                ],
+            }
+            logger.warning('Slow request: %s', json.dumps(data))
+
+        return response
@@ -0,0 +1,277 @@
+"""
+    Minimal tracing API: Spans with parent/child relationships and attributes.
+
+    Finished spans are written as JSON lines (default: DATA_DIR_PATH/traces.jsonl)
+    by a buffered background writer. A new trace is recorded with the probability
+    of settings.YNH_TRACING_SAMPLE_RATE (0.0 = off ... 1.0 = trace everything).
+
+    Activate it via settings, e.g.:
+
+        YNH_TRACING_SAMPLE_RATE = 0.05
+        MIDDLEWARE.insert(0, 'django_yunohost_integration.observability.tracing.TracingMiddleware')
+
+    Add own spans, e.g.:
+
+        with start_span('my_app.export', rows=len(rows)) as span:
+            ...
+            span.set_attribute('file_size', file_size)
+"""
+
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two writes of the buffered spans:
+FLUSH_INTERVAL = 2
+
+# Write earlier, if the buffer contains more spans:
+FLUSH_BUFFER_SIZE = 500
+
+# Drop the oldest spans, if the writer can't keep up (e.g.: the trace file is not writable):
+MAX_BUFFER_SIZE = 5000
+
+# Rotate the trace file if it's bigger:
+MAX_FILE_SIZE = 50 * 1024 * 1024
+
+# Cut long SQL statements in "db.query" spans:
+MAX_SQL_LENGTH = 1000
+
+
+def get_sample_rate() -> float:
+    return float(getattr(settings, 'YNH_TRACING_SAMPLE_RATE', 0))
+
+
+def get_trace_file_path() -> Path:
+    trace_file = getattr(settings, 'YNH_TRACING_FILE', None)
+    if trace_file is None:
+        trace_file = Path(settings.DATA_DIR_PATH) / 'traces.jsonl'
+    return Path(trace_file)
+
+
+class NoopSpan:
+    """
+    Returned if the current trace is not sampled.
+    """
+
+    is_recording = False
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    is_recording = True
+
+    def __init__(self, *, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error: str | None = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration: float | None = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+    def as_dict(self) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start_time,
+            'duration_ms': None if self.duration is None else round(self.duration * 1000, 3),
+            'pid': os.getpid(),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+_current_span: contextvars.ContextVar[Span | NoopSpan | None] = contextvars.ContextVar(
+    'ynh_current_span', default=None
+)
+
+
+def get_current_span() -> Span | NoopSpan | None:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def start_span(name: str, **attributes):
+    """
+    Start a new span as child of the current span, or start a new trace.
+    """
+    parent = _current_span.get()
+    if isinstance(parent, NoopSpan):
+        # Current trace is not sampled
+        yield NOOP_SPAN
+        return
+
+    if parent is None:
+        sample_rate = get_sample_rate()
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            token = _current_span.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+        span = Span(name=name, trace_id=secrets.token_hex(16), parent_id=None, attributes=attributes)
+    else:
+        span = Span(name=name, trace_id=parent.trace_id, parent_id=parent.span_id, attributes=attributes)
+
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as err:
+        span.error = repr(err)
+        raise
+    finally:
+        span.end()
+        _current_span.reset(token)
+        exporter.export(span.as_dict())
+
+
+def traced(name: str):
+    """
+    Decorator to run the function in a span.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class JsonLinesExporter:
+    """
+    Collect finished spans and append them in a background thread to the trace file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer = []
+        self._dropped = 0
+        self._pid = None
+        self._wakeup = threading.Event()
+
+    def export(self, record: dict) -> None:
+        with self._lock:
+            self._check_process()
+            self._buffer.append(record)
+            if len(self._buffer) > MAX_BUFFER_SIZE:
+                del self._buffer[0]
+                self._dropped += 1
+            if len(self._buffer) >= FLUSH_BUFFER_SIZE:
+                self._wakeup.set()
+
+    def _check_process(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        self._pid = pid
+        self._buffer = []  # Don't write spans of the parent process twice after a fork
+        thread = threading.Thread(target=self._write_loop, name='ynh-tracing-writer', daemon=True)
+        thread.start()
+
+    def _write_loop(self) -> None:
+        pid = self._pid
+        while pid == self._pid:
+            self._wakeup.wait(FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Keep the writer thread alive:
+                logger.exception('Writing the spans failed')
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                logger.warning('%i spans dropped: The trace writer is too slow', dropped)
+            if not records:
+                return
+
+            lines = ''.join(f'{json.dumps(record, default=str)}\n' for record in records)
+            trace_file_path = get_trace_file_path()
+            try:
+                try:
+                    if trace_file_path.stat().st_size > MAX_FILE_SIZE:
+                        trace_file_path.replace(trace_file_path.with_suffix('.jsonl.1'))
+                except FileNotFoundError:
+                    pass
+                with trace_file_path.open('a', encoding='utf-8') as f:
+                    f.write(lines)
+            except OSError as err:
+                logger.warning('%i spans lost, can not write %s: %s', len(records), trace_file_path, err)
+
+
+exporter = JsonLinesExporter()
+atexit.register(exporter.flush)
+
+
+def trace_db_query(execute, sql, params, many, context):
+    """
+    Use via connection.execute_wrapper() to add a span for every database query.
+    """
+    with start_span('db.query', sql=sql[:MAX_SQL_LENGTH], many=many):
+        return execute(sql, params, many, context)
+
+
+class TracingMiddleware:
+    """
+    Start a trace for sampled requests and add spans for all database queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        with start_span('http.request', method=request.method, path=request.path) as span:
+            if not span.is_recording:
+                return self.get_response(request)
+
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(trace_db_query))
+                response = self.get_response(request)
+
+            span.set_attribute('status_code', response.status_code)
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                span.set_attribute('user', user.get_username())
+            return response
@@ -27,6 +27,7 @@ import logging
 
 from django.contrib.auth.backends import RemoteUserBackend
 
+from django_yunohost_integration.observability import metrics, tracing
 from django_yunohost_integration.sso_auth.user_profile import call_setup_user, update_user_profile
 
 
@@ -40,6 +41,7 @@ class SSOwatUserBackend(RemoteUserBackend):
 
     create_unknown_user = True
 
+    @tracing.traced('sso_auth.authenticate')
     def authenticate(self, request, remote_user):
         logger.info('Remote user authenticate: %r', remote_user)
         return super().authenticate(request, remote_user)
@@ -49,6 +51,8 @@ class SSOwatUserBackend(RemoteUserBackend):
         Configure a new user after creation and return the updated user.
         """
         logger.warning('Configure user %s', user)
+        if created:
+            metrics.SSO_USERS_CREATED.inc()
 
         user = update_user_profile(request, user)
         user = call_setup_user(user=user)
@@ -5,7 +5,9 @@ from django.conf import settings
 from django.contrib import auth
 from django.contrib.auth import get_user_model
 from django.contrib.auth.middleware import RemoteUserMiddleware
+from django.core.exceptions import SuspiciousOperation as DjangoSuspiciousOperation
 
+from django_yunohost_integration.observability import metrics, tracing
 from django_yunohost_integration.yunohost.ynh_jwt import verify_sso_jwt
 
 
@@ -40,6 +42,7 @@ class SSOwatRemoteUserMiddleware(RemoteUserMiddleware):
     header = settings.YNH_USER_NAME_HEADER_KEY
     force_logout_if_no_header = True
 
+    @tracing.traced('sso_auth.process_request')
     def process_request(self, request):
         if self.header not in request.META:
             logger.warning('Missing %r header', self.header)
@@ -67,28 +70,36 @@ class SSOwatRemoteUserMiddleware(RemoteUserMiddleware):
                 # e.g.: local test can't set a Cookie easily
                 logger.warning('Ignore error, because settings.DEBUG is on!')
             else:
+                metrics.SSO_AUTH.inc(outcome='missing_cookie')
                 # emits a signal indicating user login failed, which is processed by
                 # axes.signals.log_user_login_failed which logs and flags the failed request.
                 raise SuspiciousOperation('Cookie missing')
         else:
-            verify_sso_jwt(sso_jwt_data=sso_jwt_data, user=user)
+            try:
+                verify_sso_jwt(sso_jwt_data=sso_jwt_data, user=user)
+            except DjangoSuspiciousOperation:
+                metrics.SSO_AUTH.inc(outcome='username_mismatch')
+                raise
 
         # Also check 'HTTP_AUTHORIZATION', but only the username ;)
         try:
             authorization = request.META[settings.YNH_BASIC_AUTH_HEADER_KEY]
         except KeyError:
             logger.error('%r missing!', settings.YNH_BASIC_AUTH_HEADER_KEY)
+            metrics.SSO_AUTH.inc(outcome='missing_header')
             raise SuspiciousOperation('Missing header')
 
         scheme, creds = authorization.split(' ', 1)
         if scheme.lower() != 'basic':
             logger.error('%r with %r not supported', settings.YNH_BASIC_AUTH_HEADER_KEY, scheme)
+            metrics.SSO_AUTH.inc(outcome='missing_header')
             raise SuspiciousOperation('Header scheme not supported')
 
         creds = str(base64.b64decode(creds), encoding='utf-8')
         username = creds.split(':', 1)[0]
         if username != user.username:
             logger.error(f'%r mismatch: {username=} is not {user.username}', settings.YNH_BASIC_AUTH_HEADER_KEY)
+            metrics.SSO_AUTH.inc(outcome='username_mismatch')
             raise SuspiciousOperation('Wrong username')
 
         if not was_authenticated:
@@ -102,3 +113,4 @@ class SSOwatRemoteUserMiddleware(RemoteUserMiddleware):
             # persist user in the session
             request.user = user
             auth.login(request, user)
+            metrics.SSO_AUTH.inc(outcome='success')
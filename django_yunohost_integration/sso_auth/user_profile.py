@@ -1,4 +1,5 @@
 import logging
+import time
 from functools import lru_cache
 
 from django.conf import settings
@@ -6,6 +7,8 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.utils.module_loading import import_string
 
+from django_yunohost_integration.observability import metrics, tracing
+
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +23,7 @@ def get_setup_user_func():
     return setup_user_func
 
 
+@tracing.traced('sso_auth.call_setup_user')
 def call_setup_user(user):
     """
     Hook for the YunoHost package application to setup a Django user.
@@ -34,7 +38,9 @@ def call_setup_user(user):
     setup_user_func = get_setup_user_func()
     logger.debug('Call "%s" for user "%s"', settings.YNH_SETUP_USER, user)
 
+    start = time.perf_counter()
     user = setup_user_func(user=user)
+    metrics.SETUP_USER_DURATION.observe(time.perf_counter() - start)
 
     assert isinstance(user, UserModel)
     assert user.pk == old_pk
@@ -42,6 +48,7 @@ def call_setup_user(user):
     return user
 
 
+@tracing.traced('sso_auth.update_user_profile')
 def update_user_profile(request, user):
     """
     Update existing user information:
@@ -0,0 +1,35 @@
+"""
+    Simulate the headers and cookies that SSOwat and nginx set for a logged-in YunoHost user.
+
+    Used by the load test, the SSOwat proxy and the ASGI middleware of the "local_test" files.
+    Doesn't import Django, so it can be used outside of a configured project.
+"""
+
+import base64
+
+import jwt
+
+
+JWT_COOKIE_NAME = 'yunohost.portal'  # settings.YNH_JWT_COOKIE_NAME
+
+
+def generate_basic_auth(username, password):
+    basic_auth = f'{username}:{password}'
+    basic_auth_creds = bytes(basic_auth, encoding='utf-8')
+    creds = str(base64.b64encode(basic_auth_creds), encoding='utf-8')
+    return f'basic {creds}'
+
+
+def get_sso_headers(username: str, jwt_cookie_name: str = JWT_COOKIE_NAME) -> dict:
+    """
+    Returns the HTTP headers that SSOwat and nginx set for a logged-in YunoHost user.
+    The JWT is not signed with the real SSOwat secret: The signature isn't verified, see: yunohost.ynh_jwt
+    """
+    sso_jwt = jwt.encode(payload={'user': username}, key='load-test', algorithm='HS256')
+    return {
+        'Ynh-User': username,
+        'Authorization': generate_basic_auth(username=username, password='load-test'),
+        'Email': f'{username}@example.tld',
+        'Name': username,
+        'Cookie': f'{jwt_cookie_name}={sso_jwt}',
+    }
@@ -0,0 +1,129 @@
+"""
+    A local stand-in for the YunoHost SSOwat/nginx reverse proxy.
+
+    Sits in front of "runserver" or gunicorn and injects the headers and cookies for a simulated user,
+    the same way as SSOwat does in production: "Ynh-User", Basic auth, "Email", "Name" and the JWT cookie.
+    So local requests run the full production code path incl. verify_sso_jwt(), even with DEBUG off.
+
+    The simulated user can be selected per request with the "X-Simulate-Ynh-User" header,
+    otherwise the default user is used. Headers that only SSOwat may set are removed from the incoming requests.
+"""
+
+import http.client
+import http.server
+import logging
+
+from django_yunohost_integration.sso_utils import JWT_COOKIE_NAME, get_sso_headers
+
+
+logger = logging.getLogger(__name__)
+
+SIMULATE_USER_HEADER = 'X-Simulate-Ynh-User'
+
+# Headers of one connection, that must not be forwarded:
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        'connection',
+        'keep-alive',
+        'proxy-authenticate',
+        'proxy-authorization',
+        'te',
+        'trailers',
+        'transfer-encoding',
+        'upgrade',
+        'content-length',
+    }
+)
+
+# Headers that are only set by SSOwat, never forward them from the client:
+SSOWAT_HEADERS = frozenset({'ynh-user', 'authorization', 'email', 'name', 'auth-user', 'remote-user'})
+
+
+def merge_cookies(client_cookies: str | None, sso_cookie: str, jwt_cookie_name: str) -> str:
+    """
+    Add the JWT cookie to the cookies of the client and replace an existing one.
+
+    >>> merge_cookies('sessionid=abc; yunohost.portal=old', 'yunohost.portal=new', 'yunohost.portal')
+    'sessionid=abc; yunohost.portal=new'
+    >>> merge_cookies(None, 'yunohost.portal=new', 'yunohost.portal')
+    'yunohost.portal=new'
+    """
+    cookies = [
+        cookie.strip()
+        for cookie in (client_cookies or '').split(';')
+        if cookie.strip() and cookie.split('=', 1)[0].strip() != jwt_cookie_name
+    ]
+    cookies.append(sso_cookie)
+    return '; '.join(cookies)
+
+
+class SSOwatProxyServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        *,
+        upstream: tuple[str, int],
+        default_username: str,
+        jwt_cookie_name: str = JWT_COOKIE_NAME,
+        timeout: float = 60,
+    ):
+        super().__init__(server_address, SSOwatProxyHandler)
+        self.upstream = upstream
+        self.default_username = default_username
+        self.jwt_cookie_name = jwt_cookie_name
+        self.upstream_timeout = timeout
+
+
+class SSOwatProxyHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: SSOwatProxyServer
+
+    def get_upstream_headers(self) -> dict:
+        username = self.headers.get(SIMULATE_USER_HEADER) or self.server.default_username
+        headers = {
+            key: value
+            for key, value in self.headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
+            and key.lower() not in SSOWAT_HEADERS
+            and key.lower() not in ('cookie', SIMULATE_USER_HEADER.lower())
+        }
+        sso_headers = get_sso_headers(username, jwt_cookie_name=self.server.jwt_cookie_name)
+        headers['Cookie'] = merge_cookies(
+            self.headers.get('Cookie'),
+            sso_cookie=sso_headers.pop('Cookie'),
+            jwt_cookie_name=self.server.jwt_cookie_name,
+        )
+        headers.update(sso_headers)
+        return headers
+
+    def proxy(self):
+        content_length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(content_length) if content_length else None
+
+        connection = http.client.HTTPConnection(*self.server.upstream, timeout=self.server.upstream_timeout)
+        try:
+            connection.request(self.command, self.path, body=body, headers=self.get_upstream_headers())
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as err:
+            logger.error('Upstream %s:%s error: %s', *self.server.upstream, err)
+            self.send_error(502, f'Upstream error: {err}')
+            return
+        finally:
+            connection.close()
+
+        self.send_response(response.status, response.reason)
+        for key, value in response.getheaders():
+            if key.lower() not in HOP_BY_HOP_HEADERS:
+                self.send_header(key, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = proxy
+
+    def log_message(self, format, *args):
+        logger.info('%s - %s', self.address_string(), format % args)
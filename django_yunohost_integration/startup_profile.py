@@ -0,0 +1,230 @@
+"""
+    Profile the startup of a Django project, e.g.: the boot of a gunicorn worker.
+
+    A fresh Python process with "-X importtime" is started in the "local_test" environment
+    and the time of these phases are measured:
+
+        settings  - import the settings module (incl. the star import of base_settings)
+        setup     - django.setup() without the AppConfig.ready() hooks
+        ready     - all AppConfig.ready() hooks
+        urls      - import the URLconf and all views
+        wsgi      - create the WSGI handler (loads all middlewares)
+
+    A budget (in milliseconds) can be defined in pyproject.toml, e.g.:
+
+        [ynh-integration.startup_budget]
+        total = 3000
+        settings = 1000
+"""
+
+import dataclasses
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from bx_py_utils.path import assert_is_dir
+from bx_py_utils.pyproject_toml import get_pyproject_config
+
+
+PHASES = ('settings', 'setup', 'ready', 'urls', 'wsgi')
+
+RESULT_PREFIX = 'YNH_STARTUP_PROFILE:'
+
+# Will be executed in a new Python process via "-X importtime":
+PROBE_SCRIPT = f'''
+import json, time
+start = time.perf_counter()
+phases = {{}}
+ready_times = {{}}
+
+from django.apps.config import AppConfig
+origin_create = AppConfig.create.__func__
+
+def create(cls, entry):
+    app_config = origin_create(cls, entry)
+    origin_ready = app_config.ready
+
+    def ready():
+        ready_start = time.perf_counter()
+        origin_ready()
+        ready_times[app_config.label] = time.perf_counter() - ready_start
+
+    app_config.ready = ready
+    return app_config
+
+AppConfig.create = classmethod(create)
+
+from django.conf import settings
+phase_start = time.perf_counter()
+settings.INSTALLED_APPS
+phases['settings'] = time.perf_counter() - phase_start
+
+import django
+phase_start = time.perf_counter()
+django.setup()
+phases['ready'] = sum(ready_times.values())
+phases['setup'] = time.perf_counter() - phase_start - phases['ready']
+
+from django.urls import get_resolver
+phase_start = time.perf_counter()
+get_resolver().url_patterns
+phases['urls'] = time.perf_counter() - phase_start
+
+from django.core.handlers.wsgi import WSGIHandler
+phase_start = time.perf_counter()
+WSGIHandler()
+phases['wsgi'] = time.perf_counter() - phase_start
+
+phases['total'] = time.perf_counter() - start
+print('{RESULT_PREFIX}' + json.dumps({{'phases': phases, 'ready': ready_times}}))
+'''
+
+IMPORT_TIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+@dataclasses.dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    level: int
+
+
+@dataclasses.dataclass
+class StartupProfile:
+    phases: dict  # phase name -> seconds
+    ready: dict  # app label -> seconds
+    imports: list[ImportTime]
+
+    def top_imports(self, count: int = 15) -> list[ImportTime]:
+        return sorted(self.imports, key=lambda item: item.self_us, reverse=True)[:count]
+
+    def top_packages(self, count: int = 15) -> list[tuple[str, int]]:
+        """
+        Sum of the self import time (in microseconds) per top-level package.
+        """
+        counter: Counter[str] = Counter()
+        for item in self.imports:
+            counter[item.module.partition('.')[0]] += item.self_us
+        return counter.most_common(count)
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    r"""
+    Parse the stderr output of "python -X importtime"
+
+    >>> imports = parse_importtime('import time: self [us] | cumulative | imported package\n'
+    ...                            'import time:       145 |        145 |   django.utils\n'
+    ...                            'import time:       316 |        461 | django')
+    >>> imports[0]
+    ImportTime(module='django.utils', self_us=145, cumulative_us=145, level=1)
+    >>> imports[1]
+    ImportTime(module='django', self_us=316, cumulative_us=461, level=0)
+    """
+    imports = []
+    for line in output.splitlines():
+        if match := IMPORT_TIME_RE.match(line):
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(
+                ImportTime(
+                    module=module,
+                    self_us=int(self_us),
+                    cumulative_us=int(cumulative_us),
+                    level=len(indent) // 2,
+                )
+            )
+    return imports
+
+
+def profile_startup_once(data_dir_path: Path, django_settings_name: str = 'settings') -> StartupProfile:
+    assert_is_dir(data_dir_path)
+    env = os.environ.copy()
+    env['DJANGO_SETTINGS_MODULE'] = django_settings_name
+    env.setdefault('ENV_TYPE', 'test')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (str(data_dir_path), env.get('PYTHONPATH'))))
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE_SCRIPT],
+        cwd=data_dir_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line.removeprefix(RESULT_PREFIX))
+            break
+    else:
+        raise RuntimeError(f'Startup profile failed (exit code {process.returncode}):\n{process.stderr[-2000:]}')
+
+    return StartupProfile(
+        phases=result['phases'],
+        ready=result['ready'],
+        imports=parse_importtime(process.stderr),
+    )
+
+
+def profile_startup(data_dir_path: Path, django_settings_name: str = 'settings', repeat: int = 1) -> StartupProfile:
+    """
+    Profile the startup "repeat" times and use the median of every phase, to reduce the noise.
+    """
+    profiles = [profile_startup_once(data_dir_path, django_settings_name) for _ in range(repeat)]
+    profile = profiles[-1]
+    if repeat > 1:
+        profile.phases = {name: statistics.median(p.phases[name] for p in profiles) for name in profile.phases}
+    return profile
+
+
+def get_startup_budget(base_path: Path | None = None) -> dict:
+    """
+    Returns the budget (phase name -> milliseconds) from: [ynh-integration.startup_budget] in pyproject.toml
+    """
+    budget = get_pyproject_config(section=('ynh-integration', 'startup_budget'), base_path=base_path)
+    return budget or {}
+
+
+def check_budget(profile: StartupProfile, budget: dict) -> list[str]:
+    """
+    Returns a list of error messages for all phases that exceeded the budget.
+
+    >>> profile = StartupProfile(phases={'settings': 0.5, 'total': 2.5}, ready={}, imports=[])
+    >>> check_budget(profile, budget={'settings': 1000, 'total': 2000})
+    ['Phase "total" took 2500ms, budget: 2000ms']
+    >>> check_budget(profile, budget={'foo': 1})
+    Traceback (most recent call last):
+        ...
+    KeyError: 'Unknown phase "foo" in startup budget'
+    """
+    errors = []
+    for name, limit_ms in budget.items():
+        if name not in profile.phases:
+            raise KeyError(f'Unknown phase "{name}" in startup budget')
+        duration_ms = profile.phases[name] * 1000
+        if duration_ms > limit_ms:
+            errors.append(f'Phase "{name}" took {duration_ms:.0f}ms, budget: {limit_ms}ms')
+    return errors
+
+
+def format_report(profile: StartupProfile, top: int = 15) -> str:
+    lines = ['Startup phases:']
+    for name in (*PHASES, 'total'):
+        lines.append(f'  {name:<10} {profile.phases[name] * 1000:8.1f} ms')
+
+    lines.append('\nSlowest AppConfig.ready() hooks:')
+    for label, duration in sorted(profile.ready.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f'  {label:<30} {duration * 1000:8.1f} ms')
+
+    lines.append(f'\nSlowest imports (self time, {len(profile.imports)} modules imported):')
+    for item in profile.top_imports(top):
+        lines.append(f'  {item.self_us / 1000:8.1f} ms (cumulative {item.cumulative_us / 1000:8.1f} ms) {item.module}')
+
+    lines.append('\nSlowest packages (sum of self import time):')
+    for package, self_us in profile.top_packages(top):
+        lines.append(f'  {self_us / 1000:8.1f} ms {package}')
+
+    return '\n'.join(lines)
@@ -0,0 +1,263 @@
+"""
+    Generate a production-like dataset: YunoHost SSO users, groups, django-axes logs and active sessions.
+
+    All objects are created with bulk_create() in batches, without model-specific database features,
+    so it works with SQLite and PostgreSQL. The same seed always results in the same dataset.
+    All generated objects are marked with a username/group name prefix, so they can be removed again.
+"""
+
+import collections
+import dataclasses
+import hashlib
+import logging
+import random
+import time
+from collections.abc import Iterator
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = 'synthetic'
+
+DB_SESSION_ENGINES = ('django.contrib.sessions.backends.db', 'django.contrib.sessions.backends.cached_db')
+
+FIRST_NAMES = ('Alice', 'Bob', 'Carol', 'Dave', 'Eve', 'Frank', 'Grace', 'Heidi', 'Ivan', 'Judy', 'Mallory', 'Oscar')
+LAST_NAMES = ('Smith', 'Müller', 'Dubois', 'Rossi', 'García', 'Novak', 'Jensen', 'Kowalski', 'Silva', 'Tanaka')
+USER_AGENTS = (
+    'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
+)
+
+
+@dataclasses.dataclass
+class SyntheticDataConfig:
+    users: int = 10_000
+    groups: int = 20
+    groups_per_user: int = 3
+    access_logs_per_user: int = 5
+    failed_attempts: int = 100
+    sessions: int = 2_000
+    seed: int = 1
+    prefix: str = DEFAULT_PREFIX
+    batch_size: int = 1_000
+
+
+@dataclasses.dataclass
+class SyntheticDataResult:
+    counts: dict = dataclasses.field(default_factory=dict)
+    durations: dict = dataclasses.field(default_factory=dict)
+    skipped: list = dataclasses.field(default_factory=list)
+
+
+def batched(items: Iterator, batch_size: int) -> Iterator[list]:
+    """
+    >>> list(batched(iter(range(5)), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_create(model, objects: Iterator, batch_size: int) -> int:
+    """
+    Create the objects in batches, without holding all of them in memory.
+    """
+    count = 0
+    for batch in batched(objects, batch_size):
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        count += len(batch)
+    return count
+
+
+def get_ip_address(rng: random.Random) -> str:
+    return f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}'
+
+
+def iter_users(config: SyntheticDataConfig, rng: random.Random) -> Iterator:
+    UserModel = get_user_model()
+    for number in range(config.users):
+        username = f'{config.prefix}-{number:06d}'
+        yield UserModel(
+            username=username,
+            email=f'{username}@example.tld',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            # Like SSO users: no usable password (the same value as set_unusable_password(), but deterministic)
+            password=f'{UNUSABLE_PASSWORD_PREFIX}{rng.getrandbits(128):032x}',
+            is_active=True,
+        )
+
+
+def iter_memberships(config: SyntheticDataConfig, rng: random.Random, user_ids: list, group_ids: list) -> Iterator:
+    Membership = get_user_model().groups.through
+    groups_per_user = min(config.groups_per_user, len(group_ids))
+    for user_id in user_ids:
+        for group_id in rng.sample(group_ids, k=rng.randint(0, groups_per_user)):
+            yield Membership(user_id=user_id, group_id=group_id)
+
+
+def iter_access_logs(config: SyntheticDataConfig, rng: random.Random, usernames: list) -> Iterator:
+    from axes.models import AccessLog
+
+    for username in usernames:
+        for _ in range(rng.randint(0, config.access_logs_per_user * 2)):
+            yield AccessLog(
+                user_agent=rng.choice(USER_AGENTS),
+                ip_address=get_ip_address(rng),
+                username=username,
+                http_accept='text/html,application/xhtml+xml',
+                path_info=f'/{settings.PATH_URL}/',
+                session_hash=hashlib.sha256(rng.randbytes(16)).hexdigest(),
+            )
+
+
+def iter_access_attempts(config: SyntheticDataConfig, rng: random.Random, usernames: list) -> Iterator:
+    from axes.models import AccessAttempt
+
+    for username in rng.sample(usernames, k=min(config.failed_attempts, len(usernames))):
+        yield AccessAttempt(
+            user_agent=rng.choice(USER_AGENTS),
+            ip_address=get_ip_address(rng),
+            username=username,
+            http_accept='text/html',
+            path_info=f'/{settings.PATH_URL}/',
+            get_data='',
+            post_data='',
+            failures_since_start=rng.randint(1, 3),
+        )
+
+
+def iter_sessions(config: SyntheticDataConfig, rng: random.Random, users: list) -> Iterator:
+    from django.contrib.sessions.models import Session
+
+    session_store = import_string(f'{settings.SESSION_ENGINE}.SessionStore')()
+    backend = settings.AUTHENTICATION_BACKENDS[0]
+    now = timezone.now()
+    for user in rng.sample(users, k=min(config.sessions, len(users))):
+        session_data = {
+            SESSION_KEY: str(user.pk),
+            BACKEND_SESSION_KEY: backend,
+            HASH_SESSION_KEY: user.get_session_auth_hash(),
+        }
+        yield Session(
+            session_key=f'{rng.getrandbits(160):040x}',
+            session_data=session_store.encode(session_data),
+            expire_date=now + timedelta(seconds=rng.randint(60, settings.SESSION_COOKIE_AGE)),
+        )
+
+
+def delete_synthetic_data(prefix: str = DEFAULT_PREFIX) -> collections.Counter:
+    """
+    Remove all generated objects with the given prefix. Returns the deleted objects per model.
+    """
+    counts: collections.Counter[str] = collections.Counter()
+
+    def delete(queryset):
+        counts.update(queryset.delete()[1])
+
+    with transaction.atomic():
+        UserModel = get_user_model()
+        users = UserModel.objects.filter(username__startswith=f'{prefix}-')
+        if apps.is_installed('axes'):
+            from axes.models import AccessAttempt, AccessLog
+
+            delete(AccessLog.objects.filter(username__startswith=f'{prefix}-'))
+            delete(AccessAttempt.objects.filter(username__startswith=f'{prefix}-'))
+        if settings.SESSION_ENGINE in DB_SESSION_ENGINES:
+            from django.contrib.sessions.models import Session
+
+            # The sessions are not linked to the users, but all generated session keys have 40 characters:
+            user_ids = {str(pk) for pk in users.values_list('pk', flat=True)}
+            session_keys = [
+                session.session_key
+                for session in Session.objects.filter(session_key__regex=r'^[0-9a-f]{40}$').iterator()
+                if session.get_decoded().get(SESSION_KEY) in user_ids
+            ]
+            for batch in batched(iter(session_keys), batch_size=500):  # Stay below the SQLite variable limit
+                delete(Session.objects.filter(session_key__in=batch))
+        delete(users)
+        delete(Group.objects.filter(name__startswith=f'{prefix}-'))
+    return counts
+
+
+def generate_synthetic_data(config: SyntheticDataConfig) -> SyntheticDataResult:
+    """
+    Create the dataset in one transaction. Raises an error, if users with the prefix already exist.
+    """
+    UserModel = get_user_model()
+    if UserModel.objects.filter(username__startswith=f'{config.prefix}-').exists():
+        raise ValueError(f'Users with prefix {config.prefix!r} already exist, delete them first.')
+
+    rng = random.Random(config.seed)
+    result = SyntheticDataResult()
+
+    def step(name, func):
+        start = time.perf_counter()
+        result.counts[name] = func()
+        result.durations[name] = time.perf_counter() - start
+        logger.info('Created %i %s in %.1fs', result.counts[name], name, result.durations[name])
+
+    with transaction.atomic():
+        step('users', lambda: bulk_create(UserModel, iter_users(config, rng), config.batch_size))
+        # bulk_create() doesn't return the primary keys on all databases, so fetch them:
+        users = list(UserModel.objects.filter(username__startswith=f'{config.prefix}-').order_by('username'))
+        user_ids = [user.pk for user in users]
+        usernames = [user.username for user in users]
+
+        step(
+            'groups',
+            lambda: bulk_create(
+                Group,
+                (Group(name=f'{config.prefix}-group-{number:03d}') for number in range(config.groups)),
+                config.batch_size,
+            ),
+        )
+        group_ids = list(
+            Group.objects.filter(name__startswith=f'{config.prefix}-').order_by('name').values_list('pk', flat=True)
+        )
+        step(
+            'group memberships',
+            lambda: bulk_create(
+                UserModel.groups.through, iter_memberships(config, rng, user_ids, group_ids), config.batch_size
+            ),
+        )
+
+        if apps.is_installed('axes'):
+            from axes.models import AccessAttempt, AccessLog
+
+            step(
+                'access logs',
+                lambda: bulk_create(AccessLog, iter_access_logs(config, rng, usernames), config.batch_size),
+            )
+            step(
+                'access attempts',
+                lambda: bulk_create(AccessAttempt, iter_access_attempts(config, rng, usernames), config.batch_size),
+            )
+        else:
+            result.skipped.append('django-axes logs: "axes" is not installed')
+
+        if settings.SESSION_ENGINE in DB_SESSION_ENGINES:
+            from django.contrib.sessions.models import Session
+
+            step('sessions', lambda: bulk_create(Session, iter_sessions(config, rng, users), config.batch_size))
+        else:
+            result.skipped.append(f'sessions: {settings.SESSION_ENGINE!r} is not a database session engine')
+
+    return result
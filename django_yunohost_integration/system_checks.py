@@ -1,3 +1,5 @@
+import logging
+
 from django.conf import settings
 from django.core.checks import Warning, register
 from django.core.exceptions import ValidationError
@@ -64,4 +66,174 @@ def validate_settings_emails(app_configs, **kwargs):
     return errors
 
 
+# Performance checks, only run by: ./manage.py check --deploy
+
+PERFORMANCE_TAG = 'performance'
+
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.dummy.DummyCache': 'Nothing is cached at all!',
+    'django.core.cache.backends.locmem.LocMemCache': 'Every gunicorn worker process has its own cache!',
+}
+DB_SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+ADMIN_EMAIL_HANDLER = 'django.utils.log.AdminEmailHandler'
+CACHED_TEMPLATE_LOADER = 'django.template.loaders.cached.Loader'
+
+
+@register(PERFORMANCE_TAG, deploy=True)
+def check_conn_max_age(app_configs, **kwargs):
+    errors = []
+    for alias, database in settings.DATABASES.items():
+        if database.get('ENGINE') == 'django.db.backends.sqlite3':
+            continue
+        # None means unlimited persistent connections:
+        if database.get('CONN_MAX_AGE', 0) == 0:
+            errors.append(
+                Warning(
+                    f'DATABASES[{alias!r}]["CONN_MAX_AGE"] is 0: Every request opens a new database connection!',
+                    hint='Reuse the connections with e.g.: "CONN_MAX_AGE": 600 and "CONN_HEALTH_CHECKS": True',
+                    id='django_yunohost_integration.W003',
+                )
+            )
+    return errors
+
+
+def is_redis_cache(backend: str) -> bool:
+    """
+    >>> is_redis_cache('django_redis.cache.RedisCache')
+    True
+    >>> is_redis_cache('django.core.cache.backends.redis.RedisCache')
+    True
+    >>> is_redis_cache('django.core.cache.backends.locmem.LocMemCache')
+    False
+    """
+    return 'redis' in backend.lower()
 
+
+@register(PERFORMANCE_TAG, deploy=True)
+def check_cache_backend(app_configs, **kwargs):
+    errors = []
+    for alias, cache in settings.CACHES.items():
+        backend = cache.get('BACKEND', '')
+        if backend in LOCAL_CACHE_BACKENDS:
+            errors.append(
+                Warning(
+                    f'CACHES[{alias!r}] uses {backend!r}: {LOCAL_CACHE_BACKENDS[backend]}',
+                    hint='Use the YunoHost Redis server, e.g.: "BACKEND": "django_redis.cache.RedisCache"',
+                    id='django_yunohost_integration.W004',
+                )
+            )
+    return errors
+
+
+@register(PERFORMANCE_TAG, deploy=True)
+def check_session_engine(app_configs, **kwargs):
+    errors = []
+    redis_configured = any(is_redis_cache(cache.get('BACKEND', '')) for cache in settings.CACHES.values())
+    if settings.SESSION_ENGINE == DB_SESSION_ENGINE and redis_configured:
+        errors.append(
+            Warning(
+                'Sessions are stored in the database, but a Redis cache is configured!',
+                hint=(
+                    'Use SESSION_ENGINE = "django.contrib.sessions.backends.cache"'
+                    ' or "django.contrib.sessions.backends.cached_db" to save database queries per request.'
+                ),
+                id='django_yunohost_integration.W005',
+            )
+        )
+    return errors
+
+
+@register(PERFORMANCE_TAG, deploy=True)
+def check_debug(app_configs, **kwargs):
+    errors = []
+    if settings.DEBUG:
+        errors.append(
+            Warning(
+                'DEBUG is on: All SQL queries are kept in memory and error pages are rendered with all details!',
+                hint='Deactivate "DEBUG_ENABLED" in the YunoHost config panel.',
+                id='django_yunohost_integration.W006',
+            )
+        )
+    return errors
+
+
+def get_level(level) -> int:
+    """
+    >>> get_level('INFO'), get_level(40), get_level(None)
+    (20, 40, 0)
+    """
+    if isinstance(level, str):
+        return logging.getLevelNamesMapping().get(level.upper(), logging.NOTSET)
+    return level or logging.NOTSET
+
+
+@register(PERFORMANCE_TAG, deploy=True)
+def check_mail_admins_logging(app_configs, **kwargs):
+    errors = []
+    logging_config = settings.LOGGING or {}
+    handlers = logging_config.get('handlers', {})
+    loggers = dict(logging_config.get('loggers', {}))
+    if 'root' in logging_config:
+        loggers['root'] = logging_config['root']
+    for logger_name, logger_config in loggers.items():
+        logger_level = get_level(logger_config.get('level'))
+        for handler_name in logger_config.get('handlers', ()):
+            handler = handlers.get(handler_name, {})
+            if handler.get('class') != ADMIN_EMAIL_HANDLER:
+                continue
+            level = max(logger_level, get_level(handler.get('level')))
+            if level < logging.ERROR:
+                errors.append(
+                    Warning(
+                        f'Logger {logger_name!r} sends a mail for every {logging.getLevelName(level)} log entry'
+                        f' via handler {handler_name!r}: The mails are sent synchronously in the request!',
+                        hint=f'Set LOGGING["handlers"][{handler_name!r}]["level"] = "ERROR"',
+                        id='django_yunohost_integration.W007',
+                    )
+                )
+    return errors
+
+
+@register(PERFORMANCE_TAG, deploy=True)
+def check_serve_files(app_configs, **kwargs):
+    errors = []
+    if getattr(settings, 'SERVE_FILES', False):
+        errors.append(
+            Warning(
+                'SERVE_FILES is on: Static and media files are served by Django!',
+                hint='Set SERVE_FILES = False and let nginx serve STATIC_ROOT and MEDIA_ROOT.',
+                id='django_yunohost_integration.W008',
+            )
+        )
+    return errors
+
+
+def iter_loader_names(loaders):
+    """
+    >>> list(iter_loader_names([('django.template.loaders.cached.Loader', ['a.Loader']), 'b.Loader']))
+    ['django.template.loaders.cached.Loader', 'b.Loader']
+    """
+    for loader in loaders:
+        yield loader[0] if isinstance(loader, (tuple, list)) else loader
+
+
+@register(PERFORMANCE_TAG, deploy=True)
+def check_template_loaders(app_configs, **kwargs):
+    errors = []
+    for number, template in enumerate(settings.TEMPLATES):
+        if template.get('BACKEND') != 'django.template.backends.django.DjangoTemplates':
+            continue
+        # Without "loaders", Django uses the cached loader automatically:
+        loaders = template.get('OPTIONS', {}).get('loaders')
+        if loaders and CACHED_TEMPLATE_LOADER not in iter_loader_names(loaders):
+            errors.append(
+                Warning(
+                    f'TEMPLATES[{number}] loaders are not cached: Every template is read and compiled on every use!',
+                    hint=(
+                        f'Wrap the loaders with "{CACHED_TEMPLATE_LOADER}"'
+                        ' or remove "loaders" to use the cached default loaders.'
+                    ),
+                    id='django_yunohost_integration.W009',
+                )
+            )
+    return errors
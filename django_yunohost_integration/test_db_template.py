@@ -0,0 +1,220 @@
+"""
+    Reusable pre-migrated SQLite template database for test runs.
+
+    Running all migrations (of the app, "axes" and "django.contrib.*") is the biggest fixed cost of every test run.
+    The first run stores the migrated test database as template in "local_test/test_db_templates/".
+    The following runs copy the template via the SQLite backup API into the new test database, instead of migrating.
+
+    The template file name contains a hash of all migration files, the models of apps without migrations,
+    the installed apps and the Django version, so any change results in a new migrated template.
+    Set settings.YNH_TEST_DB_TEMPLATE = False to deactivate it.
+"""
+
+import contextlib
+import hashlib
+import importlib.util
+import logging
+import os
+import sqlite3
+import tempfile
+from collections.abc import Generator
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+
+from django_yunohost_integration.path_utils import get_project_root
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_dir() -> Path:
+    return get_project_root() / 'local_test' / 'test_db_templates'
+
+
+def is_enabled() -> bool:
+    return bool(getattr(settings, 'YNH_TEST_DB_TEMPLATE', True))
+
+
+def get_migrations_locations(app_config) -> list[str]:
+    module_name, _ = MigrationLoader.migrations_module(app_config.label)
+    if module_name is None:
+        return []
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except ModuleNotFoundError:
+        return []
+    if spec is None or not spec.submodule_search_locations:
+        return []
+    return list(spec.submodule_search_locations)
+
+
+def iter_migration_files() -> Generator[Path, None, None]:
+    for app_config in apps.get_app_configs():
+        for location in get_migrations_locations(app_config):
+            yield from sorted(Path(location).glob('*.py'))
+
+
+def iter_unmigrated_model_files(migrate: bool = True) -> Generator[Path, None, None]:
+    """
+    "migrate" creates the tables of apps without migrations directly from the models ("run_syncdb").
+    With migrate=False (settings.DATABASES[...]['TEST']['MIGRATE']) this applies to all apps.
+    """
+    for app_config in apps.get_app_configs():
+        if app_config.models_module is None:
+            continue
+        if migrate and get_migrations_locations(app_config):
+            continue
+        models_path = Path(app_config.models_module.__file__)
+        if models_path.name == '__init__.py':
+            # A "models" package:
+            yield from sorted(models_path.parent.rglob('*.py'))
+        else:
+            yield models_path
+
+
+def get_template_hash(connection) -> str:
+    """
+    Hash of everything that changes the result of "migrate".
+    """
+    hasher = hashlib.sha256()
+    for value in (
+        django.__version__,
+        sqlite3.sqlite_version,
+        connection.alias,
+        repr(connection.settings_dict['TEST']['MIGRATE']),
+        *settings.INSTALLED_APPS,
+        repr(sorted(settings.MIGRATION_MODULES.items())),
+    ):
+        hasher.update(value.encode())
+        hasher.update(b'\0')
+    migrate = connection.settings_dict['TEST']['MIGRATE'] is not False
+    for path in (*iter_migration_files(), *iter_unmigrated_model_files(migrate=migrate)):
+        hasher.update(f'{path.parent.name}/{path.name}'.encode())
+        hasher.update(path.read_bytes())
+    return hasher.hexdigest()[:16]
+
+
+def get_template_path(connection, template_dir: Path | None = None) -> Path:
+    if template_dir is None:
+        template_dir = get_template_dir()
+    return template_dir / f'{connection.alias}-{get_template_hash(connection)}.sqlite3'
+
+
+def save_template(connection, template_path: Path) -> None:
+    """
+    Store the current database as template and remove outdated templates of the same alias.
+    """
+    template_path.parent.mkdir(parents=True, exist_ok=True)
+    connection.ensure_connection()
+    # A unique temp file, because parallel test runs may create the same template:
+    with tempfile.NamedTemporaryFile(
+        dir=template_path.parent, prefix=f'{template_path.stem}.', suffix='.tmp', delete=False
+    ) as temp_file:
+        temp_path = Path(temp_file.name)
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+        os.replace(temp_path, template_path)  # Other processes never see an incomplete template
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    for path in template_path.parent.glob(f'{connection.alias}-*.sqlite3'):
+        if path != template_path:
+            logger.info('Remove outdated test database template: %s', path)
+            path.unlink(missing_ok=True)
+
+
+def restore_template(connection, template_path: Path) -> None:
+    connection.ensure_connection()
+    source = sqlite3.connect(template_path)
+    try:
+        source.backup(connection.connection)
+    finally:
+        source.close()
+
+
+def create_test_db(
+    connection,
+    verbosity: int = 1,
+    autoclobber: bool = False,
+    serialize: bool = True,
+    keepdb: bool = False,
+    template_dir: Path | None = None,
+) -> str:
+    """
+    Same as connection.creation.create_test_db(), but copy the template database instead of migrating.
+    Creates the template, if it doesn't exist.
+    """
+    creation = connection.creation
+    template_path = get_template_path(connection, template_dir)
+    if keepdb or not template_path.is_file():
+        # Call the origin method, also if use_test_db_templates() replaced it on the instance:
+        test_database_name = type(creation).create_test_db(creation, verbosity, autoclobber, serialize, keepdb)
+        if not keepdb:
+            save_template(connection, template_path)
+            logger.info('Test database template created: %s', template_path)
+        return test_database_name
+
+    test_database_name = creation._get_test_db_name()
+    if verbosity >= 1:
+        creation.log(
+            f'Creating test database for alias {creation._get_database_display_str(verbosity, test_database_name)}'
+            f' from template {template_path.name}...'
+        )
+    creation._create_test_db(verbosity, autoclobber, keepdb)
+
+    connection.close()
+    settings.DATABASES[connection.alias]['NAME'] = test_database_name
+    connection.settings_dict['NAME'] = test_database_name
+
+    restore_template(connection, template_path)
+
+    # "migrate" sends this signal, e.g. to clear the ContentType cache or to create data of other apps:
+    emit_post_migrate_signal(
+        verbosity=max(verbosity - 1, 0), interactive=False, db=connection.alias, apps=apps, plan=[]
+    )
+
+    if serialize:
+        connection._test_serialized_contents = creation.serialize_db_to_string()
+    call_command('createcachetable', database=connection.alias)
+
+    # Ensure a connection for the side effect of initializing the test database:
+    connection.ensure_connection()
+    return test_database_name
+
+
+@contextlib.contextmanager
+def use_test_db_templates(aliases=None) -> Generator[list[str], None, None]:
+    """
+    Create all SQLite test databases from templates, e.g.:
+        with use_test_db_templates():
+            old_config = runner.setup_databases()
+    """
+    patched = []
+    if is_enabled():
+        for alias in aliases or connections:
+            connection = connections[alias]
+            if connection.vendor != 'sqlite' or connection.settings_dict['TEST']['MIRROR']:
+                continue
+
+            def patched_create_test_db(*args, connection=connection, **kwargs):
+                return create_test_db(connection, *args, **kwargs)
+
+            connection.creation.create_test_db = patched_create_test_db
+            patched.append(alias)
+    try:
+        yield patched
+    finally:
+        for alias in patched:
+            del connections[alias].creation.create_test_db
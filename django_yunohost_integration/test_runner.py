@@ -0,0 +1,189 @@
+"""
+    Test runner for the "local_test" environment:
+     * Create the SQLite test databases from a pre-migrated template, see: test_db_template.py
+     * Run the tests in parallel, with an isolated "local_test" environment per worker process.
+     * Stop the shared live server (see: test_utils.SharedLiveServerTestCase) after all tests.
+
+    The "local_test" environment is created only once. Every worker gets its own clone of the data dir,
+    install dir and a new log file under "local_test/workers/<worker id>/local_test/".
+    The files are cloned as copy-on-write reflinks, if the file system supports it (e.g.: Btrfs, XFS),
+    otherwise as hardlinks (so existing files must not be modified in place) and only as fallback as copies.
+    The settings of the worker (e.g.: DATA_DIR_PATH, STATIC_ROOT, LOGGING) are changed to the cloned paths.
+
+    Used by "run_django_test_cli()" if settings.TEST_RUNNER is the Django default, e.g.:
+        ./dev-cli.py test --parallel
+    The tests run serial, if "tblib" is not installed.
+"""
+
+import collections
+import errno
+import fcntl
+import importlib.util
+import logging
+import os
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.test import runner as django_test_runner
+from django.test.runner import DiscoverRunner, ParallelTestSuite
+from django.utils.log import configure_logging
+
+from django_yunohost_integration.test_db_template import use_test_db_templates
+from django_yunohost_integration.test_utils import shared_live_server
+
+
+logger = logging.getLogger(__name__)
+
+WORKERS_DIR_NAME = 'workers'
+
+# ioctl to create a copy-on-write clone of a file on Linux, see: "man ioctl_ficlone"
+FICLONE = 0x40049409
+
+
+def clone_file(src: Path, dst: Path) -> str:
+    """
+    Clone one file and returns the used method: "reflink", "hardlink" or "copy"
+    """
+    try:
+        with src.open('rb') as src_file, dst.open('wb') as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+    else:
+        shutil.copystat(src, dst)
+        return 'reflink'
+
+    try:
+        os.link(src, dst)
+    except OSError as err:
+        if err.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+    else:
+        return 'hardlink'
+
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+def clone_tree(src: Path, dst: Path) -> collections.Counter:
+    """
+    Clone the directory tree and returns the number of files per clone method.
+    """
+    methods: collections.Counter[str] = collections.Counter()
+    for root, dir_names, file_names in os.walk(src):
+        root_path = Path(root)
+        dst_root = dst / root_path.relative_to(src)
+        dst_root.mkdir(parents=True, exist_ok=True)
+        if '__pycache__' in dir_names:
+            dir_names.remove('__pycache__')
+        for file_name in file_names:
+            methods[clone_file(root_path / file_name, dst_root / file_name)] += 1
+    return methods
+
+
+def replace_paths(value, replacements: dict):
+    """
+    Replace path prefixes in strings/Paths, also in nested dicts, lists and tuples.
+
+    >>> replace_paths({'a': ['/foo/bar', Path('/foo')], 'b': ('/foobar', 1)}, {'/foo': '/x'})
+    {'a': ['/x/bar', PosixPath('/x')], 'b': ('/foobar', 1)}
+    """
+    if isinstance(value, Path):
+        return Path(replace_paths(str(value), replacements))
+    if isinstance(value, str):
+        for old, new in replacements.items():
+            if value == old or value.startswith(f'{old}/'):
+                return new + value[len(old) :]
+        return value
+    if isinstance(value, dict):
+        return {key: replace_paths(item, replacements) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(replace_paths(item, replacements) for item in value)
+    return value
+
+
+def get_worker_dir(worker_id: int) -> Path:
+    """
+    e.g.: ".../local_test/workers/1/local_test/" so the paths still end with "/local_test/opt_yunohost" etc.
+    """
+    destination = Path(settings.DATA_DIR_PATH).parent
+    return destination / WORKERS_DIR_NAME / str(worker_id) / destination.name
+
+
+def setup_worker_environment(worker_id: int) -> dict:
+    """
+    Clone the "local_test" files for this worker and change all settings to the new paths.
+    Returns the changed settings.
+    """
+    worker_dir = get_worker_dir(worker_id)
+    if worker_dir.exists():
+        shutil.rmtree(worker_dir)
+    worker_dir.mkdir(parents=True)
+
+    replacements = {}
+    methods: collections.Counter[str] = collections.Counter()
+    for name in ('DATA_DIR_PATH', 'INSTALL_DIR_PATH'):
+        src = Path(getattr(settings, name))
+        dst = worker_dir / src.name
+        methods += clone_tree(src, dst)
+        replacements[str(src)] = str(dst)
+
+    log_file_path = Path(settings.LOG_FILE_PATH)
+    worker_log_file_path = worker_dir / log_file_path.name
+    worker_log_file_path.touch()
+    replacements[str(log_file_path)] = str(worker_log_file_path)
+
+    changed = {}
+    for name in dir(settings):
+        if not name.isupper():
+            continue
+        value = getattr(settings, name)
+        new_value = replace_paths(value, replacements)
+        if new_value != value:
+            setattr(settings, name, new_value)
+            setting_changed.send(sender=settings._wrapped.__class__, setting=name, value=new_value, enter=True)
+            changed[name] = new_value
+
+    if 'LOGGING' in changed:
+        # Reopen the log files with the new paths:
+        configure_logging(settings.LOGGING_CONFIG, settings.LOGGING)
+
+    logger.info('Test worker %i environment: %s (%s)', worker_id, worker_dir, dict(methods))
+    return changed
+
+
+def _init_worker(counter, *args, **kwargs):
+    django_test_runner._init_worker(counter, *args, **kwargs)
+    setup_worker_environment(django_test_runner._worker_id)
+
+
+class YunohostParallelTestSuite(ParallelTestSuite):
+    init_worker = _init_worker
+
+
+class YunohostTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner with test database templates and an isolated "local_test" environment per parallel worker.
+    """
+
+    parallel_test_suite = YunohostParallelTestSuite
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.parallel > 1 and importlib.util.find_spec('tblib') is None:
+            # Without tblib the traceback of a failed test can't be sent from the worker process: The run crashes.
+            self.log(
+                'Run the tests serial, because "tblib" (needed by "--parallel") is not installed.',
+                level=logging.WARNING,
+            )
+            self.parallel = 1
+
+    def setup_databases(self, **kwargs):
+        with use_test_db_templates(aliases=kwargs.get('aliases')):
+            return super().setup_databases(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        shared_live_server.stop()
+        super().teardown_databases(old_config, **kwargs)
@@ -1,30 +1,125 @@
-import base64
+import atexit
+import collections
+import contextlib
+import functools
+import hashlib
+import ipaddress
+import json
+import logging
 import os
-from typing import Optional
+import socket
+import time
+from collections.abc import Generator
+from pathlib import Path
+from unittest import mock
 
 import requests
+from django.core.cache import caches
+from django.db import connections
+from django.test.testcases import LiveServerTestCase, LiveServerThread
+from django.test.utils import CaptureQueriesContext
 from packaging.version import Version
 
+from django_yunohost_integration.observability.slow_requests import CACHE_METHODS
+from django_yunohost_integration.sso_utils import generate_basic_auth  # noqa: F401
 
-def generate_basic_auth(username, password):
-    basic_auth = f'{username}:{password}'
-    basic_auth_creds = bytes(basic_auth, encoding='utf-8')
-    creds = str(base64.b64encode(basic_auth_creds), encoding='utf-8')
-    return f'basic {creds}'
 
+logger = logging.getLogger(__name__)
 
-def get_github_version_tag(github_project_url: str) -> Optional[Version]:
+
+GITHUB_TAGS_CACHE_TTL = 6 * 60 * 60  # Seconds before the tags are requested again
+GITHUB_API_TIMEOUT = (5, 15)  # connect and read timeout in seconds
+
+# Environment variables:
+GITHUB_TAGS_CACHE_DIR_ENV = 'YNH_GITHUB_TAGS_CACHE_DIR'  # Default: ~/.cache/django_yunohost_integration/github_tags/
+OFFLINE_ENV = 'YNH_OFFLINE'  # "1" -> never request GitHub, use only the cached tags
+
+
+def is_offline() -> bool:
+    return os.environ.get(OFFLINE_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_github_tags_cache_dir() -> Path:
+    if cache_dir := os.environ.get(GITHUB_TAGS_CACHE_DIR_ENV):
+        return Path(cache_dir)
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'django_yunohost_integration' / 'github_tags'
+
+
+@functools.cache
+def get_requests_session() -> requests.Session:
+    """
+    One shared session for all GitHub API requests, to reuse the connection.
+    """
+    session = requests.Session()
+    session.headers['Accept'] = 'application/vnd.github+json'
+    return session
+
+
+def get_github_tags(
+    api_url: str,
+    *,
+    cache_ttl: float = GITHUB_TAGS_CACHE_TTL,
+    offline: bool | None = None,
+) -> list | None:
+    """
+    Returns the tag names from the GitHub API, cached on disk.
+    Expired entries are revalidated via "If-None-Match", so an unchanged tag list doesn't count against the rate limit.
+    Returns None in offline mode without a cached value.
+    """
+    if offline is None:
+        offline = is_offline()
+
+    url = f'{api_url}/tags'
+    cache_path = get_github_tags_cache_dir() / f'{hashlib.sha256(url.encode()).hexdigest()[:16]}.json'
+    try:
+        entry = json.loads(cache_path.read_text())
+    except (FileNotFoundError, ValueError):
+        entry = None
+
+    if entry and (offline or time.time() - entry['fetched'] < cache_ttl):
+        return entry['tags']
+    if offline:
+        logger.warning('Offline mode: No cached tags for %s', url)
+        return None
+
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    try:
+        response = get_requests_session().get(url, headers=headers, timeout=GITHUB_API_TIMEOUT)
+        if response.status_code == 304 and entry:
+            tags = entry['tags']
+        else:
+            response.raise_for_status()
+            tags = [tag['name'] for tag in response.json()]
+    except requests.RequestException as err:
+        if not entry:
+            raise
+        logger.warning('Use cached tags, because of request error: %s', err)
+        return entry['tags']
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(
+        json.dumps({'url': url, 'etag': response.headers.get('ETag'), 'fetched': time.time(), 'tags': tags})
+    )
+    return tags
+
+
+def get_github_version_tag(github_project_url: str, *, offline: bool | None = None) -> Version | None:
     """
     Returns the last non-prerelease Version objects from github tags.
+    Returns None in offline mode without cached tags.
     """
     assert github_project_url.startswith(
         'https://github.com/'
     ), f'No Github Project url: {github_project_url!r}'
 
     api_url = github_project_url.replace('github.com', 'api.github.com/repos')
-    tags = requests.get(f'{api_url}/tags').json()
-    for tag in tags:
-        version_str = tag['name']
+    tags = get_github_tags(api_url, offline=offline)
+    if tags is None:
+        return None
+    for version_str in tags:
         ver_obj = Version(version_str)
         if ver_obj.base_version and not ver_obj.is_prerelease:
             return ver_obj
@@ -45,8 +140,240 @@ def assert_project_version(current_version: str, github_project_url: str) -> Non
         return
 
     github_ver = get_github_version_tag(github_project_url=github_project_url)
+    if github_ver is None:
+        # Offline without cached tags
+        return
     assert github_ver <= current_ver_obj, (
         f'Current version from {github_project_url} is: {github_ver} but current package version is: {current_ver_obj}'
     )
 
 
+LOOPBACK_HOST_NAMES = ('localhost',)
+
+
+def is_loopback_host(host: str) -> bool:
+    """
+    >>> is_loopback_host('127.0.0.1'), is_loopback_host('::1'), is_loopback_host('localhost')
+    (True, True, True)
+    >>> is_loopback_host('192.168.1.1'), is_loopback_host('example.tld')
+    (False, False)
+    """
+    if host in LOOPBACK_HOST_NAMES:
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def create_loopback_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None, **kwargs):
+    """
+    Like socket.create_connection(), but refuses any connection that doesn't go to this host.
+    """
+    host, port = address[:2]
+    if not is_loopback_host(host):
+        raise ConnectionRefusedError(f'Only loopback connections are allowed in tests, not: {address!r}')
+    errors = []
+    for family, sock_type, proto, _, sockaddr in socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM):
+        sock = socket.socket(family, sock_type, proto)
+        try:
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+        except OSError as err:
+            sock.close()
+            errors.append(err)
+        else:
+            return sock
+    raise errors[0] if errors else OSError(f'getaddrinfo returns an empty list for: {address!r}')
+
+
+def allow_loopback_connections():
+    """
+    Allow connections to local test servers, even if deny_any_real_request() is active, e.g.:
+
+        class MyServerTestCase(TestCase):
+            def setUp(self):
+                super().setUp()
+                self.enterContext(allow_loopback_connections())
+    """
+    return mock.patch.object(socket, 'create_connection', create_loopback_connection)
+
+
+@contextlib.contextmanager
+def assert_max_queries(max_queries: int, using: str = 'default') -> Generator[CaptureQueriesContext, None, None]:
+    """
+    Fails if the block executes more than "max_queries" database queries. The SQL is listed on failure.
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > max_queries:
+        queries = '\n'.join(f'{number}. {query["sql"]}' for number, query in enumerate(context.captured_queries, 1))
+        raise AssertionError(
+            f'{len(context)} queries executed on {using!r}, but max. {max_queries} allowed. Captured queries were:\n'
+            f'{queries}'
+        )
+
+
+def _count_calls(counter: collections.Counter, method_name: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        counter[method_name] += 1
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def assert_max_cache_calls(max_calls: int) -> Generator[collections.Counter, None, None]:
+    """
+    Fails if the block calls the cache methods (get, set, ...) of all caches more than "max_calls" times.
+    """
+    counter: collections.Counter[str] = collections.Counter()
+    with contextlib.ExitStack() as stack:
+        for cache in caches.all():
+            for method_name in CACHE_METHODS:
+                wrapper = _count_calls(counter, method_name, getattr(cache, method_name))
+                stack.enter_context(mock.patch.object(cache, method_name, wrapper))
+        yield counter
+    calls = sum(counter.values())
+    if calls > max_calls:
+        raise AssertionError(f'{calls} cache calls, but max. {max_calls} allowed: {dict(counter)}')
+
+
+@contextlib.contextmanager
+def assert_max_duration(max_seconds: float) -> Generator[None, None, None]:
+    """
+    Fails if the block takes longer than "max_seconds" wall time.
+    """
+    start = time.perf_counter()
+    yield
+    duration = time.perf_counter() - start
+    if duration > max_seconds:
+        raise AssertionError(f'Took {duration * 1000:.1f}ms, but max. {max_seconds * 1000:.1f}ms allowed')
+
+
+@contextlib.contextmanager
+def assert_performance_budget(
+    *,
+    max_queries: int | None = None,
+    max_cache_calls: int | None = None,
+    max_seconds: float | None = None,
+    using: str = 'default',
+) -> Generator[None, None, None]:
+    """
+    Combine the budget assertions above, e.g.:
+
+        with assert_performance_budget(max_queries=10, max_cache_calls=0, max_seconds=0.5):
+            response = self.client.get('/app_path/')
+    """
+    with contextlib.ExitStack() as stack:
+        if max_seconds is not None:
+            stack.enter_context(assert_max_duration(max_seconds))
+        if max_queries is not None:
+            stack.enter_context(assert_max_queries(max_queries, using=using))
+        if max_cache_calls is not None:
+            stack.enter_context(assert_max_cache_calls(max_cache_calls))
+        yield
+
+
+class PerformanceBudgetMixin:
+    """
+    TestCase mixin to lock in the query counts, cache calls and duration of views, e.g.:
+
+        class MyViewTestCase(PerformanceBudgetMixin, TestCase):
+            def test_view(self):
+                with self.assertMaxQueries(10), self.assertMaxDuration(0.5):
+                    response = self.client.get('/app_path/')
+    """
+
+    def assertMaxQueries(self, max_queries: int, using: str = 'default'):
+        return assert_max_queries(max_queries, using=using)
+
+    def assertMaxCacheCalls(self, max_calls: int):
+        return assert_max_cache_calls(max_calls)
+
+    def assertMaxDuration(self, max_seconds: float):
+        return assert_max_duration(max_seconds)
+
+    def assertPerformanceBudget(self, **budget):
+        return assert_performance_budget(**budget)
+
+
+class SharedLiveServer:
+    """
+    One live HTTP server (Django's threaded WSGI server) per test process, started on first use.
+    In-memory SQLite test databases are shared with the server thread, like LiveServerTestCase does.
+    Stopped before the test databases are destroyed, see: YunohostTestRunner.teardown_databases()
+    With other test runners, the server is stopped at exit.
+    """
+
+    host = 'localhost'
+
+    def __init__(self):
+        self.server_thread: LiveServerThread | None = None
+
+    def start(self) -> LiveServerThread:
+        if self.server_thread is None:
+            connections_override = {
+                connection.alias: connection
+                for connection in connections.all()
+                if connection.vendor == 'sqlite' and connection.is_in_memory_db()
+            }
+            for connection in connections_override.values():
+                connection.inc_thread_sharing()
+
+            server_thread = LiveServerThread(
+                self.host, LiveServerTestCase.static_handler, connections_override=connections_override, port=0
+            )
+            server_thread.daemon = True
+            server_thread.start()
+            server_thread.is_ready.wait()
+            if server_thread.error:
+                for connection in connections_override.values():
+                    connection.dec_thread_sharing()
+                raise server_thread.error
+            logger.info('Live server started on %s:%i', self.host, server_thread.port)
+            self.server_thread = server_thread
+            atexit.register(self.stop)
+        return self.server_thread
+
+    def stop(self) -> None:
+        atexit.unregister(self.stop)
+        if self.server_thread is not None:
+            self.server_thread.terminate()
+            for connection in self.server_thread.connections_override.values():
+                connection.dec_thread_sharing()
+            self.server_thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.start().port}'
+
+
+shared_live_server = SharedLiveServer()
+
+
+class SharedLiveServerTestCase(LiveServerTestCase):
+    """
+    Like LiveServerTestCase, but all test classes use the same server, so the startup cost is paid only once.
+    As a TransactionTestCase, all tables are flushed after each test, e.g.:
+
+        class MyEndToEndTestCase(SharedLiveServerTestCase):
+            def test_view(self):
+                connection = http.client.HTTPConnection(self.server_thread.host, self.server_thread.port)
+                connection.request('GET', '/app_path/', headers=get_sso_headers('test'))
+    """
+
+    host = SharedLiveServer.host
+
+    @classmethod
+    def _start_server_thread(cls):
+        cls.server_thread = shared_live_server.start()
+
+    @classmethod
+    def _terminate_thread(cls):
+        # The shared server is stopped after all tests
+        pass
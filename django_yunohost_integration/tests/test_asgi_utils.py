@@ -0,0 +1,72 @@
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.test import TransactionTestCase
+
+from django_yunohost_integration.asgi_utils import SSOwatHeadersMiddleware, get_local_test_application
+
+
+def get_scope(path: str, headers: list) -> dict:
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'https',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers],
+        'client': ('127.0.0.1', 12345),
+        'server': ('testserver', 443),
+    }
+
+
+class SSOwatHeadersMiddlewareTestCase(TransactionTestCase):
+    # Not a TestCase: The sync views may run in another thread with its own database connection
+    @async_to_sync
+    async def request(self, application, path: str, headers: list) -> tuple[int, list, bytes]:
+        communicator = ApplicationCommunicator(application, get_scope(path, headers))
+        await communicator.send_input({'type': 'http.request', 'body': b'', 'more_body': False})
+        start = await communicator.receive_output(timeout=10)
+        body = b''
+        while True:
+            message = await communicator.receive_output(timeout=10)
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        await communicator.wait(timeout=10)
+        return start['status'], start['headers'], body
+
+    def test_sso_login(self):
+        application = SSOwatHeadersMiddleware(get_asgi_application(), default_username='asgi-user')
+        status, headers, _ = self.request(application, '/app_path/', headers=[])
+        self.assertEqual(status, 200)
+        self.assertIn((b'Set-Cookie', b'sessionid='), [(key, value[:10]) for key, value in headers])
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['asgi-user'])
+
+        # Select the user per request, SSOwat headers from the client are replaced:
+        status, headers, _ = self.request(
+            application,
+            '/app_path/',
+            headers=[(b'x-simulate-ynh-user', b'other-user'), (b'ynh-user', b'evil'), (b'remote-user', b'evil')],
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(sorted(User.objects.values_list('username', flat=True)), ['asgi-user', 'other-user'])
+
+    def test_without_sso_headers(self):
+        status, headers, _ = self.request(get_asgi_application(), '/app_path/login-required/', headers=[])
+        self.assertEqual(status, 302)
+        self.assertIn((b'Location', b'/yunohost/sso/?next=/app_path/login-required/'), headers)
+
+    def test_local_test_application(self):
+        application = get_local_test_application()
+        self.assertIsInstance(application, SSOwatHeadersMiddleware)
+        self.assertEqual(application.default_username, 'test')
+        self.assertEqual(application.jwt_cookie_name, 'yunohost.portal')
+
+        status, _, _ = self.request(application, '/app_path/', headers=[])
+        self.assertEqual(status, 200)
+        self.assertTrue(User.objects.filter(username='test').exists())
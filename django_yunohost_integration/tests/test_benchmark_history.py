@@ -0,0 +1,116 @@
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from django_yunohost_integration.benchmark_history import (
+    IMPROVED,
+    NEW,
+    REGRESSION,
+    REMOVED,
+    UNCHANGED,
+    compare_results,
+    find_baseline,
+    format_comparison_report,
+    get_history_dir,
+    load_result,
+    save_result,
+)
+from django_yunohost_integration.benchmark_utils import get_git_revision
+
+
+def make_result(revision, **p50_values):
+    return {
+        'metadata': {'git_revision': revision},
+        'results': {name: {'count': 100, 'p50': p50, 'p90': p50 * 1.05} for name, p50 in p50_values.items()},
+    }
+
+
+class BenchmarkHistoryTestCase(TestCase):
+    def test_get_history_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = Path(temp_dir)
+            (base_path / 'pyproject.toml').write_text('[ynh-integration]\nbenchmark_history_dir = "/tmp/history"\n')
+            self.assertEqual(get_history_dir(base_path=base_path), Path('/tmp/history'))
+
+            # Relative to the project root, not to the current working directory:
+            (base_path / 'pyproject.toml').write_text('[ynh-integration]\nbenchmark_history_dir = "benchmarks"\n')
+            self.assertEqual(get_history_dir(base_path=base_path), base_path / 'benchmarks')
+
+        self.assertEqual(get_history_dir().parts[-3:], ('local_test', 'benchmarks', 'history'))
+
+    def test_get_git_revision(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_path = Path(temp_dir)
+            self.assertIsNone(get_git_revision(cwd=repo_path))
+
+            def git(*args):
+                subprocess.check_output(
+                    ['git', '-c', 'user.name=test', '-c', 'user.email=test@test.tld', *args], cwd=repo_path
+                )
+
+            git('init', '--quiet')
+            (repo_path / 'foo.txt').write_text('foo')
+            git('add', 'foo.txt')
+            git('commit', '--quiet', '--no-verify', '--message=foo')
+            revision = get_git_revision(cwd=repo_path)
+            self.assertRegex(revision, r'^[0-9a-f]{40}$')
+
+            (repo_path / 'untracked.txt').write_text('bar')
+            self.assertEqual(get_git_revision(cwd=repo_path), revision)
+
+            (repo_path / 'foo.txt').write_text('changed')
+            self.assertEqual(get_git_revision(cwd=repo_path), f'{revision}-dirty')
+
+    def test_save_and_find(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history_dir = Path(temp_dir) / 'history'
+            self.assertIsNone(find_baseline(history_dir))
+
+            old_path = save_result(make_result('aaa111', foo=1.0), history_dir=history_dir)
+            self.assertEqual(old_path, history_dir / 'aaa111.json')
+            os.utime(old_path, (1, 1))
+            new_path = save_result(make_result('bbb222', foo=2.0), history_dir=history_dir)
+            self.assertEqual(load_result(new_path), make_result('bbb222', foo=2.0))
+
+            unknown_path = save_result({'metadata': {'git_revision': None}, 'results': {}}, history_dir=history_dir)
+            self.assertEqual(unknown_path.name, 'unknown.json')
+            os.utime(unknown_path, (0, 0))
+
+            self.assertEqual(find_baseline(history_dir), new_path)
+            self.assertEqual(find_baseline(history_dir, exclude_revision='bbb222'), old_path)
+            self.assertEqual(find_baseline(history_dir, revision='aaa'), old_path)
+            self.assertIsNone(find_baseline(history_dir, revision='ccc'))
+
+            # A run with uncommitted changes doesn't overwrite the result of the committed revision:
+            dirty_path = save_result(make_result('bbb222-dirty', foo=3.0), history_dir=history_dir)
+            self.assertEqual(dirty_path, history_dir / 'bbb222-dirty.json')
+            self.assertEqual(load_result(new_path), make_result('bbb222', foo=2.0))
+            # ...and is compared with the committed revision:
+            self.assertEqual(find_baseline(history_dir, exclude_revision='bbb222-dirty'), new_path)
+            self.assertEqual(find_baseline(history_dir, revision='bbb'), new_path)
+            self.assertEqual(find_baseline(history_dir, revision='bbb222-dirty'), dirty_path)
+
+    def test_compare_results(self):
+        comparisons = compare_results(
+            make_result('aaa111', slower=1.0, faster=1.0, same=1.0, fast=0.001, removed=1.0),
+            make_result('bbb222', slower=1.5, faster=0.5, same=1.02, fast=0.004, added=1.0),
+            threshold_percent=10,
+            min_delta_ms=0.005,
+        )
+        self.assertEqual(
+            {comparison.name: comparison.status for comparison in comparisons},
+            {
+                'slower': REGRESSION,
+                'faster': IMPROVED,
+                'same': UNCHANGED,
+                'fast': UNCHANGED,  # +300% but below "min_delta_ms"
+                'added': NEW,
+                'removed': REMOVED,
+            },
+        )
+        report = format_comparison_report(comparisons, baseline_revision='aaa111', current_revision='bbb222')
+        self.assertIn('baseline: aaa111 current: bbb222', report)
+        self.assertIn('+50.0%', report)
+        self.assertIn('\nremoved                                  1.000          -', report)
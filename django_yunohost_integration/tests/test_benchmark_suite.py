@@ -0,0 +1,35 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase
+
+from django_yunohost_integration.benchmark_suite import (
+    BENCHMARKS,
+    get_environment_metadata,
+    run_benchmarks,
+    write_results,
+)
+
+
+class BenchmarkSuiteTestCase(TestCase):
+    def test_run_benchmarks(self):
+        results = run_benchmarks(iterations=3)
+        self.assertEqual(list(results), list(BENCHMARKS))
+        for name, summary in results.items():
+            self.assertEqual(summary['count'], 3, name)
+            self.assertGreater(summary['ops_per_sec'], 0, name)
+
+        results = run_benchmarks(iterations=2, names=['verify_sso_jwt'])
+        self.assertEqual(list(results), ['verify_sso_jwt'])
+
+    def test_write_results(self):
+        metadata = get_environment_metadata()
+        self.assertEqual(metadata['database'], 'sqlite')
+        self.assertGreaterEqual(metadata['cpu_count'], 1)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'benchmarks' / 'results.json'
+            write_results(path, results={'foo': {'count': 1}}, metadata=metadata)
+            data = json.loads(path.read_text())
+        self.assertEqual(data, {'metadata': metadata, 'results': {'foo': {'count': 1}}})
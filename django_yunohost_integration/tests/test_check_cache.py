@@ -0,0 +1,128 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.core import checks
+from django.core.checks import Warning
+from django.core.checks.registry import registry
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import captured_stderr
+
+from django_yunohost_integration import check_cache
+
+
+class CheckCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data_dir_path = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(YNH_CHECK_CACHE=True, DATA_DIR_PATH=self.data_dir_path))
+        self.registry_run_checks = self.enterContext(
+            mock.patch.object(registry, 'run_checks', return_value=[Warning('Foo', hint='Bar', id='test.W001')])
+        )
+
+    def test_run_checks(self):
+        expected = [Warning('Foo', hint='Bar', id='test.W001')]
+        self.assertEqual(check_cache.run_checks(include_deployment_checks=True), expected)
+        self.assertEqual(check_cache.run_checks(include_deployment_checks=True), expected)
+        self.assertEqual(self.registry_run_checks.call_count, 1)
+
+        cache = json.loads((self.data_dir_path / 'system_checks_cache.json').read_text())
+        self.assertEqual(cache['fingerprint'], check_cache.get_fingerprint())
+        self.assertEqual(
+            cache['results'],
+            {
+                'tags=None deploy=True': [
+                    {'level': 30, 'msg': 'Foo', 'hint': 'Bar', 'id': 'test.W001'},
+                ]
+            },
+        )
+
+        # Other arguments -> other results:
+        check_cache.run_checks(tags=['performance'])
+        self.assertEqual(self.registry_run_checks.call_count, 2)
+
+        # Changed settings or packages -> run the checks again:
+        with mock.patch.object(check_cache, 'get_fingerprint', return_value='changed'):
+            check_cache.run_checks(include_deployment_checks=True)
+            check_cache.run_checks(include_deployment_checks=True)
+        self.assertEqual(self.registry_run_checks.call_count, 3)
+
+        # Not cached: Deactivated, checks of only some apps, database checks or messages with objects:
+        with override_settings(YNH_CHECK_CACHE=False):
+            check_cache.run_checks()
+        check_cache.run_checks(app_configs=[])
+        self.assertEqual(self.registry_run_checks.call_count, 5)
+
+        check_cache.run_checks(databases=['default'])
+        check_cache.run_checks(databases=['default'])
+        self.assertEqual(self.registry_run_checks.call_count, 7)
+
+        self.registry_run_checks.return_value = [Warning('Foo', obj=object())]
+        check_cache.run_checks(tags=['models'])
+        check_cache.run_checks(tags=['models'])
+        self.assertEqual(self.registry_run_checks.call_count, 9)
+
+    def test_broken_cache_file(self):
+        cache_path = self.data_dir_path / 'system_checks_cache.json'
+        cache_path.write_text('{broken')
+        with self.assertLogs('django_yunohost_integration', level='WARNING') as logs:
+            check_cache.run_checks()
+        self.assertIn('Ignore broken system checks cache', logs.output[0])
+        self.assertIn('fingerprint', json.loads(cache_path.read_text()))
+
+    def test_fingerprint(self):
+        start = time.monotonic()
+        fingerprint = check_cache.get_fingerprint()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(len(fingerprint), 64)
+        self.assertEqual(check_cache.get_fingerprint(), fingerprint)
+
+        settings_files = [path.name for path in check_cache.iter_settings_files()]
+        self.assertIn('settings.py', settings_files)
+
+        package_names = [path.name for path in check_cache.iter_installed_packages()]
+        self.assertTrue(any(name.lower().startswith('django-') for name in package_names), package_names)
+
+        # Other settings are active:
+        with mock.patch.dict('os.environ', {'ENV_TYPE': 'other'}):
+            self.assertNotEqual(check_cache.get_fingerprint(), fingerprint)
+        self.assertEqual(check_cache.get_fingerprint(), fingerprint)
+
+    def test_fingerprint_editable_install(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            dist_info_path = temp_path / 'site-packages' / 'foo-1.0.dist-info'
+            dist_info_path.mkdir(parents=True)
+            source_path = temp_path / 'foo source'
+            source_path.mkdir()
+            (dist_info_path / 'direct_url.json').write_text(
+                json.dumps({'dir_info': {'editable': True}, 'url': source_path.as_uri()})
+            )
+            module_path = source_path / 'foo.py'
+            module_path.write_text('# foo')
+            module = mock.Mock(__file__=str(module_path))
+            with (
+                mock.patch.object(check_cache, 'iter_installed_packages', return_value=[dist_info_path]),
+                mock.patch.dict('sys.modules', {'foo': module}),
+            ):
+                self.assertEqual(list(check_cache.iter_editable_source_dirs()), [source_path])
+                self.assertEqual(list(check_cache.iter_editable_module_files()), [module_path])
+
+                fingerprint = check_cache.get_fingerprint()
+                module_path.write_text('# foo changed')
+                self.assertNotEqual(check_cache.get_fingerprint(), fingerprint)
+
+    def test_management_command(self):
+        with mock.patch.object(checks, 'run_checks'):
+            check_cache.install()
+            self.assertIs(checks.run_checks, check_cache.run_checks)
+
+            with captured_stderr() as stderr:
+                call_command('check')
+                call_command('check')
+        self.assertIsNot(checks.run_checks, check_cache.run_checks)
+        self.assertEqual(self.registry_run_checks.call_count, 1)
+        self.assertIn('(test.W001) Foo', stderr.getvalue())
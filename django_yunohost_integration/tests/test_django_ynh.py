@@ -11,12 +11,12 @@ from django.urls.base import reverse
 from django.views.generic import RedirectView
 from django_example.views import LoginRequiredView
 
-from django_yunohost_integration.test_utils import generate_basic_auth
+from django_yunohost_integration.test_utils import PerformanceBudgetMixin, generate_basic_auth
 from django_yunohost_integration.yunohost.tests.test_ynh_jwt import create_jwt
 from django_yunohost_integration.yunohost_utils import SSOwatLoginRedirectView, decode_ssowat_uri
 
 
-class DjangoYnhTestCase(HtmlAssertionMixin, TestCase):
+class DjangoYnhTestCase(PerformanceBudgetMixin, HtmlAssertionMixin, TestCase):
     maxDiff = None
 
     def setUp(self):
@@ -146,7 +146,12 @@ class DjangoYnhTestCase(HtmlAssertionMixin, TestCase):
 
         self.client.cookies['yunohost.portal'] = create_jwt(username='test')
 
-        with self.assertLogs('django_yunohost_integration') as logs, self.assertLogs('django_example') as app_logs:
+        with (
+            self.assertLogs('django_yunohost_integration') as logs,
+            self.assertLogs('django_example') as app_logs,
+            self.assertMaxQueries(18),  # Create and login the user, store session and axes access log
+            self.assertMaxCacheCalls(0),
+        ):
             response = self.client.get(
                 path='/app_path/',
                 HTTP_YNH_USER='test',
@@ -184,13 +189,27 @@ class DjangoYnhTestCase(HtmlAssertionMixin, TestCase):
         )
         self.assertEqual(app_logs.output, ['INFO:django_example.views:DebugView request from user: test'])
 
+        # The next request uses the existing session:
+        with self.assertLogs('django_example'), self.assertMaxQueries(2), self.assertMaxCacheCalls(0):  # session + user
+            response = self.client.get(
+                path='/app_path/',
+                HTTP_YNH_USER='test',
+                HTTP_AUTH_USER='test',
+                HTTP_AUTHORIZATION='basic dGVzdDp0ZXN0MTIz',
+            )
+        self.assertEqual(response.status_code, 200)
+
     @override_settings(SECURE_SSL_REDIRECT=False)
     def test_create_unknown_user(self):
         self.assertEqual(User.objects.count(), 0)
 
         self.client.cookies['yunohost.portal'] = create_jwt(username='test')
 
-        with self.assertLogs('django_yunohost_integration') as logs, self.assertLogs('django_example') as app_logs:
+        with (
+            self.assertLogs('django_yunohost_integration') as logs,
+            self.assertLogs('django_example') as app_logs,
+            self.assertPerformanceBudget(max_queries=18, max_cache_calls=0),
+        ):
             response = self.client.get(
                 path='/app_path/',
                 HTTP_YNH_USER='test',
@@ -0,0 +1,65 @@
+import json
+import logging
+import logging.handlers
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from django_yunohost_integration.environment_benchmark import benchmark_logging
+
+
+class EnvironmentBenchmarkTestCase(TestCase):
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_path = Path(temp_dir) / 'benchmark.json'
+            stdout = StringIO()
+            call_command('benchmark_environment', '--iterations', '3', '--json', str(json_path), stdout=stdout)
+            data = json.loads(json_path.read_text())
+
+        output = stdout.getvalue()
+        self.assertIn('Database: sqlite', output)
+        self.assertIn('all times in milliseconds', output)
+        self.assertIn('fsync.DATA_DIR_PATH.8m throughput: ', output)
+        self.assertIn(f'Results saved to: {json_path}', output)
+
+        self.assertEqual(data['metadata']['errors'], {})
+        results = data['results']
+        for name in (
+            'db.default.round_trip',
+            'db.default.simple_query',
+            'cache.default.set',
+            'cache.default.get',
+            'fsync.DATA_DIR_PATH.4k',
+            'fsync.INSTALL_DIR_PATH.4k',
+        ):
+            self.assertEqual(results[name]['count'], 3)
+            self.assertEqual(set(results[name]), {'count', 'mean', 'p50', 'p90', 'p99', 'max'}, name)
+            self.assertIn(name, output)
+        self.assertEqual(results['fsync.DATA_DIR_PATH.8m']['count'], 3)
+
+        with self.assertRaisesMessage(CommandError, 'must be at least 1, not 0'):
+            call_command('benchmark_environment', '--iterations', '0')
+
+    def test_logging(self):
+        test_logger = logging.getLogger('ynh_benchmark_test')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = Path(temp_dir) / 'app.log'
+            file_handler = logging.handlers.WatchedFileHandler(log_path)
+            file_handler.name = 'test_log_file'
+            syslog_handler = logging.handlers.SysLogHandler(address=str(Path(temp_dir) / 'syslog.sock'))
+            syslog_handler.name = 'test_syslog'
+            for handler in (file_handler, syslog_handler):
+                test_logger.addHandler(handler)
+                self.addCleanup(handler.close)
+                self.addCleanup(test_logger.removeHandler, handler)
+
+            results, skipped = benchmark_logging(iterations=3)
+
+            self.assertEqual(results['logging.test_log_file']['count'], 3)
+            self.assertIn('test_syslog (SysLogHandler can not write into a temp file)', skipped)
+            # Nothing is written into the real log file and the temp file is removed:
+            self.assertEqual(log_path.read_text(), '')
+            self.assertEqual([path.name for path in Path(temp_dir).iterdir()], ['app.log'])
@@ -0,0 +1,133 @@
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from django_yunohost_integration import gunicorn_config
+from django_yunohost_integration.gunicorn_config import (
+    HostResources,
+    calculate_config,
+    get_memory_available,
+    is_asgi_worker_installed,
+)
+from django_yunohost_integration.management.commands import gunicorn_config as gunicorn_config_command
+
+
+MIB = 1024 * 1024
+
+
+class GunicornConfigTestCase(SimpleTestCase):
+    def test_calculate_config(self):
+        config = calculate_config(HostResources(cpu_count=1, memory_available=100 * MIB))
+        self.assertEqual((config.workers, config.threads, config.worker_class), (1, 3, 'gthread'))
+
+        config = calculate_config(HostResources(cpu_count=2, memory_available=4096 * MIB), worker_memory=50 * MIB)
+        self.assertEqual((config.workers, config.threads, config.worker_class), (5, 1, 'sync'))
+
+        # Config panel values take precedence:
+        config = calculate_config(
+            HostResources(cpu_count=2, memory_available=4096 * MIB), workers=2, threads=8, max_requests=500
+        )
+        self.assertEqual((config.workers, config.threads, config.worker_class), (2, 8, 'gthread'))
+        self.assertEqual((config.max_requests, config.max_requests_jitter), (500, 50))
+
+    def test_get_memory_available(self):
+        with tempfile.NamedTemporaryFile('w') as meminfo:
+            meminfo.write('MemTotal:        8000000 kB\nMemFree:          100000 kB\nMemAvailable:    2000000 kB\n')
+            meminfo.flush()
+            self.assertEqual(get_memory_available(Path(meminfo.name)), 2000000 * 1024)
+        self.assertGreater(get_memory_available(Path('/does/not/exist')), 0)
+
+    def test_is_asgi_worker_installed(self):
+        with mock.patch.object(gunicorn_config.importlib.util, 'find_spec', return_value=None) as find_spec:
+            self.assertIs(is_asgi_worker_installed(), False)
+        find_spec.assert_called_once_with('uvicorn_worker')
+
+    def test_hooks(self):
+        with (
+            mock.patch('django.db.connections.close_all') as close_db,
+            mock.patch('django.core.cache.caches.close_all') as close_caches,
+        ):
+            gunicorn_config.when_ready(server=None)
+            gunicorn_config.post_fork(server=None, worker=None)
+        self.assertEqual(close_db.call_count, 2)
+        self.assertEqual(close_caches.call_count, 2)
+
+    @override_settings(
+        SETTINGS_MODULE='settings',  # Would be None with override_settings()
+        YNH_GUNICORN_WORKERS=3,
+        YNH_GUNICORN_THREADS=None,
+        YNH_GUNICORN_BIND='127.0.0.1:8123',
+    )
+    def test_command(self):
+        resources = HostResources(cpu_count=4, memory_available=2048 * MIB)
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            mock.patch.object(gunicorn_config_command, 'get_host_resources', return_value=resources),
+        ):
+            output = Path(temp_dir) / 'gunicorn.conf.py'
+            stderr = StringIO()
+            call_command('gunicorn_config', '--output', str(output), stderr=stderr)
+            self.assertIn('3 workers x 3 threads (gthread) on 4 CPUs with 2048.0 MiB RAM available', stderr.getvalue())
+
+            content = output.read_text()
+            self.assertIn('# Host: 4 CPUs, 2048.0 MiB RAM available, 100.0 MiB per worker\n', content)
+            config = {}
+            exec(content, config)
+            self.assertEqual(config['bind'], '127.0.0.1:8123')
+            self.assertEqual(config['raw_env'], ['DJANGO_SETTINGS_MODULE=settings'])
+            self.assertTrue(Path(config['chdir'], 'settings.py').is_file())
+            self.assertEqual(
+                {key: config[key] for key in ('worker_class', 'workers', 'threads', 'preload_app')},
+                {'worker_class': 'gthread', 'workers': 3, 'threads': 3, 'preload_app': True},
+            )
+            self.assertIs(config['post_fork'], gunicorn_config.post_fork)
+            self.assertIs(config['when_ready'], gunicorn_config.when_ready)
+
+            # gunicorn accepts the file and can load the app:
+            process = subprocess.run(
+                [sys.executable, '-m', 'gunicorn', '--check-config', '--config', str(output)],
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=60,
+            )
+            self.assertEqual(process.returncode, 0, process.stderr)
+
+        stdout = StringIO()
+        call_command('gunicorn_config', '--output', '-', '--workers', '1', '--threads', '1', stdout=stdout)
+        self.assertIn("worker_class = 'sync'\nworkers = 1\nthreads = 1\n", stdout.getvalue())
+
+        # The threads and the worker class are calculated for the given workers:
+        stdout = StringIO()
+        with mock.patch.object(gunicorn_config_command, 'get_host_resources', return_value=resources):
+            call_command('gunicorn_config', '--output', '-', '--workers=1', '--bind=127.0.0.1:9000', stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn("bind = '127.0.0.1:9000'\n", output)
+        self.assertIn("worker_class = 'gthread'\nworkers = 1\nthreads = 4\n", output)
+
+        # ASGI via uvicorn workers:
+        with (
+            mock.patch.object(gunicorn_config_command, 'is_asgi_worker_installed', return_value=False),
+            self.assertRaisesMessage(CommandError, 'Please install "uvicorn-worker"'),
+        ):
+            call_command('gunicorn_config', '--output', '-', '--asgi')
+
+        stdout = StringIO()
+        with mock.patch.object(gunicorn_config_command, 'is_asgi_worker_installed', return_value=True):
+            call_command('gunicorn_config', '--output', '-', '--asgi', stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn("wsgi_app = 'asgi:application'\n", output)
+        self.assertIn("worker_class = 'uvicorn_worker.UvicornWorker'\n", output)
+        self.assertIn('threads = 1\n', output)
+
+        with (
+            mock.patch.object(gunicorn_config_command, 'is_asgi_worker_installed', return_value=True),
+            self.assertRaisesMessage(CommandError, '--threads can not be used with ASGI'),
+        ):
+            call_command('gunicorn_config', '--output', '-', '--asgi', '--threads', '4')
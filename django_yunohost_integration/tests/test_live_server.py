@@ -0,0 +1,75 @@
+import http.client
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+
+from django_yunohost_integration import test_utils
+from django_yunohost_integration.sso_utils import get_sso_headers
+from django_yunohost_integration.test_utils import (
+    SharedLiveServer,
+    SharedLiveServerTestCase,
+    allow_loopback_connections,
+    shared_live_server,
+)
+
+
+class LiveServerTestMixin:
+    def request(self, path: str, headers: dict) -> http.client.HTTPResponse:
+        with allow_loopback_connections():
+            # HTTPConnection binds socket.create_connection() on creation:
+            connection = http.client.HTTPConnection(self.server_thread.host, self.server_thread.port, timeout=10)
+            self.addCleanup(connection.close)
+            # Like nginx: Mark the request as HTTPS, otherwise SecurityMiddleware redirects to HTTPS
+            connection.request('GET', path, headers={'X-Forwarded-Protocol': 'https', **headers})
+        response = connection.getresponse()
+        response.read()
+        return response
+
+
+class SharedLiveServerTestCase1(LiveServerTestMixin, SharedLiveServerTestCase):
+    def test_sso_login_via_http(self):
+        self.assertIs(self.server_thread, shared_live_server.start())
+        self.assertEqual(self.live_server_url, shared_live_server.url)
+
+        self.assertFalse(User.objects.exists())
+        response = self.request('/app_path/', headers=get_sso_headers('live-user'))
+        self.assertEqual(response.status, 200)
+        cookies = ' '.join(response.headers.get_all('Set-Cookie'))
+        self.assertIn('sessionid=', cookies)
+
+        # The request was handled with the test database:
+        user = User.objects.get()
+        self.assertEqual(user.username, 'live-user')
+
+    def test_without_sso_headers(self):
+        self.assertFalse(User.objects.exists())  # Flushed after the test above
+        response = self.request('/app_path/login-required/', headers={})
+        self.assertEqual(response.status, 302)
+        self.assertEqual(response.headers['Location'], '/yunohost/sso/?next=/app_path/login-required/')
+
+
+class SharedLiveServerTestCase2(LiveServerTestMixin, SharedLiveServerTestCase):
+    def test_same_server(self):
+        self.assertIs(self.server_thread, shared_live_server.server_thread)
+        self.assertFalse(User.objects.exists())
+
+        response = self.request('/app_path/', headers=get_sso_headers('other-user'))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['other-user'])
+
+
+class SharedLiveServerTestCase3(SimpleTestCase):
+    def test_stop_at_exit(self):
+        server = SharedLiveServer()
+        with (
+            mock.patch.object(test_utils.atexit, 'register') as register,
+            mock.patch.object(test_utils.atexit, 'unregister') as unregister,
+        ):
+            server_thread = server.start()
+            register.assert_called_once_with(server.stop)
+
+            server.stop()
+            unregister.assert_called_once_with(server.stop)
+        self.assertIsNone(server.server_thread)
+        self.assertFalse(server_thread.is_alive())
@@ -0,0 +1,98 @@
+import base64
+import http.server
+import subprocess
+import sys
+import threading
+from typing import ClassVar
+from unittest import TestCase
+
+import jwt
+
+from django_yunohost_integration.load_test import (
+    CONNECTION_ERROR,
+    format_report,
+    get_free_port,
+    run_load_test,
+)
+from django_yunohost_integration.sso_utils import get_sso_headers
+from django_yunohost_integration.test_utils import allow_loopback_connections
+
+
+class SSOwatHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    seen_cookies: ClassVar[set] = set()
+
+    def do_GET(self):
+        self.seen_cookies.add(self.headers['Cookie'])
+        status = 200 if self.headers['Ynh-User'] != 'forbidden-user' else 403
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.send_header('Set-Cookie', f'sessionid=session-{self.headers["Ynh-User"]}; HttpOnly; Path=/')
+        self.end_headers()
+        self.wfile.write(b'OK')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LoadTestTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(allow_loopback_connections())
+
+    def test_get_sso_headers(self):
+        headers = get_sso_headers('foo', jwt_cookie_name='jwt-cookie')
+        self.assertEqual(headers['Ynh-User'], 'foo')
+        self.assertEqual(headers['Authorization'], 'basic ' + base64.b64encode(b'foo:load-test').decode())
+
+        cookie_name, sso_jwt = headers['Cookie'].split('=', 1)
+        self.assertEqual(cookie_name, 'jwt-cookie')
+        self.assertEqual(jwt.decode(sso_jwt, options={'verify_signature': False}), {'user': 'foo'})
+
+    def test_imports(self):
+        # The load test and the SSOwat proxy run outside of the tests: Don't import the test helpers and the ORM:
+        code = (
+            'import sys, django_yunohost_integration.load_test, django_yunohost_integration.ssowat_proxy;'
+            'print(sorted(name for name in sys.modules if name.startswith('
+            '("django.test", "django.db", "django_yunohost_integration.test_utils"))))'
+        )
+        process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        self.assertEqual(process.stdout, '[]\n')
+
+    def test_run_load_test(self):
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), SSOwatHandler)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            result = run_load_test(
+                port=server.server_address[1],
+                path='/app_path/',
+                usernames=['user-a', 'user-b', 'forbidden-user'],
+                clients=2,
+                duration=0.3,
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertGreater(result.status_counts[200], 2)
+        self.assertGreater(result.status_counts[403], 0)
+        self.assertEqual(result.errors, result.status_counts[403])
+        self.assertEqual(len(result.latencies), result.requests)
+        self.assertGreater(result.requests_per_sec, 0)
+
+        # The session cookie is sent back:
+        self.assertTrue(any('sessionid=session-user-a' in cookie for cookie in SSOwatHandler.seen_cookies))
+
+        report = format_report(result)
+        self.assertIn(' errors\n', report)
+        self.assertIn(' 403\n', report)
+        self.assertIn('request ', report)
+
+    def test_connection_error(self):
+        result = run_load_test(port=get_free_port(), path='/', usernames=['foo'], clients=1, duration=0.5)
+        self.assertEqual(list(result.status_counts), [CONNECTION_ERROR])
+        # The client waits between the retries (0.05 + 0.1 + 0.2 sec.), instead of retrying in a tight loop:
+        self.assertLessEqual(result.requests, 5)
+        self.assertEqual(result.errors, result.requests)
+        self.assertEqual(result.latencies, [])
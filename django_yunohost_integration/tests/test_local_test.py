@@ -0,0 +1,164 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from bx_py_utils.test_utils.redirect import RedirectOut
+
+from django_yunohost_integration import local_test
+from django_yunohost_integration.local_test import (
+    LocalTestManifest,
+    call_manage_commands,
+    call_uvicorn,
+    copy_patch,
+    write_file,
+)
+from django_yunohost_integration.path_utils import get_project_root
+
+
+class LocalTestTestCase(TestCase):
+    def test_copy_patch_with_manifest(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            src_file = temp_path / 'settings.py'
+            src_file.write_text("PATH = '__DATA_DIR__'\nHOST = '__CURRENT_HOST__'\n")
+            data_dir_path = temp_path / 'data'
+            data_dir_path.mkdir()
+            dst_file = data_dir_path / 'settings.py'
+            manifest_path = temp_path / 'manifest.json'
+            replaces = {'__DATA_DIR__': '/data'}
+
+            def patch(replaces):
+                manifest = LocalTestManifest(manifest_path)
+                with RedirectOut() as buffer:
+                    written = copy_patch(src_file, replaces, data_dir_path, manifest=manifest)
+                manifest.save()
+                self.assertEqual(buffer.stderr, '')
+                return written, buffer.stdout
+
+            written, output = patch(replaces)
+            self.assertIs(written, True)
+            self.assertIn('settings.py ->', output)
+            self.assertEqual(dst_file.read_text(), "PATH = '/data'\nHOST = '__CURRENT_HOST__'\n")
+            self.assertEqual(LocalTestManifest(manifest_path).get_unresolved(dst_file), ['__CURRENT_HOST__'])
+
+            # Nothing changed -> skip the file:
+            self.assertEqual(patch(replaces), (False, ''))
+
+            # Changed replacements, source file or modified destination file -> write again:
+            self.assertIs(patch({**replaces, '__CURRENT_HOST__': 'example.tld'})[0], True)
+            self.assertEqual(dst_file.read_text(), "PATH = '/data'\nHOST = 'example.tld'\n")
+            self.assertEqual(LocalTestManifest(manifest_path).get_unresolved(dst_file), [])
+
+            src_file.write_text("PATH = '__DATA_DIR__/foo'\n")
+            self.assertIs(patch(replaces)[0], True)
+            self.assertEqual(dst_file.read_text(), "PATH = '/data/foo'\n")
+
+            dst_file.write_text('modified')
+            self.assertIs(patch(replaces)[0], True)
+            self.assertEqual(dst_file.read_text(), "PATH = '/data/foo'\n")
+
+            dst_file.unlink()
+            self.assertIs(patch(replaces)[0], True)
+            self.assertIs(patch(replaces)[0], False)
+
+    def test_write_file_without_manifest(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dst_file = Path(temp_dir) / 'local_settings.py'
+            self.assertIs(write_file(dst_file, source='# __NOT_REPLACED__'), True)
+            self.assertIs(write_file(dst_file, source='# __NOT_REPLACED__'), True)
+            self.assertEqual(dst_file.read_text(), '# __NOT_REPLACED__')
+
+            # A broken manifest file is ignored:
+            manifest_path = Path(temp_dir) / 'manifest.json'
+            manifest_path.write_text('{broken')
+            self.assertEqual(LocalTestManifest(manifest_path).entries, {})
+
+    def test_call_manage_commands(self):
+        data_dir_path = Path('/local_test/opt_yunohost')
+        commands = [('migrate', '--no-input'), ('create_superuser', '--username=test')]
+
+        with (
+            mock.patch.object(local_test, 'setup_django') as setup_django,
+            mock.patch('django.core.management.call_command') as call_command,
+            mock.patch.object(local_test.contextlib, 'chdir') as chdir,
+            mock.patch.object(local_test, 'call_manage_py') as call_manage_py,
+            RedirectOut() as buffer,
+        ):
+            steps = call_manage_commands(data_dir_path, *commands)
+        setup_django.assert_called_once_with(data_dir_path, 'settings')
+        self.assertEqual(call_command.call_args_list, [mock.call(*args) for args in commands])
+        chdir.assert_called_with(data_dir_path)
+        call_manage_py.assert_not_called()
+        self.assertEqual([step.args for step in steps], commands)
+        self.assertIn('sec. manage.py create_superuser --username=test', buffer.stdout)
+
+        with (
+            mock.patch.object(local_test, 'setup_django') as setup_django,
+            mock.patch.object(local_test, 'call_manage_py') as call_manage_py,
+            RedirectOut(),
+        ):
+            steps = call_manage_commands(data_dir_path, *commands, extra_env={'ENV_TYPE': 'local'}, isolated=True)
+        setup_django.assert_not_called()
+        self.assertEqual(
+            call_manage_py.call_args_list,
+            [mock.call(data_dir_path, *args, extra_env={'ENV_TYPE': 'local'}) for args in commands],
+        )
+        self.assertEqual(len(steps), 2)
+
+    def test_call_uvicorn(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_dir_path = Path(temp_dir)
+            (data_dir_path / 'asgi.py').touch()
+
+            with (
+                mock.patch.object(local_test.importlib.util, 'find_spec', return_value=None),
+                self.assertRaisesRegex(RuntimeError, 'Please install "uvicorn"'),
+            ):
+                call_uvicorn(data_dir_path)
+
+            with (
+                mock.patch.object(local_test.importlib.util, 'find_spec', return_value=object()),
+                mock.patch.object(local_test, 'verbose_check_call') as verbose_check_call,
+            ):
+                call_uvicorn(data_dir_path, '--port=8123', extra_env={'ENV_TYPE': 'local'})
+            verbose_check_call.assert_called_once_with(
+                sys.executable,
+                '-m',
+                'uvicorn',
+                '--factory',
+                'django_yunohost_integration.asgi_utils:get_local_test_application',
+                '--port=8123',
+                extra_env={'ENV_TYPE': 'local'},
+                cwd=data_dir_path,
+            )
+
+    def test_create_local_test_server(self):
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            mock.patch.dict(os.environ),
+            mock.patch.object(local_test, 'call_manage_commands'),
+            mock.patch.object(local_test, 'call_uvicorn') as call_uvicorn,
+            mock.patch.object(local_test, 'call_manage_py') as call_manage_py,
+            RedirectOut(),
+        ):
+            destination = Path(temp_dir) / 'local_test'
+            result = local_test.create_local_test(
+                django_settings_path=get_project_root() / 'conf' / 'settings.py',
+                destination=destination,
+                runserver=True,
+                asgi=True,
+            )
+            call_uvicorn.assert_called_once_with(result.data_dir_path, extra_env={'ENV_TYPE': 'local'})
+            call_manage_py.assert_not_called()
+            self.assertTrue((result.data_dir_path / 'asgi.py').is_file())
+
+            call_uvicorn.reset_mock()
+            local_test.create_local_test(
+                django_settings_path=get_project_root() / 'conf' / 'settings.py',
+                destination=destination,
+                runserver=True,
+            )
+            call_manage_py.assert_called_once_with(result.data_dir_path, 'runserver', extra_env={'ENV_TYPE': 'local'})
+            call_uvicorn.assert_not_called()
@@ -0,0 +1,101 @@
+import gzip
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from django_yunohost_integration.log_analyzer import get_log_files
+
+
+MODULE = 'django_yunohost_integration.sso_auth.auth_middleware auth_middleware.process_request'
+
+ARCHIVE_LOG = f"""\
+2025-01-01 10:00:01,000 WARNING - {MODULE} Missing 'HTTP_YNH_USER' header
+2025-01-01 10:00:02,000 INFO - {MODULE} Remote user "alice" was logged in
+"""
+
+OLD_LOG = f"""\
+2025-01-01 10:59:00,000 ERROR {MODULE} 'yunohost.portal' cookie missing!
+2025-01-01 11:00:00,000 INFO {MODULE} Remote user "bob" was logged in
+"""
+
+CURRENT_LOG = f"""\
+2025-01-01 11:00:01,000 ERROR 0f2a {MODULE} 'HTTP_AUTHORIZATION' missing!
+Traceback (most recent call last):
+  File "foo.py", line 1, in <module>
+2025-01-01 11:00:02,000 ERROR 1b3c {MODULE} 'HTTP_AUTHORIZATION' mismatch: username='bob' is not alice
+2025-01-01 11:00:03,000 WARNING - axes.handlers.database database.user_login_failed AXES: Locking out foo after.
+2025-01-01 11:00:04,000 INFO 2d4e {MODULE} Remote user "alice" was logged in
+"""
+
+
+class LogAnalyzerTestCase(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        temp_path = Path(temp_dir.name)
+
+        self.log_file_path = temp_path / 'app.log'
+        self.log_file_path.write_text(CURRENT_LOG)
+        (temp_path / 'app.log.1').write_text(OLD_LOG)
+        with gzip.open(temp_path / 'app.log.2.gz', 'wt') as f:
+            f.write(ARCHIVE_LOG)
+        (temp_path / 'app.logger').write_text('Not a rotated log file')
+
+        for age, name in enumerate(('app.log', 'app.log.1', 'app.log.2.gz')):
+            os.utime(temp_path / name, (1000 - age, 1000 - age))
+
+    def test_get_log_files(self):
+        self.assertEqual(
+            [path.name for path in get_log_files(self.log_file_path)],
+            ['app.log.2.gz', 'app.log.1', 'app.log'],
+        )
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('analyze_log', '--log-file', str(self.log_file_path), stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('app.log.2.gz', output)
+        self.assertIn(
+            '10 lines (2 not parsed, e.g.: tracebacks)\n'
+            'Time range: 2025-01-01 10:00:01,000 - 2025-01-01 11:00:04,000\n'
+            'Levels: INFO=3, ERROR=3, WARNING=2\n'
+            '\n'
+            'Auth failures by reason:\n'
+            '         1 missing_cookie\n'
+            '         1 missing_basic_auth\n'
+            '         1 basic_auth_username_mismatch\n'
+            '         1 axes_lockout\n'
+            '\n'
+            'Missing headers:\n'
+            '         1 HTTP_YNH_USER\n'
+            '         1 HTTP_AUTHORIZATION\n'
+            '\n'
+            'Top 10 users by logins:\n'
+            '         2 alice\n'
+            '         1 bob\n'
+            '\n'
+            'Error rate per time window:\n'
+            '  2025-01-01 10           3 records      1 errors  33.33%\n'
+            '  2025-01-01 11           5 records      2 errors  40.00%',
+            output,
+        )
+
+    def test_no_rotated(self):
+        stdout = StringIO()
+        call_command('analyze_log', '--log-file', str(self.log_file_path), '--no-rotated', stdout=stdout)
+        self.assertIn('6 lines (2 not parsed, e.g.: tracebacks)', stdout.getvalue())
+
+        # The log file path can be a str:
+        stdout = StringIO()
+        with self.settings(LOG_FILE_PATH=str(self.log_file_path)):
+            call_command('analyze_log', '--no-rotated', stdout=stdout)
+        self.assertIn('6 lines (2 not parsed, e.g.: tracebacks)', stdout.getvalue())
+
+        stdout = StringIO()
+        call_command('analyze_log', log_file=str(self.log_file_path), no_rotated=True, stdout=stdout)
+        self.assertIn('6 lines (2 not parsed, e.g.: tracebacks)', stdout.getvalue())
@@ -0,0 +1,51 @@
+from io import StringIO
+from unittest import TestCase
+
+from django.core.management import call_command
+
+from django_yunohost_integration.memory_report import MemoryReport, PhaseMemory, format_report
+
+
+class MemoryReportTestCase(TestCase):
+    def test_command(self):
+        stdout = StringIO()
+        call_command('memory_report', '--no-trace', stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('Boot "settings" from ', output)
+        for phase in ('start', 'settings', 'setup', 'urls', 'request'):
+            self.assertRegex(output, rf'\n{phase} +[\d.]+ MiB +[\d.]+ MiB +n/a +n/a\n')
+        self.assertRegex(output, r'\(warm-up request status code: \d{3}\)')
+
+    def test_format_report(self):
+        mib = 1024 * 1024
+        report = MemoryReport(
+            phases=[
+                PhaseMemory(name='start', rss=10 * mib, uss=5 * mib, traced=0),
+                PhaseMemory(name='settings', rss=30 * mib, uss=25 * mib, traced=12 * mib),
+            ],
+            modules={
+                'django.db.models': 2 * mib,
+                'axes.handlers.database': 100 * 1024,
+                'axes': 20 * 1024,
+                'django_yunohost_integration.sso_auth.auth_middleware': 10 * 1024,
+            },
+            status_code=200,
+        )
+        self.assertEqual(report.focus_size('axes'), 120 * 1024)
+        self.assertEqual(
+            format_report(report, top=2, focus=('axes', 'django_yunohost_integration.sso_auth')),
+            (
+                'phase             RSS        USS     traced  traced diff\n'
+                'start        10.0 MiB    5.0 MiB    0.0 KiB      0.0 KiB\n'
+                'settings     30.0 MiB   25.0 MiB   12.0 MiB     12.0 MiB\n'
+                '(warm-up request status code: 200)\n'
+                '\n'
+                'Top 2 allocating modules:\n'
+                '     2.0 MiB django.db.models\n'
+                '   100.0 KiB axes.handlers.database\n'
+                '\n'
+                'Focused modules:\n'
+                '   120.0 KiB axes\n'
+                '    10.0 KiB django_yunohost_integration.sso_auth'
+            ),
+        )
@@ -0,0 +1,200 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.test.testcases import TestCase
+
+from django_yunohost_integration.observability import metrics
+from django_yunohost_integration.observability.metrics import MetricsRegistry
+from django_yunohost_integration.yunohost.tests.test_ynh_jwt import create_jwt
+
+
+DEAD_PID = 2**22 + 1  # Greater than the default /proc/sys/kernel/pid_max
+
+
+class MetricsTempDirMixin:
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix='ynh_metrics_')
+        self.addCleanup(temp_dir.cleanup)
+        self.metrics_dir = Path(temp_dir.name)
+
+        settings_override = override_settings(YNH_METRICS_ENABLED=True, YNH_METRICS_DIR=self.metrics_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+
+class MetricsRegistryTestCase(MetricsTempDirMixin, SimpleTestCase):
+    def test_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_total', 'A test counter.', labelnames=('kind',))
+        histogram = registry.histogram('test_seconds', 'A test histogram.', buckets=(0.1, 1))
+
+        counter.inc(kind='foo')
+        counter.inc(2, kind='foo')
+        counter.inc(kind='bar')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        self.assertEqual(
+            registry.render(),
+            (
+                '# HELP test_total A test counter.\n'
+                '# TYPE test_total counter\n'
+                'test_total{kind="bar"} 1\n'
+                'test_total{kind="foo"} 3\n'
+                '# HELP test_seconds A test histogram.\n'
+                '# TYPE test_seconds histogram\n'
+                'test_seconds_bucket{le="0.1"} 1\n'
+                'test_seconds_bucket{le="1"} 2\n'
+                'test_seconds_bucket{le="+Inf"} 2\n'
+                'test_seconds_sum 0.55\n'
+                'test_seconds_count 2\n'
+            ),
+        )
+        self.assertEqual(
+            json.loads((self.metrics_dir / registry._file_name).read_text()),
+            [
+                ['test_total', [['kind', 'foo']], 3],
+                ['test_total', [['kind', 'bar']], 1],
+                ['test_seconds_bucket', [['le', '0.1']], 1],
+                ['test_seconds_bucket', [['le', '1']], 2],
+                ['test_seconds_bucket', [['le', '+Inf']], 2],
+                ['test_seconds_sum', [], 0.55],
+                ['test_seconds_count', [], 2],
+            ],
+        )
+
+    def test_aggregate_workers(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_total', 'A test counter.')
+        counter.inc()
+
+        # Another running worker:
+        (self.metrics_dir / f'{os.getppid()}.json').write_text(json.dumps([['test_total', [], 5]]))
+        # A worker that was stopped:
+        (self.metrics_dir / f'{DEAD_PID}.json').write_text(json.dumps([['test_total', [], 10]]))
+
+        self.assertIn('test_total 16\n', registry.render())
+        self.assertEqual(
+            sorted(path.name for path in self.metrics_dir.glob('*.json')),
+            sorted(['archive.json', registry._file_name, f'{os.getppid()}.json']),
+        )
+
+        # Values of stopped workers are still counted:
+        counter.inc()
+        self.assertIn('test_total 17\n', registry.render())
+
+        # A new process with a reused PID doesn't overwrite the values of the old one:
+        old_file_name = registry._file_name
+        registry._pid = None
+        counter.inc()
+        self.assertNotEqual(registry._file_name, old_file_name)
+        self.assertRegex(registry._file_name, rf'^{os.getpid()}-[0-9a-f]{{8}}\.json$')
+        self.assertIn('test_total 18\n', registry.render())
+
+    def test_not_writable(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_total', 'A test counter.')
+        counter.inc()
+        metrics_file = self.metrics_dir / 'not_a_dir'
+        metrics_file.touch()
+        with self.settings(YNH_METRICS_DIR=metrics_file), self.assertLogs(metrics.logger, 'WARNING') as logs:
+            registry.flush()
+        self.assertIn('Can not write the metrics of process', logs.output[0])
+        self.assertIs(registry._dirty, True)
+
+        # The flush thread survives any error:
+        def flush():
+            registry._pid = None  # Stop the loop
+            raise RuntimeError('Boom')
+
+        with (
+            mock.patch.object(metrics, 'FLUSH_INTERVAL', 0),
+            mock.patch.object(registry, 'flush', side_effect=flush),
+            self.assertLogs(metrics.logger, 'ERROR') as logs,
+        ):
+            registry._flush_loop()
+        self.assertIn('Flushing the metrics failed', logs.output[0])
+
+        # Written with the next flush:
+        registry._pid = os.getpid()
+        registry.flush()
+        self.assertIs(registry._dirty, False)
+        self.assertIn('test_total 1', registry.render())
+
+    def test_disabled(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_total', 'A test counter.')
+        with self.settings(YNH_METRICS_ENABLED=False):
+            counter.inc()
+        self.assertIn('# TYPE test_total counter\n', registry.render())
+        self.assertNotIn('test_total 1', registry.render())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class MetricsViewTestCase(MetricsTempDirMixin, TestCase):
+    def test_login_metrics(self):
+        self.client.cookies['yunohost.portal'] = create_jwt(username='test')
+        with self.assertLogs('django_yunohost_integration'):
+            response = self.client.get(
+                path='/app_path/',
+                HTTP_YNH_USER='test',
+                HTTP_AUTHORIZATION='basic dGVzdDp0ZXN0MTIz',
+            )
+        self.assertEqual(response.status_code, 200)
+
+        # A normal user can't see the metrics:
+        response = self.client.get(
+            path='/app_path/metrics/',
+            HTTP_YNH_USER='test',
+            HTTP_AUTHORIZATION='basic dGVzdDp0ZXN0MTIz',
+        )
+        self.assertEqual(response.status_code, 403)
+
+        User.objects.filter(username='test').update(is_superuser=True)
+        response = self.client.get(
+            path='/app_path/metrics/',
+            HTTP_YNH_USER='test',
+            HTTP_AUTHORIZATION='basic dGVzdDp0ZXN0MTIz',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        content = response.content.decode()
+        self.assertIn('ynh_http_requests_total{method="GET",status="200"} 1\n', content)
+        self.assertIn('ynh_http_requests_total{method="GET",status="403"} 1\n', content)
+        self.assertIn('ynh_http_request_duration_seconds_count{method="GET"} 2\n', content)
+        self.assertIn('ynh_sso_auth_total{outcome="success"} 1\n', content)
+        self.assertIn('ynh_sso_users_created_total 1\n', content)
+        self.assertIn('ynh_setup_user_duration_seconds_count 2\n', content)
+
+    def test_token_access(self):
+        with self.settings(YNH_METRICS_TOKEN='secret-token'):
+            response = self.client.get('/app_path/metrics/', HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertEqual(response.status_code, 403)
+
+            response = self.client.get('/app_path/metrics/', HTTP_AUTHORIZATION='Bearer secret-token')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('# TYPE ynh_sso_auth_total counter\n', response.content.decode())
+
+        with self.settings(YNH_METRICS_ENABLED=False):
+            response = self.client.get('/app_path/metrics/', HTTP_AUTHORIZATION='Bearer secret-token')
+            self.assertEqual(response.status_code, 404)
+
+    def test_username_mismatch(self):
+        self.client.cookies['yunohost.portal'] = create_jwt(username='foobar')
+        with self.assertLogs('django_yunohost_integration'):
+            response = self.client.get(
+                path='/app_path/',
+                HTTP_YNH_USER='test',
+                HTTP_AUTHORIZATION='basic dGVzdDp0ZXN0MTIz',
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ynh_sso_auth_total{outcome="username_mismatch"} 1\n', metrics.registry.render())
@@ -0,0 +1,91 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.test.testcases import TestCase
+
+from django_yunohost_integration.observability.profiling import get_profile_files, rotate_profiles
+from django_yunohost_integration.yunohost.tests.test_ynh_jwt import create_jwt
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix='ynh_profiles_')
+        self.addCleanup(temp_dir.cleanup)
+        self.profiles_dir = Path(temp_dir.name)
+
+        settings_override = override_settings(YNH_PROFILING_DIR=self.profiles_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get(self, **extra):
+        with self.assertLogs('django_yunohost_integration'):
+            return self.client.get(
+                path='/app_path/',
+                HTTP_YNH_USER='test',
+                HTTP_AUTHORIZATION='basic dGVzdDp0ZXN0MTIz',
+                **extra,
+            )
+
+    def test_sampled(self):
+        with self.settings(YNH_PROFILING_SAMPLE_RATE=1.0, YNH_PROFILING_MIN_DURATION=0):
+            response = self.client.get('/app_path/')
+        self.assertEqual(response.status_code, 200)
+
+        profile_files = get_profile_files()
+        self.assertEqual(len(profile_files), 1)
+        self.assertRegex(profile_files[0].name, r'^\d{8}_\d{6}_\d{3}_GET_app_path_\d+ms\.pstats$')
+
+        # Too fast requests are not stored:
+        with self.settings(YNH_PROFILING_SAMPLE_RATE=1.0, YNH_PROFILING_MIN_DURATION=60):
+            self.client.get('/app_path/')
+        self.assertEqual(len(get_profile_files()), 1)
+
+    def test_profile_header(self):
+        self.client.cookies['yunohost.portal'] = create_jwt(username='test')
+
+        # Header of a normal user is ignored:
+        self.get(HTTP_X_YNH_PROFILE='1')
+        self.assertEqual(get_profile_files(), [])
+
+        User.objects.filter(username='test').update(is_superuser=True)
+        response = self.get(HTTP_X_YNH_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(get_profile_files()), 1)
+
+        stdout = StringIO()
+        call_command('request_profiles', stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn(f'1 profiles in {self.profiles_dir}:', output)
+        self.assertIn('_GET_app_path_', output)
+
+        stdout = StringIO()
+        call_command('request_profiles', '--last', '--limit', '5', stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('Ordered by: cumulative time', output)
+        self.assertIn('List reduced from', output)
+
+        # The table is not broken across lines:
+        lines = output.splitlines()
+        header_index = lines.index('   ncalls  tottime  percall  cumtime  percall filename:lineno(function)')
+        rows = lines[header_index + 1 :]
+        while rows and not rows[-1].strip():
+            rows.pop()
+        self.assertEqual(len(rows), 5, rows)
+        for row in rows:
+            self.assertRegex(row, r'^\s*\d+(/\d+)?(\s+\d+\.\d+){4} \S')
+
+        with self.assertRaisesMessage(CommandError, 'Profile not found'):
+            call_command('request_profiles', 'foo.pstats')
+
+    def test_rotate_profiles(self):
+        for name in ('1_old.pstats', '2_middle.pstats', '3_new.pstats'):
+            (self.profiles_dir / name).write_bytes(b'x' * 100)
+
+        rotate_profiles(max_total_size=250)
+        self.assertEqual([path.name for path in get_profile_files()], ['3_new.pstats', '2_middle.pstats'])
@@ -0,0 +1,54 @@
+import logging
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from django_yunohost_integration.observability.request_id import (
+    NO_REQUEST_ID,
+    RequestIdFilter,
+    RequestIdMiddleware,
+    get_request_id,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def logging_view(request):
+    logger.info('Inside the view')
+    return HttpResponse(get_request_id())
+
+
+class RequestIdTestCase(SimpleTestCase):
+    def test_request_id_header(self):
+        middleware = RequestIdMiddleware(get_response=logging_view)
+        request = RequestFactory().get('/app_path/', HTTP_X_REQUEST_ID='a1b2c3')
+        with self.assertLogs(__name__) as logs:
+            response = middleware(request)
+        self.assertEqual(response.content, b'a1b2c3')
+        self.assertEqual(response['X-Request-ID'], 'a1b2c3')
+        self.assertEqual(request.request_id, 'a1b2c3')
+        self.assertEqual([record.request_id for record in logs.records], ['a1b2c3'])
+
+        # Reset after the request:
+        self.assertEqual(get_request_id(), NO_REQUEST_ID)
+
+    def test_generated_request_id(self):
+        middleware = RequestIdMiddleware(get_response=logging_view)
+        with self.assertLogs(__name__):
+            response = middleware(RequestFactory().get('/app_path/'))
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+
+        # Invalid IDs are replaced:
+        with self.assertLogs(__name__):
+            response = middleware(RequestFactory().get('/app_path/', HTTP_X_REQUEST_ID='foo\nbar'))
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+        with self.assertLogs(__name__):
+            response = middleware(RequestFactory().get('/app_path/', HTTP_X_REQUEST_ID='foobar\n'))
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+
+    def test_log_filter(self):
+        record = logging.LogRecord('foo', logging.INFO, __file__, 1, 'foo', None, None)
+        self.assertFalse(hasattr(record, 'request_id'))
+        self.assertTrue(RequestIdFilter().filter(record))
+        self.assertEqual(record.request_id, NO_REQUEST_ID)
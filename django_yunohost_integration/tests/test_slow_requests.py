@@ -0,0 +1,68 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.testcases import TestCase
+
+from django_yunohost_integration.observability.slow_requests import SlowRequestMiddleware
+
+
+def n_plus_one_view(request):
+    cache.set('foo', 'bar')
+    cache.get('foo')
+    for pk in range(3):
+        User.objects.filter(pk=pk).first()
+    return HttpResponse('ok')
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'slow-requests'}}
+)
+class SlowRequestMiddlewareTestCase(TestCase):
+    def get_request(self):
+        request = RequestFactory().get('/app_path/foo/')
+        request.user = AnonymousUser()
+        return request
+
+    def test_slow_request(self):
+        middleware = SlowRequestMiddleware(get_response=n_plus_one_view)
+        with self.settings(YNH_SLOW_REQUEST_THRESHOLD=0), self.assertLogs('django_yunohost_integration') as logs:
+            response = middleware(self.get_request())
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(logs.output), 1)
+        prefix = 'WARNING:django_yunohost_integration.observability.slow_requests:Slow request: '
+        self.assertTrue(logs.output[0].startswith(prefix), logs.output)
+        data = json.loads(logs.output[0].removeprefix(prefix))
+
+        self.assertGreater(data.pop('duration_ms'), 0)
+        self.assertGreaterEqual(data.pop('db_time_ms'), 0)
+        top_queries = data.pop('top_queries')
+        self.assertEqual(
+            data,
+            {
+                'method': 'GET',
+                'path': '/app_path/foo/',
+                'status': 200,
+                'user': None,
+                'db_queries': 3,
+                'cache_calls': {'set': 1, 'get': 1},
+            },
+        )
+        self.assertEqual(len(top_queries), 1)
+        self.assertEqual(top_queries[0]['count'], 3)
+        self.assertEqual(
+            top_queries[0]['sql'],
+            'SELECT ... FROM "auth_user" WHERE "auth_user"."id" = %s ORDER BY "auth_user"."id" ASC LIMIT ?',
+        )
+
+    def test_fast_request(self):
+        middleware = SlowRequestMiddleware(get_response=n_plus_one_view)
+        with self.settings(YNH_SLOW_REQUEST_THRESHOLD=60), self.assertNoLogs('django_yunohost_integration'):
+            middleware(self.get_request())
+
+        # Deactivated:
+        with self.settings(YNH_SLOW_REQUEST_THRESHOLD=None), self.assertNoLogs('django_yunohost_integration'):
+            middleware(self.get_request())
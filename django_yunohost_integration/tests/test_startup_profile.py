@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+from django_yunohost_integration.path_utils import get_project_root
+from django_yunohost_integration.startup_profile import (
+    PHASES,
+    check_budget,
+    format_report,
+    get_startup_budget,
+    profile_startup,
+)
+
+
+class StartupProfileTestCase(TestCase):
+    def test_profile_local_test(self):
+        profile = profile_startup(data_dir_path=get_project_root() / 'local_test' / 'opt_yunohost')
+
+        self.assertEqual(set(profile.phases), {*PHASES, 'total'})
+        self.assertGreater(profile.phases['total'], sum(profile.phases[name] for name in PHASES) * 0.9)
+        self.assertIn('django_yunohost_integration', profile.ready)
+        self.assertIn('django.db.models', {item.module for item in profile.imports})
+
+        report = format_report(profile, top=5)
+        self.assertIn('Startup phases:', report)
+        self.assertIn('Slowest imports', report)
+
+        self.assertEqual(check_budget(profile, budget={'total': 999_999}), [])
+        errors = check_budget(profile, budget={'settings': 0})
+        self.assertEqual(len(errors), 1)
+        self.assertIn('Phase "settings" took', errors[0])
+
+    def test_budget_from_pyproject_toml(self):
+        budget = get_startup_budget(base_path=get_project_root())
+        self.assertIn('total', budget)
@@ -0,0 +1,92 @@
+from io import StringIO
+
+from axes.models import AccessAttempt, AccessLog
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.models import Session
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from django_yunohost_integration.synthetic_data import (
+    SyntheticDataConfig,
+    delete_synthetic_data,
+    generate_synthetic_data,
+)
+
+
+def get_dataset():
+    return {
+        'users': list(User.objects.order_by('username').values_list('username', 'first_name', 'last_name', 'password')),
+        'memberships': list(
+            User.groups.through.objects.order_by('user__username', 'group__name').values_list(
+                'user__username', 'group__name'
+            )
+        ),
+        'access_logs': list(AccessLog.objects.order_by('id').values_list('username', 'ip_address', 'session_hash')),
+        'sessions': sorted(Session.objects.values_list('session_key', flat=True)),
+    }
+
+
+class SyntheticDataTestCase(TestCase):
+    def test_generate_and_delete(self):
+        config = SyntheticDataConfig(users=30, groups=4, sessions=10, failed_attempts=5, batch_size=7)
+        result = generate_synthetic_data(config)
+        self.assertEqual(result.skipped, [])
+        self.assertEqual(result.counts['users'], 30)
+        self.assertEqual(result.counts['groups'], 4)
+        self.assertEqual(result.counts['access attempts'], 5)
+        self.assertEqual(result.counts['sessions'], 10)
+
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(User.objects.first().username, 'synthetic-000000')
+        self.assertIs(User.objects.first().has_usable_password(), False)
+        self.assertEqual(Group.objects.count(), 4)
+        self.assertEqual(AccessLog.objects.count(), result.counts['access logs'])
+        self.assertEqual(AccessAttempt.objects.count(), 5)
+
+        # The sessions are valid logins:
+        session = Session.objects.first()
+        user = User.objects.get(pk=session.get_decoded()['_auth_user_id'])
+        self.assertEqual(session.get_decoded()['_auth_user_hash'], user.get_session_auth_hash())
+
+        # Same seed -> same data:
+        dataset = get_dataset()
+        delete_synthetic_data()
+        generate_synthetic_data(config)
+        self.assertEqual(get_dataset(), dataset)
+
+        # Other seed -> other data:
+        delete_synthetic_data()
+        generate_synthetic_data(SyntheticDataConfig(users=30, groups=4, sessions=10, seed=2))
+        self.assertNotEqual(get_dataset()['users'], dataset['users'])
+
+        # Only generated data is deleted:
+        User.objects.create(username='real-user')
+        counts = delete_synthetic_data()
+        self.assertEqual(counts['auth.User'], 30)
+        self.assertEqual(counts['sessions.Session'], 10)
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['real-user'])
+        self.assertEqual(Group.objects.count(), 0)
+        self.assertEqual(AccessLog.objects.count(), 0)
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('generate_synthetic_data', '--users', '20', '--sessions', '5', '--seed', '3', stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('Generate data in sqlite database with seed 3...', output)
+        self.assertIn('        20 users ', output)
+        self.assertIn('         5 sessions ', output)
+        self.assertEqual(User.objects.count(), 20)
+
+        with self.assertRaisesMessage(CommandError, "Users with prefix 'synthetic' already exist"):
+            call_command('generate_synthetic_data', '--users', '20', stdout=StringIO())
+
+        stdout = StringIO()
+        call_command('generate_synthetic_data', '--users', '10', '--replace', '--prefix', 'synthetic', stdout=stdout)
+        self.assertIn('Deleted 20 auth.User\n', stdout.getvalue())
+        self.assertEqual(User.objects.count(), 10)
+
+        stdout = StringIO()
+        call_command('generate_synthetic_data', '--delete', stdout=stdout)
+        self.assertIn('Deleted 10 auth.User\n', stdout.getvalue())
+        self.assertEqual(User.objects.count(), 0)
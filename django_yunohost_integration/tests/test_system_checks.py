@@ -1,14 +1,31 @@
-
 from django.core.checks import Warning
 from django.core.checks.registry import CheckRegistry, registry
 from django.test.testcases import SimpleTestCase
 
 from django_yunohost_integration.system_checks import (
+    check_cache_backend,
+    check_conn_max_age,
+    check_debug,
+    check_mail_admins_logging,
+    check_serve_files,
+    check_session_engine,
+    check_template_loaders,
     validate_log_level,
     validate_settings_emails,
 )
 
 
+PERFORMANCE_CHECKS = (
+    check_conn_max_age,
+    check_cache_backend,
+    check_session_engine,
+    check_debug,
+    check_mail_admins_logging,
+    check_serve_files,
+    check_template_loaders,
+)
+
+
 class SystemChecksTestCase(SimpleTestCase):
     def test_is_registered(self):
         assert isinstance(registry, CheckRegistry)
@@ -71,3 +88,112 @@ class SystemChecksTestCase(SimpleTestCase):
                     )
                 ]
             )
+
+
+class PerformanceChecksTestCase(SimpleTestCase):
+    def get_ids(self, check):
+        return [error.id for error in check(app_configs=None)]
+
+    def test_deploy_only(self):
+        deploy_checks = registry.get_checks(include_deployment_checks=True)
+        normal_checks = registry.get_checks(include_deployment_checks=False)
+        for check in PERFORMANCE_CHECKS:
+            self.assertIn(check, deploy_checks)
+            self.assertNotIn(check, normal_checks)
+            self.assertEqual(check.tags, ('performance',))
+
+    def test_production_settings(self):
+        with self.settings(
+            DATABASES={'default': {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 600}},
+            CACHES={'default': {'BACKEND': 'django_redis.cache.RedisCache'}},
+            SESSION_ENGINE='django.contrib.sessions.backends.cache',
+            DEBUG=False,
+            SERVE_FILES=False,
+        ):
+            for check in PERFORMANCE_CHECKS:
+                self.assertEqual(check(app_configs=None), [], check)
+
+    def test_conn_max_age(self):
+        with self.settings(
+            DATABASES={
+                'default': {'ENGINE': 'django.db.backends.postgresql'},
+                'sqlite': {'ENGINE': 'django.db.backends.sqlite3'},
+            }
+        ):
+            self.assertEqual(
+                check_conn_max_age(app_configs=None),
+                [
+                    Warning(
+                        'DATABASES[\'default\']["CONN_MAX_AGE"] is 0: Every request opens a new database connection!',
+                        hint='Reuse the connections with e.g.: "CONN_MAX_AGE": 600 and "CONN_HEALTH_CHECKS": True',
+                        id='django_yunohost_integration.W003',
+                    )
+                ],
+            )
+
+        with self.settings(DATABASES={'default': {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': None}}):
+            self.assertEqual(check_conn_max_age(app_configs=None), [])
+
+    def test_cache_backend_and_sessions(self):
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            errors = check_cache_backend(app_configs=None)
+            self.assertEqual([error.id for error in errors], ['django_yunohost_integration.W004'])
+            self.assertIn('Every gunicorn worker process has its own cache!', errors[0].msg)
+            self.assertEqual(self.get_ids(check_session_engine), [])
+
+        with self.settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}},
+            SESSION_ENGINE='django.contrib.sessions.backends.db',
+        ):
+            self.assertEqual(self.get_ids(check_cache_backend), [])
+            self.assertEqual(self.get_ids(check_session_engine), ['django_yunohost_integration.W005'])
+
+    def test_debug_and_serve_files(self):
+        with self.settings(DEBUG=True, SERVE_FILES=True):
+            self.assertEqual(self.get_ids(check_debug), ['django_yunohost_integration.W006'])
+            self.assertEqual(self.get_ids(check_serve_files), ['django_yunohost_integration.W008'])
+
+    def test_mail_admins_logging(self):
+        # The default logging config of conf/settings.py is ok:
+        self.assertEqual(self.get_ids(check_mail_admins_logging), [])
+
+        logging_config = {
+            'handlers': {
+                'mail_admins': {'class': 'django.utils.log.AdminEmailHandler'},
+                'mail_admins_error': {'class': 'django.utils.log.AdminEmailHandler', 'level': 'ERROR'},
+                'console': {'class': 'logging.StreamHandler'},
+            },
+            'loggers': {
+                'busy': {'handlers': ['console', 'mail_admins'], 'level': 'INFO'},
+                'errors_only': {'handlers': ['mail_admins'], 'level': 'ERROR'},
+                'error_handler': {'handlers': ['mail_admins_error'], 'level': 'DEBUG'},
+            },
+            'root': {'handlers': ['mail_admins'], 'level': 'WARNING'},
+        }
+        with self.settings(LOGGING=logging_config):
+            errors = check_mail_admins_logging(app_configs=None)
+        self.assertEqual(
+            [error.msg for error in errors],
+            [
+                (
+                    "Logger 'busy' sends a mail for every INFO log entry via handler 'mail_admins':"
+                    ' The mails are sent synchronously in the request!'
+                ),
+                (
+                    "Logger 'root' sends a mail for every WARNING log entry via handler 'mail_admins':"
+                    ' The mails are sent synchronously in the request!'
+                ),
+            ],
+        )
+        self.assertEqual(errors[0].hint, 'Set LOGGING["handlers"][\'mail_admins\']["level"] = "ERROR"')
+
+    def test_template_loaders(self):
+        def templates(loaders):
+            return [{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'OPTIONS': {'loaders': loaders}}]
+
+        with self.settings(TEMPLATES=templates(['django.template.loaders.app_directories.Loader'])):
+            self.assertEqual(self.get_ids(check_template_loaders), ['django_yunohost_integration.W009'])
+
+        cached = [('django.template.loaders.cached.Loader', ['django.template.loaders.app_directories.Loader'])]
+        with self.settings(TEMPLATES=templates(cached)):
+            self.assertEqual(self.get_ids(check_template_loaders), [])
@@ -0,0 +1,101 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+import axes.models
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_migrate
+from django.test import override_settings
+
+from django_yunohost_integration.test_db_template import (
+    create_test_db,
+    get_template_hash,
+    get_template_path,
+    iter_unmigrated_model_files,
+    use_test_db_templates,
+)
+
+
+ALIAS = 'template_test'
+
+
+def get_tables(database_path: Path) -> set:
+    with sqlite3.connect(database_path) as connection:
+        return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+class TestDbTemplateTestCase(TestCase):
+    def test_get_template_hash(self):
+        connection = connections['default']
+        template_hash = get_template_hash(connection)
+        self.assertEqual(len(template_hash), 16)
+        self.assertEqual(get_template_hash(connection), template_hash)
+        with override_settings(MIGRATION_MODULES={'axes': None}):
+            self.assertNotEqual(get_template_hash(connection), template_hash)
+
+        # The tables of apps without migrations are created from the models:
+        self.assertNotIn(Path(axes.models.__file__), list(iter_unmigrated_model_files()))
+        with override_settings(MIGRATION_MODULES={'axes': None}):
+            self.assertIn(Path(axes.models.__file__), list(iter_unmigrated_model_files()))
+        self.assertIn(Path(axes.models.__file__), list(iter_unmigrated_model_files(migrate=False)))
+
+        path = get_template_path(connection)
+        self.assertEqual(path.parts[-3:], ('local_test', 'test_db_templates', f'default-{template_hash}.sqlite3'))
+
+    def test_create_test_db(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            default_settings = connections['default'].settings_dict
+            database_settings = {
+                **default_settings,
+                'NAME': str(temp_path / 'unused.sqlite'),
+                'TEST': {**default_settings['TEST'], 'NAME': str(temp_path / 'test.sqlite')},
+            }
+            with mock.patch.dict(settings.DATABASES, {ALIAS: database_settings}):
+                connection = connections[ALIAS]
+                try:
+                    template_path = get_template_path(connection, template_dir=temp_path)
+                    (temp_path / f'{ALIAS}-outdated.sqlite3').touch()
+
+                    # First run: migrate and store the template:
+                    test_database_name = create_test_db(connection, verbosity=0, template_dir=temp_path)
+                    self.assertEqual(test_database_name, str(temp_path / 'test.sqlite'))
+                    self.assertEqual(sorted(temp_path.glob(f'{ALIAS}-*')), [template_path])
+                    self.assertIn('django_migrations', get_tables(template_path))
+                    self.assertIn('axes_accesslog', get_tables(template_path))
+                    connection.close()
+
+                    # Second run: copy the template, without migrating:
+                    connection.settings_dict['NAME'] = str(temp_path / 'unused.sqlite')
+                    post_migrate_databases = []
+
+                    def post_migrate_receiver(sender, using, **kwargs):
+                        post_migrate_databases.append(using)
+
+                    post_migrate.connect(post_migrate_receiver)
+                    try:
+                        with mock.patch.object(type(connection.creation), 'create_test_db') as origin_create_test_db:
+                            create_test_db(connection, verbosity=0, autoclobber=True, template_dir=temp_path)
+                    finally:
+                        post_migrate.disconnect(post_migrate_receiver)
+                    origin_create_test_db.assert_not_called()
+                    self.assertEqual(set(post_migrate_databases), {ALIAS})
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT count(*) FROM django_migrations')
+                        self.assertGreater(cursor.fetchone()[0], 10)
+                    self.assertEqual(get_tables(temp_path / 'test.sqlite'), get_tables(template_path))
+                finally:
+                    connection.close()
+                    del connections[ALIAS]
+
+    def test_use_test_db_templates(self):
+        connection = connections['default']
+        with use_test_db_templates() as patched:
+            self.assertEqual(patched, ['default'])
+            self.assertIn('create_test_db', vars(connection.creation))
+        self.assertNotIn('create_test_db', vars(connection.creation))
+
+        with override_settings(YNH_TEST_DB_TEMPLATE=False), use_test_db_templates() as patched:
+            self.assertEqual(patched, [])
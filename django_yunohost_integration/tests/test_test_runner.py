@@ -0,0 +1,145 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from django_yunohost_integration import local_test
+from django_yunohost_integration.path_utils import get_project_root
+from django_yunohost_integration.test_runner import (
+    YunohostParallelTestSuite,
+    YunohostTestRunner,
+    _init_worker,
+    clone_tree,
+    setup_worker_environment,
+)
+
+
+class TestRunnerTestCase(SimpleTestCase):
+    def test_clone_tree(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src = Path(temp_dir) / 'src'
+            (src / 'sub' / '__pycache__').mkdir(parents=True)
+            (src / 'foo.txt').write_text('foo')
+            (src / 'sub' / 'bar.txt').write_text('bar')
+            (src / 'sub' / '__pycache__' / 'bar.pyc').write_text('')
+
+            dst = Path(temp_dir) / 'dst'
+            methods = clone_tree(src, dst)
+            self.assertEqual(sum(methods.values()), 2)
+            self.assertLessEqual(set(methods), {'reflink', 'hardlink', 'copy'})
+            self.assertEqual((dst / 'foo.txt').read_text(), 'foo')
+            self.assertEqual((dst / 'sub' / 'bar.txt').read_text(), 'bar')
+            self.assertFalse((dst / 'sub' / '__pycache__').exists())
+
+    def test_setup_worker_environment(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / 'local_test'
+            data_dir_path = destination / 'opt_yunohost'
+            install_dir_path = destination / 'var_www'
+            log_file_path = destination / 'var_log_django_yunohost_integration.log'
+            (data_dir_path / 'static').mkdir(parents=True)
+            (data_dir_path / 'local_settings.py').write_text('# local settings')
+            install_dir_path.mkdir()
+            log_file_path.write_text('main log')
+
+            with override_settings(
+                DATA_DIR_PATH=data_dir_path,
+                INSTALL_DIR_PATH=install_dir_path,
+                LOG_FILE_PATH=log_file_path,
+                STATIC_ROOT=str(data_dir_path / 'static'),
+                STATICFILES_DIRS=[str(install_dir_path / 'static'), '/other/path'],
+            ):
+                changed = setup_worker_environment(worker_id=2)
+
+                worker_dir = destination / 'workers' / '2' / 'local_test'
+                self.assertEqual(settings.DATA_DIR_PATH, worker_dir / 'opt_yunohost')
+                self.assertEqual(settings.INSTALL_DIR_PATH, worker_dir / 'var_www')
+                self.assertEqual(settings.LOG_FILE_PATH, worker_dir / 'var_log_django_yunohost_integration.log')
+                self.assertEqual(settings.STATIC_ROOT, str(worker_dir / 'opt_yunohost' / 'static'))
+                self.assertEqual(settings.STATICFILES_DIRS, [str(worker_dir / 'var_www' / 'static'), '/other/path'])
+                self.assertLessEqual(
+                    {'DATA_DIR_PATH', 'INSTALL_DIR_PATH', 'LOG_FILE_PATH', 'STATIC_ROOT', 'STATICFILES_DIRS'},
+                    set(changed),
+                )
+
+                self.assertEqual((worker_dir / 'opt_yunohost' / 'local_settings.py').read_text(), '# local settings')
+                self.assertEqual(settings.LOG_FILE_PATH.read_text(), '')  # A new, empty log file per worker
+                self.assertEqual(log_file_path.read_text(), 'main log')
+
+                # A second run starts again with a fresh clone:
+                (worker_dir / 'opt_yunohost' / 'worker-file.txt').write_text('old')
+                settings.DATA_DIR_PATH = data_dir_path
+                settings.INSTALL_DIR_PATH = install_dir_path
+                settings.LOG_FILE_PATH = log_file_path
+                setup_worker_environment(worker_id=2)
+                self.assertFalse((worker_dir / 'opt_yunohost' / 'worker-file.txt').exists())
+
+    def test_runner(self):
+        self.assertIs(YunohostTestRunner.parallel_test_suite, YunohostParallelTestSuite)
+        self.assertIs(YunohostParallelTestSuite.init_worker, _init_worker)
+
+    def test_run_django_test_cli(self):
+        def run(argv):
+            with (
+                mock.patch.object(local_test, 'setup_local_yunohost_test'),
+                mock.patch.object(local_test.DjangoTestCommand, 'run_from_argv') as run_from_argv,
+            ):
+                local_test.run_django_test_cli(argv=argv, exit_after_run=False)
+            return run_from_argv.call_args.args[0]
+
+        self.assertEqual(
+            run(['dev-cli.py', 'test']),
+            ['dev-cli.py', 'test', f'--testrunner={local_test.YUNOHOST_TEST_RUNNER}'],
+        )
+        self.assertEqual(
+            run(['dev-cli.py', 'test', '--parallel', '2']),
+            ['dev-cli.py', 'test', '--parallel', '2', f'--testrunner={local_test.YUNOHOST_TEST_RUNNER}'],
+        )
+        self.assertEqual(
+            run(['dev-cli.py', 'test', '--parallel', '--testrunner=foo.Bar']),
+            ['dev-cli.py', 'test', '--parallel', '--testrunner=foo.Bar'],
+        )
+        with override_settings(TEST_RUNNER='foo.Bar'):
+            self.assertEqual(run(['dev-cli.py', 'test', '--parallel']), ['dev-cli.py', 'test', '--parallel'])
+
+    def test_parallel_run_with_failing_test(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            Path(temp_dir, 'parallel_run_tests.py').write_text(
+                textwrap.dedent(
+                    """
+                    from django.test import SimpleTestCase
+
+                    class PassingTestCase(SimpleTestCase):
+                        def test_pass(self):
+                            pass
+
+                    class FailingTestCase(SimpleTestCase):
+                        def test_fail(self):
+                            self.assertEqual(1, 2)
+                    """
+                )
+            )
+            process = subprocess.run(
+                [sys.executable, '-m', 'django_yunohost_integration', 'test', '--parallel', '2', 'parallel_run_tests'],
+                cwd=get_project_root(),
+                env={**os.environ, 'PYTHONPATH': temp_dir},
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=300,
+            )
+        output = process.stdout + process.stderr
+        self.assertEqual(process.returncode, 1, output)
+        self.assertIn('Ran 2 tests', output)
+        self.assertIn('FAILED (failures=1)', output)
+        self.assertIn('AssertionError: 1 != 2', output)
+        self.assertNotIn("cannot pickle 'traceback' object", output)
+        if importlib.util.find_spec('tblib') is None:
+            self.assertIn('Run the tests serial, because "tblib"', output)
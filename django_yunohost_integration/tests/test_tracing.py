@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.test.testcases import TestCase
+
+from django_yunohost_integration.observability import tracing
+from django_yunohost_integration.observability.tracing import NOOP_SPAN, JsonLinesExporter, start_span, traced
+from django_yunohost_integration.yunohost.tests.test_ynh_jwt import create_jwt
+
+
+class TracingTempFileMixin:
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix='ynh_tracing_')
+        self.addCleanup(temp_dir.cleanup)
+        self.trace_file_path = Path(temp_dir.name) / 'traces.jsonl'
+
+        settings_override = override_settings(YNH_TRACING_SAMPLE_RATE=1.0, YNH_TRACING_FILE=self.trace_file_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_spans(self) -> list:
+        tracing.exporter.flush()
+        if not self.trace_file_path.exists():
+            return []
+        return [json.loads(line) for line in self.trace_file_path.read_text().splitlines()]
+
+
+class TracingTestCase(TracingTempFileMixin, SimpleTestCase):
+    def test_nested_spans(self):
+        @traced('decorated')
+        def decorated_func(value):
+            return value * 2
+
+        with start_span('root', foo='bar') as root_span, start_span('child') as child_span:
+            self.assertEqual(decorated_func(2), 4)
+            child_span.set_attribute('answer', 42)
+
+        spans = self.get_spans()
+        self.assertEqual([span['name'] for span in spans], ['decorated', 'child', 'root'])
+        decorated, child, root = spans
+
+        self.assertEqual({span['trace_id'] for span in spans}, {root_span.trace_id})
+        self.assertEqual(root['parent_id'], None)
+        self.assertEqual(child['parent_id'], root['span_id'])
+        self.assertEqual(decorated['parent_id'], child['span_id'])
+        self.assertEqual(root['attributes'], {'foo': 'bar'})
+        self.assertEqual(child['attributes'], {'answer': 42})
+        self.assertGreaterEqual(root['duration_ms'], child['duration_ms'])
+        self.assertIs(child_span.is_recording, True)
+
+    def test_not_writable(self):
+        exporter = JsonLinesExporter()
+        exporter._pid = os.getpid()  # Don't start the writer thread
+        exporter.export({'name': 'lost'})
+        with (
+            self.settings(YNH_TRACING_FILE=self.trace_file_path.parent / 'missing' / 'traces.jsonl'),
+            self.assertLogs(tracing.logger, 'WARNING') as logs,
+        ):
+            exporter.flush()
+        self.assertIn('1 spans lost, can not write', logs.output[0])
+
+        # The buffer doesn't grow without limit:
+        with mock.patch.object(tracing, 'MAX_BUFFER_SIZE', 3):
+            for number in range(5):
+                exporter.export({'name': f'span {number}'})
+        self.assertEqual([record['name'] for record in exporter._buffer], ['span 2', 'span 3', 'span 4'])
+        with self.assertLogs(tracing.logger, 'WARNING') as logs:
+            exporter.flush()
+        self.assertIn('2 spans dropped', logs.output[0])
+        self.assertEqual([span['name'] for span in self.get_spans()], ['span 2', 'span 3', 'span 4'])
+
+        # The writer thread survives any error:
+        def flush():
+            exporter._pid = None  # Stop the loop
+            raise RuntimeError('Boom')
+
+        with (
+            mock.patch.object(tracing, 'FLUSH_INTERVAL', 0),
+            mock.patch.object(exporter, 'flush', side_effect=flush),
+            self.assertLogs(tracing.logger, 'ERROR') as logs,
+        ):
+            exporter._write_loop()
+        self.assertIn('Writing the spans failed', logs.output[0])
+
+    def test_error(self):
+        with self.assertRaisesMessage(ValueError, 'Boom'), start_span('root'):
+            raise ValueError('Boom')
+        spans = self.get_spans()
+        self.assertEqual(len(spans), 1)
+        self.assertEqual(spans[0]['error'], "ValueError('Boom')")
+
+    def test_not_sampled(self):
+        with (
+            self.settings(YNH_TRACING_SAMPLE_RATE=0),
+            start_span('root') as root_span,
+            start_span('child') as child_span,
+        ):
+            child_span.set_attribute('foo', 'bar')
+        self.assertIs(root_span, NOOP_SPAN)
+        self.assertIs(child_span, NOOP_SPAN)
+        self.assertEqual(self.get_spans(), [])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class TracingMiddlewareTestCase(TracingTempFileMixin, TestCase):
+    def test_login_request(self):
+        self.client.cookies['yunohost.portal'] = create_jwt(username='test')
+        with self.assertLogs('django_yunohost_integration'):
+            response = self.client.get(
+                path='/app_path/',
+                HTTP_YNH_USER='test',
+                HTTP_AUTHORIZATION='basic dGVzdDp0ZXN0MTIz',
+            )
+        self.assertEqual(response.status_code, 200)
+
+        spans = self.get_spans()
+        root = spans[-1]
+        self.assertEqual(root['name'], 'http.request')
+        self.assertEqual(
+            root['attributes'],
+            {'method': 'GET', 'path': '/app_path/', 'status_code': 200, 'user': 'test'},
+        )
+        names = {span['name'] for span in spans}
+        self.assertTrue(
+            {
+                'sso_auth.process_request',
+                'sso_auth.authenticate',
+                'sso_auth.verify_sso_jwt',
+                'sso_auth.update_user_profile',
+                'sso_auth.call_setup_user',
+                'db.query',
+            }.issubset(names),
+            names,
+        )
+        self.assertEqual({span['trace_id'] for span in spans}, {root['trace_id']})
+
+        db_spans = [span for span in spans if span['name'] == 'db.query']
+        self.assertTrue(any('auth_user' in span['attributes']['sql'] for span in db_spans))
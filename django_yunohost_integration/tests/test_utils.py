@@ -1,12 +1,37 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import requests
 import requests_mock
 from bx_py_utils.environ import OverrideEnviron
-from django.test import SimpleTestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase, TestCase
 from packaging.version import Version
 
-from django_yunohost_integration.test_utils import assert_project_version, generate_basic_auth, get_github_version_tag
+from django_yunohost_integration.test_utils import (
+    PerformanceBudgetMixin,
+    assert_max_cache_calls,
+    assert_performance_budget,
+    assert_project_version,
+    generate_basic_auth,
+    get_github_tags,
+    get_github_version_tag,
+)
+
+
+TAGS_URL = 'https://api.github.com/repos/YunoHost-Apps/django_yunohost_integration/tags'
 
 
 class TestUtilsTestCase(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        # Never use the real GitHub tags cache:
+        self.cache_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(OverrideEnviron(YNH_GITHUB_TAGS_CACHE_DIR=str(self.cache_dir), YNH_OFFLINE=None))
+
     def test_generate_basic_auth(self):
         assert generate_basic_auth(username='test', password='test123') == 'basic dGVzdDp0ZXN0MTIz'
 
@@ -29,6 +54,10 @@ class TestUtilsTestCase(SimpleTestCase):
 
             ###########################################################################
 
+            # Remove the cached tags from above:
+            for cache_path in self.cache_dir.glob('*.json'):
+                cache_path.unlink()
+
             with requests_mock.Mocker() as m, self.assertRaisesMessage(
                 AssertionError,
                 (
@@ -77,3 +106,107 @@ class TestUtilsTestCase(SimpleTestCase):
                     current_version='v1.0.0',
                     github_project_url=('https://github.com/YunoHost-Apps/django_yunohost_integration'),
                 )
+
+    def test_get_github_tags_cache(self):
+        api_url = TAGS_URL.removesuffix('/tags')
+
+        # Offline without cached tags:
+        self.assertIsNone(get_github_tags(api_url, offline=True))
+        with OverrideEnviron(YNH_OFFLINE='1'):
+            self.assertIsNone(get_github_version_tag('https://github.com/YunoHost-Apps/django_yunohost_integration'))
+            assert_project_version('v0.1.0', 'https://github.com/YunoHost-Apps/django_yunohost_integration')
+
+        with requests_mock.Mocker() as m:
+            m.get(TAGS_URL, json=[{'name': 'v1.2.3'}], headers={'ETag': '"abc"'})
+            self.assertEqual(get_github_tags(api_url), ['v1.2.3'])
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(m.last_request.timeout, (5, 15))
+
+            # Cached:
+            self.assertEqual(get_github_tags(api_url), ['v1.2.3'])
+            self.assertEqual(get_github_tags(api_url, offline=True), ['v1.2.3'])
+            self.assertEqual(m.call_count, 1)
+
+        # Expired -> conditional request:
+        with requests_mock.Mocker() as m:
+            m.get(TAGS_URL, status_code=304)
+            self.assertEqual(get_github_tags(api_url, cache_ttl=0), ['v1.2.3'])
+            self.assertEqual(m.last_request.headers['If-None-Match'], '"abc"')
+
+        with requests_mock.Mocker() as m:
+            m.get(TAGS_URL, json=[{'name': 'v2.0.0rc1'}, {'name': 'v1.3.0'}], headers={'ETag': '"def"'})
+            self.assertEqual(get_github_tags(api_url, cache_ttl=0), ['v2.0.0rc1', 'v1.3.0'])
+        (cache_path,) = self.cache_dir.glob('*.json')
+        cache_entry = json.loads(cache_path.read_text())
+        self.assertEqual(cache_entry['etag'], '"def"')
+        self.assertAlmostEqual(cache_entry['fetched'], time.time(), delta=10)
+        self.assertEqual(
+            get_github_version_tag('https://github.com/YunoHost-Apps/django_yunohost_integration'),
+            Version('1.3.0'),
+        )
+
+        # Request errors -> use the cached tags:
+        with requests_mock.Mocker() as m, self.assertLogs('django_yunohost_integration', level='WARNING') as logs:
+            m.get(TAGS_URL, exc=requests.exceptions.ConnectTimeout)
+            self.assertEqual(get_github_tags(api_url, cache_ttl=0), ['v2.0.0rc1', 'v1.3.0'])
+            m.get(TAGS_URL, status_code=403)
+            self.assertEqual(get_github_tags(api_url, cache_ttl=0), ['v2.0.0rc1', 'v1.3.0'])
+        self.assertEqual(len(logs.output), 2)
+
+        # ...but raise them without cached tags:
+        cache_path.unlink()
+        with requests_mock.Mocker() as m, self.assertRaises(requests.exceptions.HTTPError):
+            m.get(TAGS_URL, status_code=403)
+            get_github_tags(api_url)
+
+
+class PerformanceBudgetTestCase(PerformanceBudgetMixin, TestCase):
+    def test_max_queries(self):
+        with self.assertMaxQueries(1) as context:
+            User.objects.count()
+        self.assertEqual(len(context), 1)
+
+        with self.assertRaises(AssertionError) as cm, self.assertMaxQueries(1):
+            User.objects.count()
+            User.objects.filter(username='foo').exists()
+        message = str(cm.exception)
+        self.assertIn("2 queries executed on 'default', but max. 1 allowed. Captured queries were:\n1. SELECT", message)
+        self.assertIn('\n2. SELECT 1 AS "a" FROM "auth_user" WHERE "auth_user"."username" = \'foo\'', message)
+
+    def test_max_cache_calls(self):
+        with self.assertMaxCacheCalls(2) as counter:
+            cache.set('foo', 'bar')
+            cache.get('foo')
+        self.assertEqual(counter, {'set': 1, 'get': 1})
+
+        # The methods are patched on the cache instance, not on the "cache" proxy:
+        with assert_max_cache_calls(0):
+            self.assertIn('get', caches['default'].__dict__)
+
+        with (
+            self.assertRaisesMessage(AssertionError, "2 cache calls, but max. 1 allowed: {'get': 2}"),
+            assert_max_cache_calls(1),
+        ):
+            cache.get('foo')
+            cache.get('bar')
+
+        # The cache methods are restored:
+        self.assertNotIn('get', caches['default'].__dict__)
+
+    def test_max_duration(self):
+        with self.assertMaxDuration(10):
+            pass
+
+        with self.assertRaisesMessage(AssertionError, 'but max. 0.0ms allowed'), self.assertMaxDuration(0):
+            User.objects.count()
+
+    def test_performance_budget(self):
+        with assert_performance_budget(max_queries=1, max_cache_calls=1, max_seconds=10):
+            User.objects.count()
+            cache.get('foo')
+
+        with (
+            self.assertRaisesMessage(AssertionError, '1 cache calls, but max. 0 allowed'),
+            self.assertPerformanceBudget(max_queries=1, max_cache_calls=0),
+        ):
+            cache.get('foo')
@@ -4,6 +4,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import SuspiciousOperation
 
+from django_yunohost_integration.observability import tracing
+
 
 try:
     # https://pypi.org/project/PyJWT/
@@ -18,6 +20,7 @@ logger = logging.getLogger(__name__)
 UserModel = get_user_model()
 
 
+@tracing.traced('sso_auth.verify_sso_jwt')
 def verify_sso_jwt(*, sso_jwt_data: str, user: AbstractUser) -> None:
     assert isinstance(user, UserModel), f'Invalid user type: {type(user)}'
 